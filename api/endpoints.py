@@ -2,9 +2,12 @@
 
 from typing import Optional, List, Dict
 from datetime import datetime
-from fastapi import FastAPI, Query
+from fastapi import FastAPI, Query, Response
 from strategies.token_history_tracker import TokenHistoryTracker
 from strategies.token_monitor import TokenMonitor
+from llm_metrics import llm_metrics
+from ops_metrics import CONTENT_TYPE, ops_metrics
+from tracing import CPROFILE, tracer
 import os
 import logging
 
@@ -102,6 +105,11 @@ def setup_routes(app: FastAPI):
                 "/token-history/{symbol}",
                 "/analysis/current",
                 "/analysis/performance",
+                "/metrics",
+                "/metrics/llm",
+                "/traces",
+                "/traces/summary",
+                "/admin/profile",
                 "/test/tweet",
                 "/post/{post_type}",
                 "/tweet"
@@ -245,6 +253,47 @@ def setup_routes(app: FastAPI):
         """Get performance insights about our token detection"""
         return monitor.get_performance_insights(days)
 
+    @app.get("/metrics")
+    async def get_metrics() -> Response:
+        """Operational counters and histograms in the Prometheus text format"""
+        return Response(content=ops_metrics.render(), media_type=CONTENT_TYPE)
+
+    @app.get("/metrics/llm")
+    async def get_llm_metrics() -> Dict:
+        """LLM call counts, outcomes, token usage and latency histograms per call site"""
+        return llm_metrics.snapshot()
+
+    @app.get("/traces")
+    async def get_traces(
+        limit: int = Query(20, description="Number of recent cycles to return"),
+        name: Optional[str] = Query(None, description="Only cycles with this name, e.g. post_trend")
+    ) -> List[Dict]:
+        """Recent posting/analysis cycles with their stage spans, newest first"""
+        return tracer.recent(limit, name)
+
+    @app.get("/traces/summary")
+    async def get_trace_summary() -> Dict:
+        """Mean and max duration per cycle and stage over the buffered traces"""
+        return tracer.summary()
+
+    @app.post("/admin/profile")
+    async def start_profile(
+        cycles: int = Query(1, ge=1, description="Number of upcoming cycles to profile"),
+        mode: str = Query(CPROFILE, description="cprofile or sampling"),
+        interval: float = Query(0.005, gt=0, description="Sampling interval in seconds (sampling mode)")
+    ) -> Dict:
+        """Profile the next N traced cycles, replacing any earlier profile"""
+        try:
+            tracer.profiler.arm(cycles, mode, interval)
+        except ValueError as e:
+            return {'success': False, 'message': str(e)}
+        return {'success': True, **tracer.profiler.report()}
+
+    @app.get("/admin/profile")
+    async def get_profile(limit: int = Query(40, description="Functions or stacks to include")) -> Dict:
+        """Profiling status and the profile aggregated over the cycles profiled so far"""
+        return tracer.profiler.report(limit)
+
     @app.post("/post/{post_type}")
     async def trigger_post(post_type: str):
         """Trigger a specific type of post
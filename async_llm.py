@@ -0,0 +1,355 @@
+"""
+Async Gemini client with a shared concurrency limit, per-call deadlines and circuit breaking
+"""
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Coroutine, Dict, List, Optional
+import asyncio
+import logging
+import os
+import threading
+import time
+
+import aiohttp
+
+from custom_llm import GeminiComponent
+from llm_cache import LLMResponseCache
+from llm_metrics import CACHE_HIT, CANCELLED, ERROR, FALLBACK, OK, REJECTED, TIMEOUT, llm_metrics
+
+logger = logging.getLogger(__name__)
+
+class CircuitBreaker:
+    """Stops calling the model after repeated failures
+
+    After failure_threshold consecutive failures the breaker opens and every
+    call is refused (callers fall back to their templates) until reset_timeout
+    has passed. One probe call is then let through; success closes the
+    breaker, failure re-opens it.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 60):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+        self.rejected = 0
+        self.trips = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state
+
+    def allow(self) -> bool:
+        """Whether a call may be made right now"""
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self._state = self.HALF_OPEN
+                self._probe_in_flight = False
+
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+
+            self.rejected += 1
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._state != self.CLOSED:
+                logger.info("LLM circuit breaker closed")
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def release(self) -> None:
+        """Give back a half-open probe slot for a call that never reached the API"""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    self.trips += 1
+                    logger.warning(f"LLM circuit breaker open for {self.reset_timeout}s after {self._failures} failures")
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._probe_in_flight = False
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'state': self._state,
+                'consecutive_failures': self._failures,
+                'trips': self.trips,
+                'rejected': self.rejected
+            }
+
+class AsyncGeminiComponent(GeminiComponent):
+    """Gemini component backed by aiohttp on a dedicated event loop
+
+    Every call, sync or async, from any thread, runs on one background loop
+    and passes through one semaphore, so max_concurrency bounds in-flight
+    requests process-wide for this component. Each call is cut off at its
+    deadline (queueing time included) and returns None, as does any call
+    refused by the circuit breaker, which lets callers use their template
+    fallbacks instead of blocking a scheduler slot.
+
+    The sync generate()/generate_post() keep the GeminiComponent interface,
+    so this is a drop-in replacement.
+    """
+
+    def __init__(self, api_key: str = None, api_base: str = None, cache: Optional[LLMResponseCache] = None,
+                 max_concurrency: int = None, deadline: float = None, breaker: CircuitBreaker = None):
+        """Initialize async Gemini component
+
+        Args:
+            api_key: Gemini API key (defaults to AI_ACCESS_TOKEN)
+            api_base: generateContent endpoint (defaults to AI_API_URL)
+            cache: Response cache; defaults to one configured from LLM_CACHE_* env vars
+            max_concurrency: In-flight request limit (defaults to LLM_MAX_CONCURRENCY or 4)
+            deadline: Seconds a call may take end to end (defaults to LLM_DEADLINE or 20)
+            breaker: Circuit breaker; defaults to LLM_BREAKER_THRESHOLD failures / LLM_BREAKER_RESET seconds
+        """
+        super().__init__(api_key=api_key, api_base=api_base, cache=cache)
+        self.max_concurrency = max_concurrency or int(os.getenv('LLM_MAX_CONCURRENCY', 4))
+        self.deadline = deadline or float(os.getenv('LLM_DEADLINE', 20))
+        self.breaker = breaker or CircuitBreaker(
+            failure_threshold=int(os.getenv('LLM_BREAKER_THRESHOLD', 5)),
+            reset_timeout=float(os.getenv('LLM_BREAKER_RESET', 60))
+        )
+        self.display_name = "Gemini (async)"
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_lock = threading.Lock()
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._http: Optional[aiohttp.ClientSession] = None
+        self.timeouts = 0
+
+    # Event loop plumbing
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        """Start the background loop on first use"""
+        with self._loop_lock:
+            if self._loop is None or self._loop.is_closed():
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name="gemini-async", daemon=True)
+                thread.start()
+                self._loop = loop
+            return self._loop
+
+    async def _submit(self, coro: Coroutine) -> Any:
+        """Await coro on the component loop, whichever loop the caller is on"""
+        loop = self._ensure_loop()
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            return await coro
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, loop))
+
+    def _run_sync(self, coro: Coroutine, deadline: float) -> Any:
+        """Block on coro from synchronous code, never longer than deadline plus slack"""
+        future = asyncio.run_coroutine_threadsafe(coro, self._ensure_loop())
+        try:
+            return future.result(timeout=deadline + 5)
+        except FutureTimeoutError:
+            future.cancel()
+            logger.error(f"LLM call did not finish within {deadline}s")
+            return None
+
+    async def _session(self) -> aiohttp.ClientSession:
+        """Shared HTTP session and semaphore, created on the component loop"""
+        if self._http is None or self._http.closed:
+            self._http = aiohttp.ClientSession(
+                headers={'Content-Type': 'application/json'},
+                connector=aiohttp.TCPConnector(limit=self.max_concurrency)
+            )
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._http
+
+    # Core request path (runs on the component loop)
+
+    async def _post(self, payload: Dict, started: List[bool]) -> Dict:
+        """Wait for a slot, then make one generateContent request"""
+        session = await self._session()
+        async with self._semaphore:
+            started.append(True)
+            url = f"{self.api_base}?key={self.api_key}"
+            async with session.post(url, json=payload) as response:
+                if response.status != 200:
+                    body = await response.text()
+                    logger.error(f"API Error: {response.status} - {body}")
+                    raise RuntimeError(f"Gemini returned HTTP {response.status}")
+                return await response.json(content_type=None)
+
+    async def _generate(self, prompt: str, max_tokens: int, system_message: Optional[str],
+                        temperature: float, use_cache: bool, deadline: float,
+                        validator: Optional[Callable[[str], bool]] = None) -> Optional[str]:
+        with llm_metrics.track('gemini.generate') as call:
+            payload = self._build_payload(prompt, max_tokens, system_message, temperature)
+
+            cache_key = None
+            if self.cache and use_cache:
+                cache_key = LLMResponseCache.make_key(self.api_base, prompt, system_message, payload['generationConfig'])
+                cached = self.cache.get(cache_key)
+                if cached is not None and (validator is None or validator(cached)):
+                    logger.info("Using cached Gemini response")
+                    call.outcome = CACHE_HIT
+                    return cached
+
+            if not self.breaker.allow():
+                logger.warning("LLM circuit breaker open, skipping Gemini call")
+                call.outcome = REJECTED
+                return None
+
+            started: List[bool] = []
+            try:
+                data = await asyncio.wait_for(self._post(payload, started), timeout=deadline)
+            except asyncio.TimeoutError:
+                self.timeouts += 1
+                call.outcome = TIMEOUT
+                if started:
+                    logger.error(f"API request exceeded {deadline}s deadline")
+                    self.breaker.record_failure()
+                else:
+                    # Only queued behind other calls; the API itself is not at fault
+                    logger.warning(f"No free LLM slot within {deadline}s deadline")
+                    self.breaker.release()
+                return None
+            except asyncio.CancelledError:
+                # Losing candidate in a first-valid race
+                call.outcome = CANCELLED
+                if not started:
+                    self.breaker.release()
+                raise
+            except Exception as e:
+                logger.error(f"Gemini request failed: {e}")
+                call.outcome = ERROR
+                self.breaker.record_failure()
+                return None
+
+            self.breaker.record_success()
+            text = self._extract_text(data)
+            if text is None:
+                logger.error(f"Unexpected API response format: {data}")
+                call.outcome = ERROR
+                return None
+
+            call.add_usage(data.get('usageMetadata'))
+            if cache_key and (validator is None or validator(text)):
+                self.cache.put(cache_key, text)
+            return text
+
+    async def _first_valid(self, prompt: str, candidates: int, validator: Optional[Callable[[str], bool]],
+                           max_tokens: int, system_message: Optional[str], deadline: float) -> Optional[str]:
+        # Spread temperatures so parallel candidates are not identical
+        temperatures = [0.7 + 0.3 * i / max(candidates - 1, 1) for i in range(candidates)]
+        tasks = {
+            asyncio.ensure_future(
+                self._generate(prompt, max_tokens, system_message, temperature, i == 0, deadline, validator)
+            )
+            for i, temperature in enumerate(temperatures)
+        }
+        with llm_metrics.track('gemini.generate_first_valid') as call:
+            call.outcome = FALLBACK
+            try:
+                pending = tasks
+                while pending:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        text = task.result()
+                        if text and (validator is None or validator(text)):
+                            call.outcome = OK
+                            return text
+                return None
+            finally:
+                for task in tasks:
+                    task.cancel()
+
+    # Async interface
+
+    async def agenerate(self, prompt: str, max_tokens: int = 300, system_message: str = None,
+                        use_cache: bool = True, deadline: float = None,
+                        validator: Callable[[str], bool] = None) -> Optional[str]:
+        """Generate text from prompt, returning None on failure, timeout or open breaker
+
+        Replies validator rejects are returned but not cached.
+        """
+        return await self._submit(self._generate(
+            prompt, max_tokens, system_message, 0.7, use_cache, deadline or self.deadline, validator
+        ))
+
+    async def agenerate_first_valid(self, prompt: str, candidates: int = 3,
+                                    validator: Callable[[str], bool] = None, max_tokens: int = 300,
+                                    system_message: str = None, deadline: float = None) -> Optional[str]:
+        """Fire candidates generations in parallel and return the first one validator accepts
+
+        Remaining requests are cancelled as soon as a valid response arrives.
+        Returns None if none is valid before the deadline.
+        """
+        return await self._submit(self._first_valid(
+            prompt, candidates, validator, max_tokens, system_message, deadline or self.deadline
+        ))
+
+    # Sync interface (GeminiComponent compatible)
+
+    def generate(self, prompt: str, max_tokens: int = 300, system_message: str = None,
+                 use_cache: bool = True, deadline: float = None,
+                 validator: Callable[[str], bool] = None) -> Optional[str]:
+        """Generate text from prompt within deadline (validator as in GeminiComponent.generate)"""
+        deadline = deadline or self.deadline
+        return self._run_sync(
+            self._generate(prompt, max_tokens, system_message, 0.7, use_cache, deadline, validator), deadline
+        )
+
+    def generate_first_valid(self, prompt: str, candidates: int = 3, validator: Callable[[str], bool] = None,
+                             max_tokens: int = 300, system_message: str = None,
+                             deadline: float = None) -> Optional[str]:
+        """Blocking form of agenerate_first_valid"""
+        deadline = deadline or self.deadline
+        return self._run_sync(
+            self._first_valid(prompt, candidates, validator, max_tokens, system_message, deadline), deadline
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        """Limiter, deadline and breaker state"""
+        return {
+            'max_concurrency': self.max_concurrency,
+            'deadline': self.deadline,
+            'timeouts': self.timeouts,
+            'breaker': self.breaker.stats()
+        }
+
+    def close(self) -> None:
+        """Close the HTTP session and stop the background loop"""
+        with self._loop_lock:
+            loop = self._loop
+            self._loop = None
+        if loop is None:
+            return
+
+        async def _shutdown():
+            if self._http is not None:
+                await self._http.close()
+            self._http = None
+            self._semaphore = None
+
+        try:
+            asyncio.run_coroutine_threadsafe(_shutdown(), loop).result(timeout=5)
+        except Exception as e:
+            logger.warning(f"Error closing Gemini session: {e}")
+        loop.call_soon_threadsafe(loop.stop)
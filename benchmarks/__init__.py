@@ -0,0 +1,7 @@
+"""Reproducible benchmarks for the analysis and formatting hot paths
+
+Run with:
+    python -m benchmarks.run                      # full suite, writes benchmarks/results/<commit>.json
+    python -m benchmarks.run --quick              # smallest sizes only
+    python -m benchmarks.run --compare benchmarks/results/<old>.json
+"""
@@ -0,0 +1,95 @@
+"""Seeded synthetic inputs for the benchmark suite"""
+
+import random
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+from strategies.token_history_tracker import TokenHistoricalData
+from twitter.simulation import make_token_universe
+
+__all__ = [
+    'make_token_universe',
+    'make_token_history',
+    'make_performance_history',
+    'make_first_hour_data',
+    'make_breakout_data'
+]
+
+def make_token_history(count: int, seed: int = 42, days_back: int = 14) -> Dict[str, TokenHistoricalData]:
+    """Build tracker history with first mentions spread over the last days_back days"""
+    rng = random.Random(seed)
+    now = datetime.now()
+    history = {}
+    for token in make_token_universe(count, seed):
+        first_price = token['price']
+        current_price = first_price * (1 + rng.gauss(0.05, 0.3))
+        first_date = now - timedelta(hours=rng.uniform(0, days_back * 24))
+        max_price = max(first_price, current_price) * (1 + abs(rng.gauss(0, 0.1)))
+        history[token['symbol']] = TokenHistoricalData(
+            symbol=token['symbol'],
+            first_mention_date=first_date,
+            first_mention_price=first_price,
+            first_mention_volume_24h=token['volume24h'],
+            first_mention_mcap=token['marketCap'],
+            first_mention_volume_mcap_ratio=token['volume24h'] / token['marketCap'] * 100,
+            current_price=max(current_price, first_price * 0.01),
+            current_volume=token['volume24h'] * rng.uniform(0.5, 2.0),
+            current_mcap=token['marketCap'] * current_price / first_price,
+            last_updated=now,
+            max_price_7d=max_price,
+            max_price_7d_date=first_date + (now - first_date) / 2,
+            max_gain_percentage_7d=(max_price - first_price) / first_price * 100
+        )
+    return history
+
+def make_performance_history(count: int, seed: int = 42) -> Dict[str, List[Dict]]:
+    """Build the {'tokens': [...]} payload the performance formatters consume"""
+    rng = random.Random(seed)
+    now = datetime.now()
+    tokens = []
+    for token in make_token_universe(count, seed):
+        gain = rng.gauss(8, 25)
+        tokens.append({
+            'symbol': token['symbol'],
+            'first_mention_price': token['price'],
+            'current_price': token['price'] * (1 + gain / 100),
+            'volume_24h': token['volume24h'],
+            'gain_percentage': gain,
+            'first_mention_date': (now - timedelta(hours=rng.uniform(0, 168))).isoformat(),
+            'max_gain_7d': max(gain, 0) + abs(rng.gauss(0, 10)),
+            'first_mention_mcap': token['marketCap'],
+            'current_mcap': token['marketCap'] * (1 + gain / 100)
+        })
+    tokens.sort(key=lambda t: t['max_gain_7d'], reverse=True)
+    return {'tokens': tokens}
+
+def make_first_hour_data(seed: int = 42) -> Dict:
+    """Input for FirstHourGainsFormatter"""
+    rng = random.Random(seed)
+    entry = rng.uniform(0.01, 5)
+    return {
+        'symbol': 'BENCH',
+        'first_mention_price': entry,
+        'current_price': entry * 1.18,
+        'peak_price': entry * 1.31,
+        'volume_change': rng.randint(50, 400),
+        'similar_token': 'PAST',
+        'similar_token_gain': rng.randint(20, 200),
+        'next_key_level': entry * 1.5
+    }
+
+def make_breakout_data(seed: int = 42) -> Dict:
+    """Input for BreakoutValidationFormatter"""
+    rng = random.Random(seed)
+    resistance = rng.uniform(0.01, 5)
+    return {
+        'symbol': 'BENCH',
+        'resistance_level': resistance,
+        'volume_24h': rng.uniform(1e6, 5e8),
+        'volume_change': rng.randint(50, 400),
+        'vmc_ratio': rng.uniform(0.2, 5),
+        'similar_token': 'PAST',
+        'similar_token_gain': rng.randint(20, 200),
+        'next_targets': [resistance * 1.2, resistance * 1.5, resistance * 2],
+        'pattern_success_rate': rng.randint(50, 90)
+    }
@@ -0,0 +1,288 @@
+"""Benchmark runner for the analysis and formatting hot paths
+
+Every case is built from seeded synthetic data, timed timeit-style (auto-scaled
+inner loop, best/median of several repeats) and written to JSON keyed by case
+name, so runs from two commits can be diffed with --compare.
+"""
+
+import argparse
+import atexit
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from itertools import cycle
+from typing import Callable, Dict, List, Optional
+from unittest import mock
+
+from benchmarks.fixtures import (
+    make_breakout_data,
+    make_first_hour_data,
+    make_performance_history,
+    make_token_history,
+    make_token_universe
+)
+from elion.content.performance_formatters import (
+    BreakoutValidationFormatter,
+    FirstHourGainsFormatter,
+    PerformanceCompareFormatter,
+    PredictionAccuracyFormatter,
+    SuccessRateFormatter,
+    WinnersRecapFormatter
+)
+from strategies.token_history_tracker import TokenHistoryTracker
+from strategies.trend_strategy import TrendStrategy
+from strategies.volume_strategy import find_volume_spikes
+
+UNIVERSE_SIZES = [1_000, 10_000, 100_000]
+HISTORY_SIZES = [100, 1_000, 10_000]
+FORMATTER_SIZES = [10, 100, 1_000]
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+# Scratch directories handed out by setups, removed after each suite run (or at exit)
+_scratch = contextlib.ExitStack()
+atexit.register(_scratch.close)
+
+class BenchmarkCase:
+    """A named, parameterized operation to time
+
+    setup(size, seed) runs untimed and returns the zero-argument callable
+    that is timed.
+    """
+
+    def __init__(self, group: str, name: str, param: str, sizes: List[int],
+                 setup: Callable[[int, int], Callable[[], object]]):
+        self.group = group
+        self.name = name
+        self.param = param
+        self.sizes = sizes
+        self.setup = setup
+
+    def key(self, size: int) -> str:
+        """Stable result key used for comparisons"""
+        return f"{self.group}.{self.name}[{self.param}={size}]"
+
+def _quiet(func: Callable) -> Callable:
+    """Run func with stdout discarded (strategies print progress)"""
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            return func()
+    return run
+
+def _scratch_dir() -> str:
+    """Temporary directory removed when the current suite run ends"""
+    return _scratch.enter_context(tempfile.TemporaryDirectory(prefix='elai_bench_'))
+
+def _isolated_tracker(history: Dict, directory: str) -> TokenHistoryTracker:
+    """Tracker instance with file storage in a scratch dir, bypassing the singleton"""
+    tracker = object.__new__(TokenHistoryTracker)
+    tracker.token_history = history
+    tracker.using_redis = False
+    tracker.data_dir = directory
+    tracker.history_file = os.path.join(directory, 'token_history.json')
+    return tracker
+
+def setup_volume_spikes(size: int, seed: int) -> Callable:
+    tokens = make_token_universe(size, seed)
+    return _quiet(lambda: find_volume_spikes(tokens))
+
+def setup_trend_analyze(size: int, seed: int) -> Callable:
+    tokens = make_token_universe(size, seed)
+    strategy = TrendStrategy(api_key='benchmark')
+
+    def run():
+        # Serve the listing the way a warm fetch_tokens cache would
+        with mock.patch('strategies.trend_strategy.fetch_tokens', return_value=tokens):
+            return strategy.analyze()
+    return _quiet(run)
+
+def setup_tracker_update(size: int, seed: int) -> Callable:
+    tracker = _isolated_tracker(make_token_history(size, seed), _scratch_dir())
+    rng = random.Random(seed)
+    updates = cycle([
+        {
+            'symbol': token.symbol,
+            'price': token.current_price * rng.uniform(0.9, 1.1),
+            'volume24h': token.current_volume * rng.uniform(0.8, 1.2),
+            'marketCap': token.current_mcap,
+            'priceChange24h': rng.gauss(0, 10)
+        }
+        for token in list(tracker.token_history.values())[:256]
+    ])
+    return lambda: tracker.update_token(next(updates))
+
+def setup_tracker_recent_performance(size: int, seed: int) -> Callable:
+    tracker = _isolated_tracker(make_token_history(size, seed), _scratch_dir())
+    return tracker.get_recent_performance
+
+def _formatter_setup(formatter_factory: Callable) -> Callable:
+    def setup(size: int, seed: int) -> Callable:
+        formatter = formatter_factory()
+        history = make_performance_history(size, seed)
+        random.seed(seed)
+        return lambda: formatter.format_tweet(history)
+    return setup
+
+def _single_token_formatter_setup(formatter_factory: Callable, data_factory: Callable) -> Callable:
+    def setup(size: int, seed: int) -> Callable:
+        formatter = formatter_factory()
+        data = data_factory(seed)
+        return lambda: formatter.format_tweet(data)
+    return setup
+
+CASES = [
+    BenchmarkCase('volume', 'find_volume_spikes', 'tokens', UNIVERSE_SIZES, setup_volume_spikes),
+    BenchmarkCase('trend', 'TrendStrategy.analyze', 'tokens', UNIVERSE_SIZES, setup_trend_analyze),
+    BenchmarkCase('history', 'TokenHistoryTracker.update_token', 'history', HISTORY_SIZES, setup_tracker_update),
+    BenchmarkCase('history', 'TokenHistoryTracker.get_recent_performance', 'history', HISTORY_SIZES,
+                  setup_tracker_recent_performance),
+    BenchmarkCase('format', 'PerformanceCompareFormatter', 'history', FORMATTER_SIZES,
+                  _formatter_setup(lambda: PerformanceCompareFormatter(test_mode=True))),
+    BenchmarkCase('format', 'SuccessRateFormatter', 'history', FORMATTER_SIZES,
+                  _formatter_setup(SuccessRateFormatter)),
+    BenchmarkCase('format', 'PredictionAccuracyFormatter', 'history', FORMATTER_SIZES,
+                  _formatter_setup(PredictionAccuracyFormatter)),
+    BenchmarkCase('format', 'WinnersRecapFormatter', 'history', FORMATTER_SIZES,
+                  _formatter_setup(WinnersRecapFormatter)),
+    BenchmarkCase('format', 'FirstHourGainsFormatter', 'tokens', [1],
+                  _single_token_formatter_setup(FirstHourGainsFormatter, make_first_hour_data)),
+    BenchmarkCase('format', 'BreakoutValidationFormatter', 'tokens', [1],
+                  _single_token_formatter_setup(BreakoutValidationFormatter, make_breakout_data))
+]
+
+def time_callable(func: Callable, repeat: int, min_sample: float = 0.05) -> Dict:
+    """Time func like timeit: pick an inner loop count, then take repeat samples"""
+    func()  # Warm up caches and lazy imports
+
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_sample or number >= 1_000_000:
+            break
+        number *= 10 if elapsed < min_sample / 10 else 2
+
+    samples = [elapsed / number]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        samples.append((time.perf_counter() - start) / number)
+
+    return {
+        'number': number,
+        'repeat': repeat,
+        'min_s': min(samples),
+        'median_s': statistics.median(samples),
+        'mean_s': statistics.fmean(samples),
+        'stdev_s': statistics.stdev(samples) if len(samples) > 1 else 0.0
+    }
+
+def _git(*args: str) -> Optional[str]:
+    """Run a git command in the repo, returning stripped output or None"""
+    try:
+        return subprocess.run(
+            ['git', *args], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(RESULTS_DIR)
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run_suite(seed: int = 42, repeat: int = 5, quick: bool = False, name_filter: str = None) -> Dict:
+    """Run all selected cases and return the results document"""
+    results = {}
+    with _scratch:
+        for case in CASES:
+            sizes = case.sizes[:1] if quick else case.sizes
+            for size in sizes:
+                key = case.key(size)
+                if name_filter and name_filter not in key:
+                    continue
+                func = case.setup(size, seed)
+                timing = time_callable(func, repeat)
+                results[key] = {'group': case.group, 'param': case.param, 'size': size, **timing}
+                print(f"{key:<65} {timing['median_s'] * 1000:>12.3f} ms  (x{timing['number']})")
+
+    return {
+        'meta': {
+            'commit': _git('rev-parse', '--short', 'HEAD'),
+            'dirty': bool(_git('status', '--porcelain', '--untracked-files=no')),
+            'timestamp': datetime.now().isoformat(),
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'seed': seed,
+            'repeat': repeat,
+            'quick': quick
+        },
+        'results': results
+    }
+
+def compare(old: Dict, new: Dict, threshold: float = 0.10) -> List[str]:
+    """Print median deltas between two result documents, returning regressed keys"""
+    old_results, new_results = old.get('results', {}), new.get('results', {})
+    print(f"\nComparing {old['meta'].get('commit')} -> {new['meta'].get('commit')} "
+          f"(regression threshold {threshold:.0%})")
+    print(f"{'case':<65}{'old ms':>12}{'new ms':>12}{'change':>10}")
+    print("-" * 99)
+
+    regressions = []
+    for key in sorted(set(old_results) & set(new_results)):
+        before = old_results[key]['median_s']
+        after = new_results[key]['median_s']
+        change = (after - before) / before if before else 0.0
+        flag = ''
+        if change > threshold:
+            flag = '  REGRESSION'
+            regressions.append(key)
+        elif change < -threshold:
+            flag = '  faster'
+        print(f"{key:<65}{before * 1000:>12.3f}{after * 1000:>12.3f}{change:>+10.1%}{flag}")
+
+    for key in sorted(set(new_results) - set(old_results)):
+        print(f"{key:<65}{'-':>12}{new_results[key]['median_s'] * 1000:>12.3f}{'new':>10}")
+    return regressions
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Benchmark analysis and formatting hot paths")
+    parser.add_argument('--seed', type=int, default=42, help="Seed for synthetic data")
+    parser.add_argument('--repeat', type=int, default=5, help="Timed samples per case")
+    parser.add_argument('--quick', action='store_true', help="Only run the smallest size of each case")
+    parser.add_argument('--filter', help="Only run cases whose key contains this text")
+    parser.add_argument('--output', help="Results file (default: benchmarks/results/<commit>.json)")
+    parser.add_argument('--compare', help="Previous results file to compare against")
+    parser.add_argument('--threshold', type=float, default=0.10, help="Relative slowdown counted as regression")
+    parser.add_argument('--fail-on-regression', action='store_true', help="Exit 1 if any case regressed")
+    args = parser.parse_args()
+
+    report = run_suite(seed=args.seed, repeat=args.repeat, quick=args.quick, name_filter=args.filter)
+
+    output = args.output
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        suffix = '-dirty' if report['meta']['dirty'] else ''
+        output = os.path.join(RESULTS_DIR, f"{report['meta']['commit'] or 'unknown'}{suffix}.json")
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            previous = json.load(f)
+        regressions = compare(previous, report, args.threshold)
+        if regressions and args.fail_on_regression:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,43 @@
 """
 Custom LLM implementation for Google's Gemini API
 """
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional
 import json
 import requests
 import os
 import re
 import logging
 
+from llm_cache import LLMResponseCache
+from llm_metrics import CACHE_HIT, ERROR, FALLBACK, OK, TIMEOUT, CallRecord, llm_metrics
+
 logger = logging.getLogger(__name__)
 
+# Canned post returned by generate_post when the model gives nothing usable
+FALLBACK_POST = "🤖 *Processing market data... neural nets recalibrating* Meanwhile, stay sharp and watch those charts! 👀"
+
+# ELAI persona plus the tweet length constraint, sent with every post generation
+POST_SYSTEM_MESSAGE = """
+        You are ELAI, an AI crypto trading bot. Keep your responses focused on market analysis.
+        IMPORTANT: Your response must be under 280 characters and suitable for Twitter.
+        Use emojis appropriately but don't overdo it.
+        """
+
+def _tweet_length(text: str) -> str:
+    """Truncate text to fit a tweet"""
+    return text[:277] + "..." if len(text) > 280 else text
+
 class GeminiComponent:
     """Custom LLM component for Gemini"""
     
-    def __init__(self, api_key: str = None, api_base: str = None):
-        """Initialize Gemini component"""
+    def __init__(self, api_key: str = None, api_base: str = None, cache: Optional[LLMResponseCache] = None):
+        """Initialize Gemini component
+        
+        Args:
+            api_key: Gemini API key (defaults to AI_ACCESS_TOKEN)
+            api_base: generateContent endpoint (defaults to AI_API_URL)
+            cache: Response cache; defaults to one configured from LLM_CACHE_* env vars
+        """
         # Use provided values or fall back to env vars
         self.api_key = api_key or os.getenv('AI_ACCESS_TOKEN')
         self.api_base = api_base or os.getenv('AI_API_URL', 'https://generativelanguage.googleapis.com/v1beta/models/gemini-1.5-flash:generateContent')
@@ -36,24 +59,62 @@ class GeminiComponent:
         self.session.mount('https://', adapter)
         
         self.display_name = "Gemini"
+        
+        # Identical prompts within the TTL are served from cache
+        self.cache = cache if cache is not None else LLMResponseCache.from_env()
 
-    def generate(self, prompt: str, max_tokens: int = 300, system_message: str = None) -> str:
-        """Generate text from prompt"""
-        try:
-            # Format request body for Gemini API
-            data = {
-                "contents": [{
-                    "parts": [{
-                        "text": f"{system_message}\n\n{prompt}" if system_message else prompt
-                    }]
-                }],
-                "generationConfig": {
-                    "temperature": 0.7,
-                    "maxOutputTokens": max_tokens,
-                    "topP": 0.95,
-                    "topK": 40
-                }
+    def _build_payload(self, prompt: str, max_tokens: int, system_message: str = None, temperature: float = 0.7) -> Dict:
+        """Format request body for Gemini API"""
+        return {
+            "contents": [{
+                "parts": [{
+                    "text": f"{system_message}\n\n{prompt}" if system_message else prompt
+                }]
+            }],
+            "generationConfig": {
+                "temperature": temperature,
+                "maxOutputTokens": max_tokens,
+                "topP": 0.95,
+                "topK": 40
             }
+        }
+
+    @staticmethod
+    def _extract_text(data: Dict) -> Optional[str]:
+        """Pull the first candidate's text out of a generateContent response"""
+        if 'candidates' in data and len(data['candidates']) > 0:
+            candidate = data['candidates'][0]
+            if 'content' in candidate and 'parts' in candidate['content']:
+                parts = candidate['content']['parts']
+                if parts and 'text' in parts[0]:
+                    return parts[0]['text'].strip()
+        return None
+
+    def generate(self, prompt: str, max_tokens: int = 300, system_message: str = None, use_cache: bool = True,
+                 validator: Callable[[str], bool] = None) -> str:
+        """Generate text from prompt
+        
+        Replies validator rejects are returned but neither cached nor served
+        from the cache, so a retry gets a fresh reply.
+        """
+        with llm_metrics.track('gemini.generate') as call:
+            return self._generate_blocking(prompt, max_tokens, system_message, use_cache, call, validator)
+
+    def _generate_blocking(self, prompt: str, max_tokens: int, system_message: Optional[str], use_cache: bool,
+                           call: CallRecord, validator: Callable[[str], bool] = None) -> Optional[str]:
+        """Blocking request, recording its outcome and token usage on call"""
+        call.outcome = ERROR
+        try:
+            data = self._build_payload(prompt, max_tokens, system_message)
+            
+            cache_key = None
+            if self.cache and use_cache:
+                cache_key = LLMResponseCache.make_key(self.api_base, prompt, system_message, data['generationConfig'])
+                cached = self.cache.get(cache_key)
+                if cached is not None and (validator is None or validator(cached)):
+                    logger.info("Using cached Gemini response")
+                    call.outcome = CACHE_HIT
+                    return cached
             
             # Add API key to URL
             url = f"{self.api_base}?key={self.api_key}"
@@ -74,12 +135,13 @@ class GeminiComponent:
             # Parse response
             try:
                 data = response.json()
-                if 'candidates' in data and len(data['candidates']) > 0:
-                    candidate = data['candidates'][0]
-                    if 'content' in candidate and 'parts' in candidate['content']:
-                        parts = candidate['content']['parts']
-                        if parts and 'text' in parts[0]:
-                            return parts[0]['text'].strip()
+                text = self._extract_text(data)
+                if text is not None:
+                    call.outcome = OK
+                    call.add_usage(data.get('usageMetadata'))
+                    if cache_key and (validator is None or validator(text)):
+                        self.cache.put(cache_key, text)
+                    return text
                             
                 logger.error(f"Unexpected API response format: {data}")
                 return None
@@ -90,6 +152,7 @@ class GeminiComponent:
                 
         except requests.exceptions.Timeout:
             logger.error(f"API request timed out after 60 seconds")
+            call.outcome = TIMEOUT
             return None
         except requests.exceptions.ConnectionError as e:
             logger.error(f"Connection error: {e}")
@@ -98,25 +161,24 @@ class GeminiComponent:
             logger.error(f"Unexpected error: {e}")
             return None
             
-    def generate_post(self, prompt: str) -> str:
-        """Generate a tweet-length post from prompt"""
-        # Add tweet length constraint to system message
-        system_message = """
-        You are ELAI, an AI crypto trading bot. Keep your responses focused on market analysis.
-        IMPORTANT: Your response must be under 280 characters and suitable for Twitter.
-        Use emojis appropriately but don't overdo it.
+    @llm_metrics.instrument('gemini.generate_post', classify=lambda post: FALLBACK if post == FALLBACK_POST else OK)
+    def generate_post(self, prompt: str, use_cache: bool = True, validator: Callable[[str], bool] = None) -> str:
+        """Generate a tweet-length post from prompt
+        
+        Posts validator rejects are not cached. Pass use_cache=False when
+        retrying a rejected post, so the retry gets a fresh reply.
         """
+        keep = (lambda text: validator(_tweet_length(text))) if validator else None
         
         # Generate with smaller max tokens since we need tweet-length
-        response = self.generate(prompt, max_tokens=100, system_message=system_message)
+        response = self.generate(prompt, max_tokens=100, system_message=POST_SYSTEM_MESSAGE, use_cache=use_cache,
+                                 validator=keep)
         
         if response:
-            # Ensure response is tweet-length
-            if len(response) > 280:
-                response = response[:277] + "..."
-            return response
+            return _tweet_length(response)
         
-        return "🤖 *Processing market data... neural nets recalibrating* Meanwhile, stay sharp and watch those charts! 👀"
+        logger.warning("No usable Gemini response, returning fallback post")
+        return FALLBACK_POST
             
     def __call__(self, prompt: str, **kwargs) -> str:
         """Make the class callable"""
@@ -0,0 +1,244 @@
+"""
+Vectorized, incrementally updated technical indicators for many tokens
+"""
+
+from typing import Dict, Iterable, Mapping, Optional, Tuple
+
+import numpy as np
+
+def support_resistance_levels(prices: np.ndarray, valid: Optional[np.ndarray] = None,
+                              num_levels: int = 3, bins: int = 50) -> Tuple[np.ndarray, np.ndarray]:
+    """Most touched price levels per row of a (tokens, samples) price matrix
+
+    Local highs and lows are binned into bins equal-width buckets between
+    each row's low and high; the num_levels buckets holding the most
+    turning points are the levels, each priced at the mean of its turning
+    points. valid masks samples that are real (default: all).
+
+    Returns (levels, touches), both (tokens, num_levels), most touched
+    first; touches is 0 (and the level NaN) where a row has fewer levels.
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    if prices.ndim == 1:
+        prices = prices[None, :]
+    n, length = prices.shape
+    levels = np.full((n, num_levels), np.nan)
+    touches = np.zeros((n, num_levels), dtype=np.int64)
+    if length < 3 or not n:
+        return levels, touches
+    if valid is None:
+        valid = np.ones(prices.shape, dtype=bool)
+
+    left, mid, right = prices[:, :-2], prices[:, 1:-1], prices[:, 2:]
+    known = valid[:, :-2] & valid[:, 1:-1] & valid[:, 2:]
+    turning = known & (((mid > left) & (mid > right)) | ((mid < left) & (mid < right)))
+
+    low = np.where(valid, prices, np.inf).min(axis=1)
+    high = np.where(valid, prices, -np.inf).max(axis=1)
+    with np.errstate(invalid='ignore', divide='ignore', over='ignore'):
+        width = (high - low) / bins
+        bucket = np.where(width[:, None] > 0, (mid - low[:, None]) / width[:, None], 0)
+    bucket = np.clip(np.nan_to_num(bucket), 0, bins - 1).astype(np.int64)
+
+    rows = np.broadcast_to(np.arange(n)[:, None], mid.shape)
+    flat = (rows * bins + bucket)[turning]
+    counts = np.bincount(flat, minlength=n * bins).reshape(n, bins)
+    sums = np.bincount(flat, weights=mid[turning], minlength=n * bins).reshape(n, bins)
+
+    top = np.argsort(-counts, axis=1, kind='stable')[:, :num_levels]
+    found = np.take_along_axis(counts, top, axis=1)
+    k = top.shape[1]
+    touches[:, :k] = found
+    with np.errstate(invalid='ignore', divide='ignore'):
+        levels[:, :k] = np.where(found > 0, np.take_along_axis(sums, top, axis=1) / found, np.nan)
+    return levels, touches
+
+class IndicatorEngine:
+    """Rolling indicators for every tracked token, updated one step at a time
+
+    update() appends one sample per token to a (tokens, window) ring of
+    prices and volumes; tokens missing from an update carry their last
+    value forward, so all tokens share one time axis. Each step updates
+    running state for all tokens in a few array operations:
+
+    - SMA and volume mean/variance from running sums (resynced from the
+      ring whenever it wraps, so float error cannot accumulate)
+    - EMA and Wilder-smoothed RSI averages
+
+    Momentum and support/resistance read the ring directly. Indicators
+    are NaN for tokens with fewer samples than their period.
+    """
+
+    def __init__(self, window: int = 200, sma_periods: Iterable[int] = (20, 50),
+                 ema_periods: Iterable[int] = (12, 26), momentum_period: int = 14,
+                 rsi_period: int = 14, volume_window: int = 48):
+        self.sma_periods = tuple(sma_periods)
+        self.ema_periods = tuple(ema_periods)
+        self.momentum_period = momentum_period
+        self.rsi_period = rsi_period
+        self.volume_window = volume_window
+        self.window = max(window, *self.sma_periods, momentum_period + 1, volume_window)
+
+        self.symbols = []
+        self._rows: Dict[str, int] = {}
+        self._head = 0  # Next column to write
+
+        # Per-token state, one row per symbol; grown by doubling
+        self._prices = np.zeros((0, self.window))
+        self._volumes = np.zeros((0, self.window))
+        self._seen = np.zeros(0, dtype=np.int64)
+        self._last_price = np.zeros(0)
+        self._last_volume = np.zeros(0)
+        self._avg_gain = np.zeros(0)
+        self._avg_loss = np.zeros(0)
+        self._vol_sum = np.zeros(0)
+        self._vol_sq = np.zeros(0)
+        self._sma_sum = {p: np.zeros(0) for p in self.sma_periods}
+        self._ema = {p: np.zeros(0) for p in self.ema_periods}
+        self._grow(64)
+
+    def _grow(self, capacity: int):
+        def grow(values: np.ndarray) -> np.ndarray:
+            grown = np.zeros((capacity,) + values.shape[1:], dtype=values.dtype)
+            grown[:len(values)] = values
+            return grown
+
+        for name in ('_prices', '_volumes', '_seen', '_last_price', '_last_volume',
+                     '_avg_gain', '_avg_loss', '_vol_sum', '_vol_sq'):
+            setattr(self, name, grow(getattr(self, name)))
+        self._sma_sum = {p: grow(values) for p, values in self._sma_sum.items()}
+        self._ema = {p: grow(values) for p, values in self._ema.items()}
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def _add(self, symbol: str, price: float, volume: float) -> int:
+        """New row whose history is flat at its first price and volume"""
+        row = len(self.symbols)
+        if row == len(self._seen):
+            self._grow(row * 2)
+        self._rows[symbol] = row
+        self.symbols.append(symbol)
+
+        self._prices[row] = price
+        self._volumes[row] = volume
+        self._last_price[row] = price
+        self._last_volume[row] = volume
+        for p in self.sma_periods:
+            self._sma_sum[p][row] = price * p
+        for p in self.ema_periods:
+            self._ema[p][row] = price
+        self._vol_sum[row] = volume * self.volume_window
+        self._vol_sq[row] = volume * volume * self.volume_window
+        return row
+
+    def update(self, prices: Mapping[str, float], volumes: Mapping[str, float] = None):
+        """Append one step: the given tokens' prices (and volumes); others repeat their last values"""
+        volumes = volumes or {}
+        for symbol, price in prices.items():
+            if symbol not in self._rows:
+                self._add(symbol, float(price), float(volumes.get(symbol, 0.0)))
+
+        n = len(self.symbols)
+        new_price = self._last_price[:n].copy()
+        new_volume = self._last_volume[:n].copy()
+        if prices:
+            rows = np.fromiter((self._rows[s] for s in prices), dtype=np.int64, count=len(prices))
+            new_price[rows] = np.fromiter(prices.values(), dtype=np.float64, count=len(prices))
+        if volumes:
+            known = [s for s in volumes if s in self._rows]
+            rows = np.fromiter((self._rows[s] for s in known), dtype=np.int64, count=len(known))
+            new_volume[rows] = np.fromiter((volumes[s] for s in known), dtype=np.float64, count=len(known))
+        self._push(n, new_price, new_volume)
+
+    def _push(self, n: int, price: np.ndarray, volume: np.ndarray):
+        head, window = self._head, self.window
+        ring = self._prices[:n]
+
+        # Values leaving each running window are read before the column is overwritten
+        for p in self.sma_periods:
+            self._sma_sum[p][:n] += price - ring[:, (head - p) % window]
+        for p in self.ema_periods:
+            ema = self._ema[p][:n]
+            ema += (price - ema) * (2.0 / (p + 1))
+
+        delta = price - self._last_price[:n]
+        self._avg_gain[:n] += (np.maximum(delta, 0) - self._avg_gain[:n]) / self.rsi_period
+        self._avg_loss[:n] += (np.maximum(-delta, 0) - self._avg_loss[:n]) / self.rsi_period
+
+        leaving = self._volumes[:n, (head - self.volume_window) % window]
+        self._vol_sum[:n] += volume - leaving
+        self._vol_sq[:n] += volume * volume - leaving * leaving
+
+        ring[:, head] = price
+        self._volumes[:n, head] = volume
+        self._last_price[:n] = price
+        self._last_volume[:n] = volume
+        self._seen[:n] += 1
+        self._head = (head + 1) % window
+        if self._head == 0:
+            self._resync()
+
+    def _last(self, values: np.ndarray, k: int) -> np.ndarray:
+        """The last k columns of a ring, oldest first"""
+        columns = (self._head - k + np.arange(k)) % self.window
+        return values[:len(self.symbols)][:, columns]
+
+    def _resync(self):
+        """Recompute running sums exactly from the ring"""
+        n = len(self.symbols)
+        for p in self.sma_periods:
+            self._sma_sum[p][:n] = self._last(self._prices, p).sum(axis=1)
+        recent = self._last(self._volumes, self.volume_window)
+        self._vol_sum[:n] = recent.sum(axis=1)
+        self._vol_sq[:n] = (recent * recent).sum(axis=1)
+
+    def _ready(self, values: np.ndarray, samples: int) -> np.ndarray:
+        return np.where(self._seen[:len(self.symbols)] >= samples, values, np.nan)
+
+    def row(self, symbol: str) -> Optional[int]:
+        """Index of symbol in the indicator arrays"""
+        return self._rows.get(symbol)
+
+    def last_price(self) -> np.ndarray:
+        return self._last_price[:len(self.symbols)].copy()
+
+    def sma(self, period: int) -> np.ndarray:
+        return self._ready(self._sma_sum[period][:len(self.symbols)] / period, period)
+
+    def ema(self, period: int) -> np.ndarray:
+        return self._ready(self._ema[period][:len(self.symbols)].copy(), period)
+
+    def momentum(self, period: int = None) -> np.ndarray:
+        """Percent change over the last period samples (first to last)"""
+        period = period or self.momentum_period
+        start = self._last(self._prices, period)[:, 0]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            change = (self._last_price[:len(self.symbols)] - start) / start * 100
+        return self._ready(change, period)
+
+    def rsi(self) -> np.ndarray:
+        n = len(self.symbols)
+        gain, loss = self._avg_gain[:n], self._avg_loss[:n]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            rsi = np.where(loss > 0, 100 - 100 / (1 + gain / loss), np.where(gain > 0, 100.0, 50.0))
+        return self._ready(rsi, self.rsi_period + 1)
+
+    def volume_zscore(self) -> np.ndarray:
+        """How many standard deviations the latest volume is from the window mean"""
+        n = len(self.symbols)
+        mean = self._vol_sum[:n] / self.volume_window
+        variance = np.maximum(self._vol_sq[:n] / self.volume_window - mean * mean, 0)
+        std = np.sqrt(variance)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            z = np.where(std > 0, (self._last_volume[:n] - mean) / std, 0.0)
+        return self._ready(z, self.volume_window)
+
+    def support_resistance(self, num_levels: int = 3, bins: int = 50) -> Tuple[np.ndarray, np.ndarray]:
+        """support_resistance_levels() over each token's samples in the ring"""
+        n = len(self.symbols)
+        prices = self._last(self._prices, self.window)
+        # Columns older than a token's first sample hold filler, not data
+        age = np.arange(self.window - 1, -1, -1)
+        valid = age[None, :] < self._seen[:n, None]
+        return support_resistance_levels(prices, valid, num_levels, bins)
@@ -2,8 +2,30 @@
 Market analysis functionality for Elion
 """
 
-from typing import Dict, List, Optional
+from typing import Dict, List, Mapping, Optional
+import numpy as np
 import requests
+from .indicators import IndicatorEngine, support_resistance_levels
+
+# Volume z-scores beyond these mark unusually high or low volume
+VOLUME_Z_HIGH = 2.0
+VOLUME_Z_LOW = -1.0
+
+def _classify_trend(short_ma, long_ma):
+    """Trend labels and confidences for short/long moving averages (scalars or arrays)"""
+    short_ma, long_ma = np.asarray(short_ma), np.asarray(long_ma)
+    trend = np.select([short_ma > long_ma * 1.05, short_ma < long_ma * 0.95], ['bullish', 'bearish'], 'neutral')
+    return trend, np.where(trend == 'neutral', 0.5, 0.8)
+
+def _classify_momentum(momentum):
+    """Momentum signals and confidences for percent changes (scalar or array)"""
+    momentum = np.asarray(momentum)
+    conditions = [momentum > 10, momentum > 5, momentum < -10, momentum < -5]
+    signal = np.select(conditions, ['strong_bullish', 'bullish', 'strong_bearish', 'bearish'], 'neutral')
+    return signal, np.select(conditions, [0.8, 0.7, 0.8, 0.7], 0.5)
+
+def _float(value) -> Optional[float]:
+    return None if np.isnan(value) else float(value)
 
 class MarketAnalyzer:
     """Analyzes market data and trends"""
@@ -13,6 +35,51 @@ class MarketAnalyzer:
         self.api_key = api_key
         self.base_url = "https://api.cryptorank.io/v1"
         
+        # Rolling indicators over every tracked token's price series
+        self.indicators = IndicatorEngine()
+        
+    def track_prices(self, prices: Mapping[str, float], volumes: Optional[Mapping[str, float]] = None) -> None:
+        """Add one sample per token to the indicator engine"""
+        self.indicators.update(prices, volumes)
+        
+    def analyze_tracked_tokens(self, num_levels: int = 3) -> Dict[str, Dict]:
+        """Technical signals for every tracked token, computed in one vectorized pass"""
+        try:
+            engine = self.indicators
+            if not len(engine):
+                return {}
+                
+            trend, trend_confidence = _classify_trend(engine.sma(20), engine.sma(50))
+            momentum = engine.momentum()
+            signal, momentum_confidence = _classify_momentum(momentum)
+            rsi = engine.rsi()
+            volume_z = engine.volume_zscore()
+            pattern = np.select([volume_z > VOLUME_Z_HIGH, volume_z < VOLUME_Z_LOW],
+                                ['high_volume', 'low_volume'], 'normal')
+            levels, touches = engine.support_resistance(num_levels)
+            last = engine.last_price()
+            
+            return {
+                symbol: {
+                    'trend': str(trend[i]),
+                    'momentum': str(signal[i]),
+                    'momentum_pct': _float(momentum[i]),
+                    'rsi': _float(rsi[i]),
+                    'volume_zscore': _float(volume_z[i]),
+                    'volume_pattern': str(pattern[i]),
+                    'levels': [
+                        ('support' if level < last[i] else 'resistance', float(level))
+                        for level, count in zip(levels[i], touches[i]) if count
+                    ],
+                    'confidence': float(trend_confidence[i] * 0.5 + momentum_confidence[i] * 0.5)
+                }
+                for i, symbol in enumerate(engine.symbols)
+            }
+            
+        except Exception as e:
+            print(f"Error analyzing tracked tokens: {e}")
+            return {}
+        
     def get_current_data(self) -> Dict:
         """Get current market data"""
         try:
@@ -161,15 +228,9 @@ class MarketAnalyzer:
             if len(prices) < long_period:
                 return {'trend': 'neutral', 'confidence': 0.5}
                 
-            short_ma = sum(prices[-short_period:]) / short_period
-            long_ma = sum(prices[-long_period:]) / long_period
-            
-            if short_ma > long_ma * 1.05:
-                return {'trend': 'bullish', 'confidence': 0.8}
-            elif short_ma < long_ma * 0.95:
-                return {'trend': 'bearish', 'confidence': 0.8}
-            else:
-                return {'trend': 'neutral', 'confidence': 0.5}
+            prices = np.asarray(prices, dtype=np.float64)
+            trend, confidence = _classify_trend(prices[-short_period:].mean(), prices[-long_period:].mean())
+            return {'trend': str(trend), 'confidence': float(confidence)}
                 
         except Exception as e:
             print(f"Error in MA analysis: {e}")
@@ -181,8 +242,9 @@ class MarketAnalyzer:
             if len(volume) < 24:
                 return {'pattern': 'normal', 'confidence': 0.5}
                 
-            avg_volume = sum(volume[:-24]) / (len(volume) - 24)
-            recent_volume = sum(volume[-24:]) / 24
+            volume = np.asarray(volume, dtype=np.float64)
+            avg_volume = volume[:-24].mean() if len(volume) > 24 else np.nan
+            recent_volume = volume[-24:].mean()
             
             if recent_volume > avg_volume * 2:
                 return {'pattern': 'high_volume', 'confidence': 0.7}
@@ -201,16 +263,12 @@ class MarketAnalyzer:
             if len(prices) < 100:
                 return {'levels': [], 'confidence': 0.5}
                 
-            # Simple implementation - use local mins/maxs
-            levels = []
-            for i in range(1, len(prices) - 1):
-                if prices[i] > prices[i-1] and prices[i] > prices[i+1]:
-                    levels.append(('resistance', prices[i]))
-                elif prices[i] < prices[i-1] and prices[i] < prices[i+1]:
-                    levels.append(('support', prices[i]))
-                    
-            # Sort by frequency of price levels
-            levels = sorted(levels, key=lambda x: prices.count(x[1]), reverse=True)[:num_levels]
+            # Price bands with the most local highs and lows, below or above the last price
+            found, touches = support_resistance_levels(np.asarray(prices, dtype=np.float64), num_levels=num_levels)
+            levels = [
+                ('support' if level < prices[-1] else 'resistance', float(level))
+                for level, count in zip(found[0], touches[0]) if count
+            ]
             
             return {
                 'levels': levels,
@@ -228,17 +286,8 @@ class MarketAnalyzer:
                 return {'signal': 'neutral', 'confidence': 0.5}
                 
             momentum = (prices[-1] - prices[-period]) / prices[-period] * 100
-            
-            if momentum > 10:
-                return {'signal': 'strong_bullish', 'confidence': 0.8}
-            elif momentum > 5:
-                return {'signal': 'bullish', 'confidence': 0.7}
-            elif momentum < -10:
-                return {'signal': 'strong_bearish', 'confidence': 0.8}
-            elif momentum < -5:
-                return {'signal': 'bearish', 'confidence': 0.7}
-            else:
-                return {'signal': 'neutral', 'confidence': 0.5}
+            signal, confidence = _classify_momentum(momentum)
+            return {'signal': str(signal), 'confidence': float(confidence)}
                 
         except Exception as e:
             print(f"Error calculating momentum: {e}")
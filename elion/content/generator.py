@@ -7,6 +7,15 @@ import random
 from datetime import datetime
 from strategies.portfolio_tracker import PortfolioTracker
 from elion.content.tweet_formatters import TweetFormatters  # Fixed import path
+from custom_llm import FALLBACK_POST, POST_SYSTEM_MESSAGE
+from llm_metrics import FALLBACK, OK, llm_metrics
+
+def _instrumented(name: str):
+    """Record latency per generator method; empty or canned LLM output counts as a fallback"""
+    return llm_metrics.instrument(
+        f'content_generator.{name}',
+        classify=lambda tweet: OK if tweet and tweet != FALLBACK_POST else FALLBACK
+    )
 
 class ContentGenerator:
     def __init__(self, portfolio: PortfolioTracker, llm: Any):
@@ -56,6 +65,7 @@ class ContentGenerator:
         except (ValueError, TypeError):
             return False
             
+    @_instrumented('generate_ai_mystique')
     def generate_ai_mystique(self, market_data: Dict) -> str:
         """Generate AI mystique tweet showing pattern detection"""
         try:
@@ -104,6 +114,7 @@ class ContentGenerator:
             print(f"Error in generate_ai_mystique: {e}")
             return self._generate_general_mystique()
         
+    @_instrumented('generate_performance_post')
     def generate_performance_post(self, trade_data: Dict) -> str:
         """Generate performance tweet for completed trade or market update"""
         
@@ -147,6 +158,7 @@ class ContentGenerator:
         
         return self.llm.generate_post(prompt)
         
+    @_instrumented('generate_summary_post')
     def generate_summary_post(self) -> str:
         """Generate daily summary tweet"""
         summary = self.portfolio.get_daily_summary()
@@ -196,6 +208,7 @@ class ContentGenerator:
         
         return self.llm.generate_post(prompt)
         
+    @_instrumented('generate_first_day_mystique')
     def generate_first_day_mystique(self) -> str:
         """Generate first day AI mystique tweet"""
         prompt = """
@@ -209,6 +222,7 @@ class ContentGenerator:
         """
         return self.llm.generate_post(prompt)
         
+    @_instrumented('generate_first_day_intro')
     def generate_first_day_intro(self) -> str:
         """Generate first day introduction tweet"""
         prompt = f"""
@@ -221,6 +235,7 @@ class ContentGenerator:
         """
         return self.llm.generate_post(prompt)
 
+    @_instrumented('generate')
     def generate(self, tweet_type: str) -> str:
         """Generate tweet content based on type"""
         if tweet_type == 'self_aware':
@@ -318,9 +333,19 @@ class ContentGenerator:
                 """
             
             # Generate tweet and ensure character limit
-            tweet = self.llm.generate_post(prompt)
-            while len(tweet) < 240 or len(tweet) > 280:
-                tweet = self.llm.generate_post(prompt)
+            in_range = lambda text: 240 <= len(text) <= 280
+            if hasattr(self.llm, 'generate_first_valid'):
+                # Race candidates and keep the first one that fits
+                tweet = self.llm.generate_first_valid(prompt, candidates=3, validator=in_range, max_tokens=100,
+                                                      system_message=POST_SYSTEM_MESSAGE)
+                return tweet or self._generate_general_mystique()
+            
+            # Out-of-range replies are not cached, and retries bypass the cache entirely
+            tweet = self.llm.generate_post(prompt, validator=in_range)
+            for _ in range(2):
+                if in_range(tweet):
+                    break
+                tweet = self.llm.generate_post(prompt, use_cache=False)
             return tweet
         elif tweet_type == 'market_analysis':
             return self._generate_analysis_post()
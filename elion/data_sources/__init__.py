@@ -14,7 +14,9 @@ from .market_analysis import MarketAnalysisService
 Data sources coordinator for Elion
 """
 
-from typing import Dict, Optional, Any
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional
+import threading
 
 __all__ = [
     'DataSources',
@@ -28,7 +30,13 @@ __all__ = [
 ]
 
 class DataSources:
-    """Coordinator for all data sources"""
+    """Coordinator for all data sources
+    
+    Inside a cycle() block the market snapshot and each analysis of it
+    are computed once and shared by every call in the block. Callers wrap
+    one content cycle's lookups in cycle() to get one fetch and one
+    analysis pass; outside a cycle every call computes its result afresh.
+    """
     
     def __init__(self, llm, cryptorank_api_key: Optional[str] = None):
         """Initialize all data sources"""
@@ -43,17 +51,45 @@ class DataSources:
         self.news_data = NewsDataSource()
         self.shill_data = ShillDataSource(self.cryptorank_api, llm)
         
+        # Per-thread memo of the open cycle, None outside one
+        self._local = threading.local()
+        
+    @contextmanager
+    def cycle(self) -> Iterator[None]:
+        """Share market data and analyses across the calls in the block
+        
+        A cycle opened inside another one joins it.
+        """
+        if getattr(self._local, 'memo', None) is not None:
+            yield
+            return
+            
+        self._local.memo = {}
+        try:
+            yield
+        finally:
+            self._local.memo = None
+            
+    def _memoized(self, key: str, compute: Callable[[], Any]) -> Any:
+        """compute() once per cycle"""
+        memo = getattr(self._local, 'memo', None)
+        if memo is None:
+            return compute()
+        if key not in memo:
+            memo[key] = compute()
+        return memo[key]
+        
     def get_market_data(self):
         """Get market data"""
-        return self.market_data.get_market_data()
+        return self._memoized('market_data', self.market_data.get_market_data)
         
     def get_market_alpha(self):
         """Get market alpha data and analysis"""
-        data = self.market_data.get_market_data()
+        data = self.get_market_data()
         if not data:
             return None
             
-        analysis = self.market_analysis.analyze_market_conditions(data)
+        analysis = self.analyze_market_conditions()
         return {
             'market_data': data,
             'analysis': analysis
@@ -97,29 +133,31 @@ class DataSources:
         
     def analyze_market_conditions(self):
         """Analyze market conditions"""
-        data = self.market_data.get_market_data()
-        return self.market_analysis.analyze_market_conditions(data)
+        return self._memoized(
+            'market_conditions',
+            lambda: self.market_analysis.analyze_market_conditions(self.get_market_data())
+        )
         
     def analyze_market_sentiment(self) -> Dict:
         """Analyze market sentiment"""
-        data = self.market_data.get_market_data()
+        data = self.get_market_data()
         if not data:
             return {'overall': 'NEUTRAL', 'confidence': 0}
             
-        return self.market_analysis.analyze_market_sentiment(data)
+        return self._memoized('market_sentiment', lambda: self.market_analysis.analyze_market_sentiment(data))
         
     def get_market_insights(self) -> list:
         """Get market insights"""
-        data = self.market_data.get_market_data()
+        data = self.get_market_data()
         if not data:
             return []
             
-        return self.market_analysis.get_market_insights(data)
+        return self._memoized('market_insights', lambda: self.market_analysis.get_market_insights(data))
         
     def get_market_predictions(self) -> Dict:
         """Get market predictions"""
-        data = self.market_data.get_market_data()
+        data = self.get_market_data()
         if not data:
             return {}
             
-        return self.market_analysis.get_market_predictions(data)
+        return self._memoized('market_predictions', lambda: self.market_analysis.get_market_predictions(data))
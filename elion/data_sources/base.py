@@ -2,41 +2,53 @@
 Base classes for data sources
 """
 
-from datetime import datetime, timedelta
-from typing import Dict, Optional, Any
+from datetime import timedelta
+from typing import Callable, Dict, Optional, Any
 from abc import ABC, abstractmethod
+from .cache import DataCache, data_cache
 
 class BaseDataSource(ABC):
-    """Base class for all data sources"""
+    """Base class for all data sources
     
-    def __init__(self):
+    Results are cached in the shared DataCache under the source's class
+    name. cache_durations sets each key's TTL (default 5 minutes);
+    stale_durations how long after that an expired value is still served
+    while it reloads in the background (default: one more TTL).
+    """
+    
+    DEFAULT_CACHE_DURATION = timedelta(minutes=5)
+    
+    def __init__(self, cache: DataCache = None):
         """Initialize base data source"""
-        self.cache = {}
-        self.cache_durations = {}
+        self.cache = cache or data_cache
+        self.cache_name = type(self).__name__
+        self.cache_durations: Dict[str, timedelta] = {}
+        self.stale_durations: Dict[str, timedelta] = {}
+    
+    def _durations(self, key: str):
+        duration = self.cache_durations.get(key, self.DEFAULT_CACHE_DURATION)
+        stale = self.stale_durations.get(key, duration)
+        return duration.total_seconds(), stale.total_seconds()
+    
+    def _get_or_load(self, key: str, loader: Callable[[], Any]) -> Any:
+        """Cached data for key, loading it with loader on a miss
         
+        Concurrent misses share one load, and loader errors propagate to
+        every waiting caller. Empty results are returned but not cached,
+        so the next call tries again.
+        """
+        ttl, stale = self._durations(key)
+        return self.cache.get_or_load(self.cache_name, key, loader, ttl, stale, keep=bool)
+    
     def _get_cached(self, key: str) -> Optional[Any]:
         """Get cached data if available and not expired"""
-        if key not in self.cache:
-            return None
-            
-        cache_data = self.cache[key]
-        if not cache_data or 'timestamp' not in cache_data:
-            return None
-            
-        # Check if cache has expired
-        duration = self.cache_durations.get(key, timedelta(minutes=5))
-        if datetime.now() - cache_data['timestamp'] > duration:
-            return None
-            
-        return cache_data.get('data')
-        
+        return self.cache.get(self.cache_name, key)
+    
     def _cache_data(self, key: str, data: Any):
-        """Cache data with timestamp"""
-        self.cache[key] = {
-            'data': data,
-            'timestamp': datetime.now()
-        }
-        
+        """Cache data under the key's durations"""
+        ttl, stale = self._durations(key)
+        self.cache.put(self.cache_name, key, data, ttl, stale)
+    
     @abstractmethod
     def _validate_data(self, data: Any) -> bool:
         """Validate data before caching"""
@@ -0,0 +1,178 @@
+"""
+Shared TTL + LRU cache for data sources
+"""
+
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+import logging
+import os
+import threading
+import time
+from ops_metrics import DATA_CACHE
+
+logger = logging.getLogger(__name__)
+
+class _Flight:
+    """One in-progress load that concurrent callers wait on"""
+
+    __slots__ = ('done', 'value', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error: Optional[BaseException] = None
+
+class DataCache:
+    """Thread-safe TTL + LRU cache shared by all data sources
+
+    Entries are keyed by (source, key). get_or_load() is the read path:
+
+    - fresh entries are returned as they are ('hit')
+    - entries past their TTL but within their stale window are returned
+      while one background thread reloads them ('stale')
+    - on a miss the first caller runs the loader and concurrent callers
+      for the same key wait for its result instead of loading again
+      ('miss' and 'shared'); a loader error is raised in all of them
+
+    Past max_entries the least recently used entry is evicted. Lookups
+    are counted per source in elai_data_cache_total.
+    """
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        # (source, key) -> (fresh_until, stale_until, value), on the monotonic clock
+        self._entries: "OrderedDict[Tuple[str, Hashable], tuple]" = OrderedDict()
+        self._flights: Dict[Tuple[str, Hashable], _Flight] = {}
+        self._sources = set()
+        self._lock = threading.Lock()
+
+    def _count(self, source: str, result: str):
+        self._sources.add(source)
+        DATA_CACHE.inc(source, result)
+
+    def get(self, source: str, key: Hashable) -> Optional[Any]:
+        """Fresh cached value or None; never loads"""
+        with self._lock:
+            entry = self._entries.get((source, key))
+            if entry is None or entry[0] <= time.monotonic():
+                self._count(source, 'miss')
+                return None
+            self._entries.move_to_end((source, key))
+            self._count(source, 'hit')
+            return entry[2]
+
+    def put(self, source: str, key: Hashable, value: Any, ttl: float, stale: float = 0):
+        """Store value as fresh for ttl seconds and servable stale for stale seconds after that"""
+        with self._lock:
+            self._store((source, key), value, ttl, stale)
+
+    def _store(self, full_key: Tuple[str, Hashable], value: Any, ttl: float, stale: float):
+        now = time.monotonic()
+        self._entries[full_key] = (now + ttl, now + ttl + stale, value)
+        self._entries.move_to_end(full_key)
+        while len(self._entries) > self.max_entries:
+            (source, _), _ = self._entries.popitem(last=False)
+            self._count(source, 'evicted')
+
+    def invalidate(self, source: str, key: Hashable = None):
+        """Drop one key, or every key of the source"""
+        with self._lock:
+            if key is not None:
+                self._entries.pop((source, key), None)
+                return
+            for full_key in [k for k in self._entries if k[0] == source]:
+                del self._entries[full_key]
+
+    def get_or_load(self, source: str, key: Hashable, loader: Callable[[], Any], ttl: float,
+                    stale: float = 0, keep: Callable[[Any], bool] = None) -> Any:
+        """Cached value for key, running loader at most once at a time to fill it
+
+        Args:
+            loader: Produces the value; called without arguments
+            ttl: Seconds a loaded value is fresh
+            stale: Seconds after ttl the value is still served while it reloads
+            keep: Whether a loaded value is cached (default: any value)
+        """
+        full_key = (source, key)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(full_key)
+            if entry is not None:
+                fresh_until, stale_until, value = entry
+                if now < fresh_until:
+                    self._entries.move_to_end(full_key)
+                    self._count(source, 'hit')
+                    return value
+                if now < stale_until:
+                    self._entries.move_to_end(full_key)
+                    self._count(source, 'stale')
+                    if full_key not in self._flights:
+                        flight = self._flights[full_key] = _Flight()
+                        threading.Thread(
+                            target=self._refresh, args=(full_key, flight, loader, ttl, stale, keep),
+                            name=f'cache-refresh-{source}', daemon=True
+                        ).start()
+                    return value
+                del self._entries[full_key]
+
+            flight = self._flights.get(full_key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[full_key] = _Flight()
+            self._count(source, 'miss' if leader else 'shared')
+
+        if leader:
+            return self._load(full_key, flight, loader, ttl, stale, keep)
+
+        flight.done.wait()
+        if flight.error is not None:
+            raise flight.error
+        return flight.value
+
+    def _load(self, full_key, flight: _Flight, loader, ttl, stale, keep) -> Any:
+        try:
+            flight.value = loader()
+        except BaseException as e:
+            flight.error = e
+            self._count(full_key[0], 'load_error')
+            raise
+        finally:
+            with self._lock:
+                if flight.error is None and (keep is None or keep(flight.value)):
+                    self._store(full_key, flight.value, ttl, stale)
+                del self._flights[full_key]
+            flight.done.set()
+        return flight.value
+
+    def _refresh(self, full_key, flight: _Flight, loader, ttl, stale, keep):
+        """Background reload of a stale entry; on failure the stale value keeps being served"""
+        try:
+            self._load(full_key, flight, loader, ttl, stale, keep)
+        except Exception as e:
+            logger.warning(f"Background refresh of {full_key[0]} {full_key[1]!r} failed: {e}")
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per source: entry count and lookup counts by result"""
+        with self._lock:
+            sizes: Dict[str, int] = {}
+            for source, _ in self._entries:
+                sizes[source] = sizes.get(source, 0) + 1
+            sources = sorted(self._sources)
+
+        stats = {}
+        for source in sources:
+            counts = {
+                result: int(DATA_CACHE.value(source, result))
+                for result in ('hit', 'stale', 'miss', 'shared', 'load_error', 'evicted')
+            }
+            lookups = counts['hit'] + counts['stale'] + counts['miss'] + counts['shared']
+            served = counts['hit'] + counts['stale']
+            stats[source] = {
+                'size': sizes.get(source, 0),
+                **counts,
+                'hit_rate': round(served / lookups, 4) if lookups else 0.0
+            }
+        return stats
+
+# Process-wide cache used by every BaseDataSource (DATA_CACHE_SIZE entries)
+data_cache = DataCache(max_entries=int(os.getenv('DATA_CACHE_SIZE', 512)))
@@ -84,23 +84,16 @@ class MarketDataSource(BaseDataSource):
             
     def get_market_data(self) -> List[Dict]:
         """Get current market data"""
-        # Check cache first
-        cached = self._get_cached('market_data')
-        if cached:
-            return cached
-            
-        # Fetch fresh data
+        return self._get_or_load('market_data', self._load_market_data)
+        
+    def _load_market_data(self) -> List[Dict]:
+        """Fetch tokens and keep the valid ones"""
         tokens = self.cryptorank_api.fetch_tokens()
         if not tokens:
             return []
             
         # Validate tokens
-        valid_tokens = self._validate_data(tokens)
-        if valid_tokens:
-            self._set_cached('market_data', valid_tokens)
-            return valid_tokens
-            
-        return []
+        return self._validate_data(tokens)
         
     def get_market_sentiment(self, btc_data: Dict) -> str:
         """Determine market sentiment based on BTC performance"""
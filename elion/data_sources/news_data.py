@@ -2,11 +2,31 @@
 News data source for Elion
 """
 
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any
+import calendar
+import heapq
+import threading
 import feedparser
+import requests
+from keyword_matcher import WORD, KeywordMatcher
 from .base import BaseDataSource
 
+# Key topics counted in news titles and summaries; plurals count ("NFTs", "wallets")
+NEWS_TOPICS = KeywordMatcher({
+    'bitcoin': ['bitcoin'],
+    'ethereum': ['ethereum'],
+    'defi': ['defi'],
+    'nft': ['nft'],
+    'regulation': ['regulation'],
+    'sec': [('sec', WORD)],  # Not "second" or "security"
+    'altcoin': ['altcoin'],
+    'mining': ['mining'],
+    'wallet': ['wallet'],
+    'exchange': ['exchange']
+})
+
 class NewsDataSource(BaseDataSource):
     """News data source"""
     
@@ -35,6 +55,17 @@ class NewsDataSource(BaseDataSource):
             'https://www.livebitcoinnews.com/feed'
         ]
         
+        # Concurrent conditional fetching
+        self.max_workers = 10
+        self.feed_timeout = 10  # seconds
+        self.entries_per_feed = 50
+        self.session = requests.Session()
+        self.session.headers['User-Agent'] = 'Mozilla/5.0 (compatible; ELAI news reader)'
+        
+        # Per-feed validators and parsed entries: url -> {'etag', 'modified', 'entries'}
+        self._feeds: Dict[str, Dict] = {}
+        self._feeds_lock = threading.Lock()
+        
     def _validate_data(self, data: Any) -> bool:
         """Validate news data"""
         if not isinstance(data, (list, dict)):
@@ -42,114 +73,139 @@ class NewsDataSource(BaseDataSource):
         return True
         
     def get_latest_news(self, limit: int = 10) -> List[Dict]:
-        """Get latest crypto news"""
-        # Check cache first
-        cached = self._get_cached('latest_news')
-        if cached:
-            return cached[:limit]
-            
+        """Get latest crypto news, newest first"""
         try:
-            all_news = []
-            for feed_url in self.news_feeds:
-                try:
-                    feed = feedparser.parse(feed_url)
-                    
-                    for entry in feed.entries[:limit]:
-                        news_item = {
-                            'title': entry.title,
-                            'link': entry.link,
-                            'summary': entry.get('summary', ''),
-                            'published': entry.get('published', ''),
-                            'source': feed.feed.title
-                        }
-                        all_news.append(news_item)
-                        
-                except Exception as e:
-                    print(f"Error parsing feed {feed_url}: {e}")
-                    continue
-                    
-            # Sort by publication date
-            all_news.sort(key=lambda x: x['published'], reverse=True)
-            
-            # Cache and return
-            self._cache_data('latest_news', all_news)
-            return all_news[:limit]
+            return self._get_or_load('latest_news', self.refresh_feeds)[:limit]
             
         except Exception as e:
             print(f"Error getting latest news: {e}")
             return []
             
-    def get_trending_topics(self) -> List[Dict]:
-        """Get trending crypto topics from news"""
-        # Check cache first
-        cached = self._get_cached('trending_topics')
-        if cached:
-            return cached
+    def refresh_feeds(self) -> List[Dict]:
+        """Fetch all feeds concurrently and merge their entries by publish time
+        
+        Each feed is requested with the ETag/Last-Modified it last returned,
+        so unchanged feeds answer 304 and keep their parsed entries. A feed
+        that fails keeps serving its previous entries.
+        """
+        workers = min(self.max_workers, len(self.news_feeds)) or 1
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            states = list(pool.map(self._refresh_feed, self.news_feeds))
             
-        try:
-            # Get latest news
-            news = self.get_latest_news(limit=50)
+        # Every feed's entries are already newest first, so a k-way merge keeps the order
+        merged = heapq.merge(
+            *(state['entries'] for state in states if state),
+            key=lambda entry: entry[0], reverse=True
+        )
+        return [item for _, item in merged]
+        
+    def _refresh_feed(self, feed_url: str) -> Optional[Dict]:
+        """Conditionally fetch one feed, reparsing only when it changed"""
+        with self._feeds_lock:
+            state = self._feeds.get(feed_url)
             
-            # Extract topics and count mentions
-            topics = {}
-            for item in news:
-                title = item['title'].lower()
-                summary = item['summary'].lower()
+        headers = {}
+        if state:
+            if state.get('etag'):
+                headers['If-None-Match'] = state['etag']
+            if state.get('modified'):
+                headers['If-Modified-Since'] = state['modified']
                 
-                # Check for key topics
-                key_topics = ['bitcoin', 'ethereum', 'defi', 'nft', 'regulation',
-                            'sec', 'altcoin', 'mining', 'wallet', 'exchange']
-                            
-                for topic in key_topics:
-                    if topic in title or topic in summary:
-                        topics[topic] = topics.get(topic, 0) + 1
-                        
-            # Convert to list and sort by count
-            trending = [
-                {'topic': topic, 'mentions': count}
-                for topic, count in topics.items()
-            ]
-            trending.sort(key=lambda x: x['mentions'], reverse=True)
+        try:
+            response = self.session.get(feed_url, headers=headers, timeout=self.feed_timeout)
+            if response.status_code == 304 and state:
+                return state
+            response.raise_for_status()
             
-            # Cache and return
-            self._cache_data('trending_topics', trending)
-            return trending
+            feed = feedparser.parse(response.content)
+            source = feed.feed.get('title', feed_url)
+            entries = []
+            for entry in feed.entries[:self.entries_per_feed]:
+                news_item = {
+                    'title': entry.title,
+                    'link': entry.link,
+                    'summary': entry.get('summary', ''),
+                    'published': entry.get('published', ''),
+                    'source': source
+                }
+                entries.append((_published_ts(entry), news_item))
+            entries.sort(key=lambda entry: entry[0], reverse=True)
+            
+            state = {
+                'etag': response.headers.get('ETag'),
+                'modified': response.headers.get('Last-Modified'),
+                'entries': entries
+            }
+            with self._feeds_lock:
+                self._feeds[feed_url] = state
+            return state
+            
+        except Exception as e:
+            print(f"Error parsing feed {feed_url}: {e}")
+            return state
+            
+    def get_trending_topics(self) -> List[Dict]:
+        """Get trending crypto topics from news"""
+        try:
+            return self._get_or_load('trending_topics', self._load_trending_topics)
             
         except Exception as e:
             print(f"Error getting trending topics: {e}")
             return []
             
+    def _load_trending_topics(self) -> List[Dict]:
+        """Topic mention counts over the latest news"""
+        # Get latest news
+        news = self.get_latest_news(limit=50)
+        
+        # Extract topics and count mentions (once per item)
+        topics = {}
+        for item in news:
+            for topic in NEWS_TOPICS.labels(item['title'], item['summary']):
+                topics[topic] = topics.get(topic, 0) + 1
+                    
+        # Convert to list and sort by count
+        trending = [
+            {'topic': topic, 'mentions': count}
+            for topic, count in topics.items()
+        ]
+        trending.sort(key=lambda x: x['mentions'], reverse=True)
+        
+        return trending
+        
     def get_market_events(self) -> List[Dict]:
         """Get significant market events from news"""
-        # Check cache first
-        cached = self._get_cached('market_events')
-        if cached:
-            return cached
-            
         try:
-            # Get latest news
-            news = self.get_latest_news(limit=20)
-            
-            # Filter for market-moving events
-            events = []
-            key_terms = ['crash', 'surge', 'rally', 'dump', 'hack', 'scam',
-                        'partnership', 'launch', 'listing', 'delisting',
-                        'regulation', 'ban', 'approval']
-                        
-            for item in news:
-                title = item['title'].lower()
-                if any(term in title for term in key_terms):
-                    events.append({
-                        'title': item['title'],
-                        'link': item['link'],
-                        'source': item['source'],
-                        'published': item['published']
-                    })
-                    
-            # Cache and return
-            self._cache_data('market_events', events)
-            return events
+            return self._get_or_load('market_events', self._load_market_events)
             
         except Exception as e:
             print(f"Error getting market events: {e}")
             return []
+            
+    def _load_market_events(self) -> List[Dict]:
+        """Latest news items mentioning market-moving terms"""
+        # Get latest news
+        news = self.get_latest_news(limit=20)
+        
+        # Filter for market-moving events
+        events = []
+        key_terms = ['crash', 'surge', 'rally', 'dump', 'hack', 'scam',
+                    'partnership', 'launch', 'listing', 'delisting',
+                    'regulation', 'ban', 'approval']
+                    
+        for item in news:
+            title = item['title'].lower()
+            if any(term in title for term in key_terms):
+                events.append({
+                    'title': item['title'],
+                    'link': item['link'],
+                    'source': item['source'],
+                    'published': item['published']
+                })
+                
+        return events
+
+def _published_ts(entry) -> float:
+    """Entry publish (or update) time as a UTC timestamp, 0 when the feed gives none"""
+    parsed = entry.get('published_parsed') or entry.get('updated_parsed')
+    return calendar.timegm(parsed) if parsed else 0.0
@@ -7,6 +7,7 @@ from typing import Dict, List, Optional, Any
 from .base import BaseDataSource
 from .cryptorank_api import CryptoRankAPI
 from custom_llm import MetaLlamaComponent
+from llm_metrics import llm_metrics
 
 class ShillDataSource(BaseDataSource):
     """Handles shill opportunities and reviews"""
@@ -31,77 +32,70 @@ class ShillDataSource(BaseDataSource):
         
     def get_shill_opportunities(self) -> List[Dict]:
         """Get potential shill opportunities"""
-        # Check cache first
-        cached = self._get_cached('shill_opportunities')
-        if cached:
-            return cached
-            
         try:
-            # Get market data
-            market_data = self.cryptorank_api.get_currencies()
-            if not market_data:
-                return []
-                
-            # Filter for potential opportunities
-            opportunities = []
-            for coin in market_data:
-                # Skip stablecoins
-                if self._is_stablecoin(coin):
-                    continue
-                    
-                mcap = coin.get('market_cap', 0)
-                if mcap > 500e6:  # Skip coins with mcap > $500M
-                    continue
-                    
-                # Look for strong fundamentals
-                volume = coin.get('volume_24h', 0)
-                holders = coin.get('holders', 0)
-                
-                if volume > 1e6 and holders > 1000:
-                    opportunities.append({
-                        'symbol': coin['symbol'],
-                        'name': coin['name'],
-                        'price': coin['price'],
-                        'market_cap': mcap,
-                        'volume_24h': volume,
-                        'holders': holders,
-                        'opportunity_type': 'fundamental_growth'
-                    })
-                    
-            # Cache and return
-            self._cache_data('shill_opportunities', opportunities)
-            return opportunities
+            return self._get_or_load('shill_opportunities', self._load_shill_opportunities)
             
         except Exception as e:
             print(f"Error getting shill opportunities: {e}")
             return []
             
+    def _load_shill_opportunities(self) -> List[Dict]:
+        """Liquid, widely held coins under $500M market cap"""
+        # Get market data
+        market_data = self.cryptorank_api.get_currencies()
+        if not market_data:
+            return []
+            
+        # Filter for potential opportunities
+        opportunities = []
+        for coin in market_data:
+            # Skip stablecoins
+            if self._is_stablecoin(coin):
+                continue
+                
+            mcap = coin.get('market_cap', 0)
+            if mcap > 500e6:  # Skip coins with mcap > $500M
+                continue
+                
+            # Look for strong fundamentals
+            volume = coin.get('volume_24h', 0)
+            holders = coin.get('holders', 0)
+            
+            if volume > 1e6 and holders > 1000:
+                opportunities.append({
+                    'symbol': coin['symbol'],
+                    'name': coin['name'],
+                    'price': coin['price'],
+                    'market_cap': mcap,
+                    'volume_24h': volume,
+                    'holders': holders,
+                    'opportunity_type': 'fundamental_growth'
+                })
+                
+        return opportunities
+        
     def get_shill_review(self, symbol: str) -> Dict:
         """Get shill review data for a token"""
         cache_key = f'shill_review_{symbol}'
         
-        # Check cache first
-        cached = self._get_cached(cache_key)
-        if cached:
-            return cached
-            
         try:
-            # Get token data
-            token_data = self.cryptorank_api.get_currency(symbol)
-            if not token_data:
-                return {}
-                
-            # Generate review using LLM
-            review = self._generate_shill_review(token_data)
-            
-            # Cache and return
-            self._cache_data(cache_key, review)
-            return review
+            return self._get_or_load(cache_key, lambda: self._load_shill_review(symbol))
             
         except Exception as e:
             print(f"Error getting shill review: {e}")
             return {}
             
+    def _load_shill_review(self, symbol: str) -> Dict:
+        """LLM review of the token's current data"""
+        # Get token data
+        token_data = self.cryptorank_api.get_currency(symbol)
+        if not token_data:
+            return {}
+            
+        # Generate review using LLM
+        return self._generate_shill_review(token_data)
+        
+    @llm_metrics.instrument('shill_data.generate_shill_review')
     def _generate_shill_review(self, token_data: Dict) -> Dict:
         """Generate a shill review using LLM"""
         try:
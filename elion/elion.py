@@ -25,6 +25,7 @@ from strategies.volume_strategy import VolumeStrategy
 from strategies.portfolio_tracker import PortfolioTracker
 from strategies.token_monitor import TokenMonitor  # Fixed import path
 from strategies.token_history_tracker import TokenHistoryTracker
+from tracing import tracer
 
 class Elion:
     """ELAI Agent for Crypto Twitter - Core functionality"""
@@ -300,6 +301,7 @@ class Elion:
             logger.error(f"Error generating tweet: {e}")
             return None
 
+    @tracer.spanned('format')
     def format_tweet(self, tweet_type: str, market_data: Dict, variant: str = 'A') -> Optional[str]:
         """Format a tweet using market data"""
         try:
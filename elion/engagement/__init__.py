@@ -5,11 +5,13 @@ Engagement system for Elion
 from .core import EngagementManager
 from .llm import LLMEngagement
 from .metrics import EngagementMetrics
+from .table import EngagementTable
 from .templates import EngagementTemplates
 
 __all__ = [
     'EngagementManager',
     'LLMEngagement',
     'EngagementMetrics',
+    'EngagementTable',
     'EngagementTemplates'
 ]
@@ -3,10 +3,12 @@ Core engagement functionality
 """
 
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Set, Tuple
+from typing import Dict, List, Optional, Set, Tuple, Union
 import json
 import random
 
+from .table import EngagementTable
+
 class EngagementManager:
     def __init__(self):
         self.engagement_metrics = {
@@ -19,6 +21,9 @@ class EngagementManager:
         
         self.tweet_history = []      # Track all tweets and their performance
         
+        # Columnar performance history, aggregated incrementally for strategy analysis
+        self.performance = EngagementTable(success_threshold=0.5)
+        
         self.viral_thresholds = {
             'likes': 100,
             'retweets': 50,
@@ -94,16 +99,29 @@ class EngagementManager:
             'recommendations': self._generate_recommendations(tweet_data)
         }
 
-    def optimize_content_strategy(self, recent_performance: List[Dict]) -> Dict:
+    def record_performance(self, performance_data: List[Dict]) -> None:
+        """
+        Add tweet performance data to the running performance table
+        
+        Args:
+            performance_data: Tweet dicts with content, timestamp and engagement counts
+        """
+        self.performance.extend(self._classify(data) for data in performance_data)
+
+    def optimize_content_strategy(self, recent_performance: Optional[List[Dict]] = None) -> Dict:
         """
         Optimize content strategy based on recent performance
         
         Args:
-            recent_performance: List of recent tweet performance data
+            recent_performance: List of recent tweet performance data; when
+                omitted, everything added with record_performance is used
         
         Returns:
             Dictionary with optimized strategy recommendations
         """
+        # Classify the tweets once and run every analysis over the same table
+        recent_performance = self._as_table(recent_performance)
+        
         # Analyze patterns in successful content
         success_patterns = self._analyze_success_patterns(recent_performance)
         
@@ -214,6 +232,8 @@ class EngagementManager:
 
     def _update_performance_metrics(self, tweet_data: Dict, engagement_score: float) -> None:
         """Update performance metrics with new tweet data"""
+        self.performance.append(self._classify(tweet_data))
+        
         # Update viral tweets if applicable
         if engagement_score > 0.7:  # High engagement threshold
             tweet_id = tweet_data.get('id')
@@ -231,38 +251,39 @@ class EngagementManager:
                     self.engagement_metrics['successful_hooks'][hook_type] = []
                 self.engagement_metrics['successful_hooks'][hook_type].append(engagement_score)
 
-    def _analyze_success_patterns(self, performance_data: List[Dict]) -> Dict:
+    def _analyze_success_patterns(self, performance_data: Union[List[Dict], EngagementTable]) -> Dict:
         """Analyze patterns in successful content"""
-        patterns = {
-            'hooks': {},
-            'content_types': {},
-            'timing': {},
-            'engagement_factors': {}
+        return self._as_table(performance_data).success_counts()
+
+    def _classify(self, tweet_data: Dict) -> Dict:
+        """Reduce a tweet to the columns of the performance table"""
+        content = tweet_data.get('content', '')
+        timestamp = tweet_data.get('timestamp')
+        return {
+            'timestamp': timestamp,
+            'content_type': self._identify_content_type(content),
+            'timing': self._analyze_post_timing(timestamp) if timestamp else None,
+            'hooks': [
+                hook_type for hook_type, pattern in self.viral_patterns['hooks'].items()
+                if self._matches_pattern(content, pattern)
+            ],
+            'factors': self._identify_engagement_factors(tweet_data),
+            'likes': tweet_data.get('likes', 0),
+            'retweets': tweet_data.get('retweets', 0),
+            'replies': tweet_data.get('replies', 0),
+            'quotes': tweet_data.get('quotes', 0),
+            'score': self._calculate_engagement_score(tweet_data)
         }
-        
-        for data in performance_data:
-            if self._calculate_engagement_score(data) > 0.5:  # Successful threshold
-                extracted = self._extract_viral_patterns(data)
-                
-                # Track hooks
-                for hook in extracted.get('hooks', []):
-                    patterns['hooks'][hook] = patterns['hooks'].get(hook, 0) + 1
-                
-                # Track content type
-                content_type = extracted.get('content_type')
-                if content_type:
-                    patterns['content_types'][content_type] = patterns['content_types'].get(content_type, 0) + 1
-                
-                # Track timing
-                timing = extracted.get('timing')
-                if timing:
-                    patterns['timing'][timing] = patterns['timing'].get(timing, 0) + 1
-                
-                # Track engagement factors
-                for factor in extracted.get('engagement_factors', []):
-                    patterns['engagement_factors'][factor] = patterns['engagement_factors'].get(factor, 0) + 1
-        
-        return patterns
+
+    def _as_table(self, performance_data: Union[List[Dict], EngagementTable, None]) -> EngagementTable:
+        """The running table, or a one-off table built from a list of tweets"""
+        if performance_data is None:
+            return self.performance
+        if isinstance(performance_data, EngagementTable):
+            return performance_data
+        table = EngagementTable(success_threshold=self.performance.success_threshold)
+        table.extend(self._classify(data) for data in performance_data)
+        return table
 
     def _generate_recommendations(self, analysis_data: Dict) -> List[str]:
         """Generate actionable recommendations based on analysis"""
@@ -292,48 +313,17 @@ class EngagementManager:
         
         return recommendations
 
-    def _identify_optimal_times(self, performance_data: List[Dict]) -> List[Tuple[int, int]]:
+    def _identify_optimal_times(self, performance_data: Union[List[Dict], EngagementTable]) -> List[Tuple[int, int]]:
         """Identify optimal posting times based on performance data"""
-        time_scores = {}
-        
-        # Analyze performance by hour
-        for data in performance_data:
-            timestamp = data.get('timestamp')
-            if timestamp:
-                hour = timestamp.hour
-                score = self._calculate_engagement_score(data)
-                if hour not in time_scores:
-                    time_scores[hour] = []
-                time_scores[hour].append(score)
-        
-        # Find best performing hours
-        avg_scores = {}
-        for hour, scores in time_scores.items():
-            avg_scores[hour] = sum(scores) / len(scores)
+        avg_scores = self._as_table(performance_data).mean_score_by_hour()
         
         # Get top 3 time ranges
-        sorted_hours = sorted(avg_scores.items(), key=lambda x: x[1], reverse=True)[:3]
+        sorted_hours = sorted(avg_scores, key=lambda x: x[1], reverse=True)[:3]
         return [(hour, (hour + 2) % 24) for hour, _ in sorted_hours]
 
-    def _analyze_content_types(self, performance_data: List[Dict]) -> Dict:
+    def _analyze_content_types(self, performance_data: Union[List[Dict], EngagementTable]) -> Dict:
         """Analyze performance by content type"""
-        type_scores = {}
-        
-        # Calculate scores by type
-        for data in performance_data:
-            content = data.get('content', '')
-            content_type = self._identify_content_type(content)
-            score = self._calculate_engagement_score(data)
-            
-            if content_type not in type_scores:
-                type_scores[content_type] = []
-            type_scores[content_type].append(score)
-        
-        # Calculate average scores
-        return {
-            content_type: sum(scores) / len(scores)
-            for content_type, scores in type_scores.items()
-        }
+        return self._as_table(performance_data).mean_score_by_content_type()
 
     def _generate_strategy_adjustments(self, success_patterns: Dict, optimal_times: List[Tuple[int, int]], content_performance: Dict) -> List[str]:
         """Generate strategy adjustments based on analysis"""
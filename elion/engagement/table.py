@@ -0,0 +1,294 @@
+"""
+Columnar engagement table with incremental group-by aggregates
+"""
+
+from datetime import datetime
+from typing import Dict, Hashable, Iterable, List, Tuple
+
+import numpy as np
+
+class _Labels:
+    """Maps group labels to dense integer codes, remembering first appearance"""
+
+    def __init__(self):
+        self.labels: List[Hashable] = []
+        self.codes: Dict[Hashable, int] = {}
+
+    def code(self, label: Hashable) -> int:
+        code = self.codes.get(label)
+        if code is None:
+            code = self.codes[label] = len(self.labels)
+            self.labels.append(label)
+        return code
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+class EngagementTable:
+    """Per-tweet engagement stored as NumPy columns
+
+    Each row holds the post's timestamp, hour, weekday, content type, timing
+    range, engagement counts and score, plus bitmasks of the hooks and
+    engagement factors found in it. Rows are classified once on append;
+    per-group sums and counts are updated incrementally with bincount, so
+    the group-by queries cost O(groups) however many rows are stored.
+    Queries restricted with since= aggregate the matching rows in one
+    vectorized pass.
+
+    Groups are reported in order of first appearance, matching the dict
+    order the row-by-row analysis produced. Hooks and factors first seen
+    in the same row keep the order that row listed them in.
+    """
+
+    NUMERIC = ('likes', 'retweets', 'replies', 'quotes', 'score')
+
+    def __init__(self, success_threshold: float = 0.5, capacity: int = 1024):
+        self.success_threshold = success_threshold
+        self._size = 0
+        self._capacity = capacity
+        self._columns = {
+            'timestamp': np.full(capacity, np.nan),
+            'hour': np.full(capacity, -1, dtype=np.int8),
+            'weekday': np.full(capacity, -1, dtype=np.int8),
+            'content_type': np.zeros(capacity, dtype=np.int32),
+            'timing': np.full(capacity, -1, dtype=np.int32),
+            'hooks': np.zeros(capacity, dtype=np.uint64),
+            'factors': np.zeros(capacity, dtype=np.uint64),
+            **{name: np.zeros(capacity) for name in self.NUMERIC}
+        }
+        self.content_types = _Labels()
+        self.timings = _Labels()
+        self.hooks = _Labels()
+        self.factors = _Labels()
+        # Row -> tag codes as listed, for rows not listing their tags in ascending code order
+        self._tag_order = {'hooks': {}, 'factors': {}}
+
+        # Running aggregates, indexed by group code; *_first hold the row each group first appeared in
+        self._hour_sum = np.zeros(24)
+        self._hour_count = np.zeros(24, dtype=np.int64)
+        self._hour_first = np.full(24, _NEVER, dtype=np.int64)
+        self._type_sum = np.zeros(0)
+        self._type_count = np.zeros(0, dtype=np.int64)
+        self._success = {key: np.zeros(0, dtype=np.int64) for key in _SUCCESS_KEYS}
+        self._success_first = {key: np.zeros(0, dtype=np.int64) for key in _SUCCESS_KEYS}
+
+    def __len__(self) -> int:
+        return self._size
+
+    def column(self, name: str) -> np.ndarray:
+        """Read-only view of a column's filled rows"""
+        view = self._columns[name][:self._size]
+        view.flags.writeable = False
+        return view
+
+    def _reserve(self, extra: int):
+        needed = self._size + extra
+        if needed <= self._capacity:
+            return
+        capacity = max(needed, self._capacity * 2)
+        for name, values in self._columns.items():
+            grown = np.empty(capacity, dtype=values.dtype)
+            grown[:self._size] = values[:self._size]
+            self._columns[name] = grown
+        self._capacity = capacity
+
+    def _masks(self, column: str, labels: _Labels, rows: List[Dict], start: int) -> List[int]:
+        """Bitmask of each row's tags, recording the listed order where codes alone lose it"""
+        masks = []
+        for offset, row in enumerate(rows):
+            codes = [labels.code(name) for name in row.get(column, ())]
+            mask = 0
+            for code in codes:
+                if code >= 64:
+                    raise ValueError("EngagementTable supports at most 64 distinct tags per column")
+                mask |= 1 << code
+            if codes != sorted(codes):
+                self._tag_order[column][start + offset] = codes
+            masks.append(mask)
+        return masks
+
+    def extend(self, rows: Iterable[Dict]):
+        """Append classified rows
+
+        Each row has 'timestamp' (datetime or None), 'content_type',
+        'timing' (hashable or None), 'hooks' and 'factors' (iterables of
+        names) and the numeric fields likes, retweets, replies, quotes, score.
+        """
+        rows = list(rows)
+        if not rows:
+            return
+        start = self._size
+        self._reserve(len(rows))
+        stop = start + len(rows)
+        cols = self._columns
+
+        timestamps = [row.get('timestamp') for row in rows]
+        cols['timestamp'][start:stop] = [ts.timestamp() if ts else np.nan for ts in timestamps]
+        cols['hour'][start:stop] = [ts.hour if ts else -1 for ts in timestamps]
+        cols['weekday'][start:stop] = [ts.weekday() if ts else -1 for ts in timestamps]
+        cols['content_type'][start:stop] = [self.content_types.code(row['content_type']) for row in rows]
+        cols['timing'][start:stop] = [
+            self.timings.code(row['timing']) if row.get('timing') else -1 for row in rows
+        ]
+        cols['hooks'][start:stop] = self._masks('hooks', self.hooks, rows, start)
+        cols['factors'][start:stop] = self._masks('factors', self.factors, rows, start)
+        for name in self.NUMERIC:
+            cols[name][start:stop] = [row.get(name, 0) for row in rows]
+        self._size = stop
+
+        self._accumulate(start, stop)
+
+    def append(self, row: Dict):
+        self.extend([row])
+
+    def _accumulate(self, start: int, stop: int):
+        """Fold rows [start, stop) into the running aggregates"""
+        agg = self._aggregate(slice(start, stop))
+        self._hour_sum += agg['hour_sum']
+        self._hour_count += agg['hour_count']
+        np.minimum(self._hour_first, agg['hour_first'], out=self._hour_first)
+        self._type_sum = _grow(self._type_sum, agg['type_sum'], np.add)
+        self._type_count = _grow(self._type_count, agg['type_count'], np.add)
+        for key in _SUCCESS_KEYS:
+            self._success[key] = _grow(self._success[key], agg['success'][key], np.add)
+            self._success_first[key] = _grow(self._success_first[key], agg['success_first'][key], np.minimum)
+
+    def _aggregate(self, rows) -> Dict:
+        """Group sums, counts and first appearances over the selected rows (slice or boolean mask)"""
+        cols = {name: values[:self._size][rows] for name, values in self._columns.items()}
+        index = np.arange(self._size)[rows]
+        score = cols['score']
+        n_types = len(self.content_types)
+
+        timed = cols['hour'] >= 0
+        hours = cols['hour'][timed]
+        agg = {
+            'hour_sum': np.bincount(hours, weights=score[timed], minlength=24),
+            'hour_count': np.bincount(hours, minlength=24),
+            'hour_first': _first_seen(hours, index[timed], 24),
+            'type_sum': np.bincount(cols['content_type'], weights=score, minlength=n_types),
+            'type_count': np.bincount(cols['content_type'], minlength=n_types),
+            'type_first': _first_seen(cols['content_type'], index, n_types)
+        }
+
+        won = score > self.success_threshold
+        won_index = index[won]
+        won_types = cols['content_type'][won]
+        won_timing = cols['timing'][won]
+        timed_win = won_timing >= 0
+        hook_hits = _bit_hits(cols['hooks'][won], len(self.hooks))
+        factor_hits = _bit_hits(cols['factors'][won], len(self.factors))
+        agg['success'] = {
+            'hooks': np.count_nonzero(hook_hits, axis=0),
+            'content_types': np.bincount(won_types, minlength=n_types),
+            'timing': np.bincount(won_timing[timed_win], minlength=len(self.timings)),
+            'engagement_factors': np.count_nonzero(factor_hits, axis=0)
+        }
+        agg['success_first'] = {
+            'hooks': _first_hit(hook_hits, won_index),
+            'content_types': _first_seen(won_types, won_index, n_types),
+            'timing': _first_seen(won_timing[timed_win], won_index[timed_win], len(self.timings)),
+            'engagement_factors': _first_hit(factor_hits, won_index)
+        }
+        return agg
+
+    def _since_mask(self, since: datetime) -> np.ndarray:
+        return self.column('timestamp') >= since.timestamp()
+
+    def mean_score_by_hour(self, since: datetime = None) -> List[Tuple[int, float]]:
+        """(hour, mean score) for hours with posts, in order of first appearance"""
+        if since is None:
+            hour_sum, hour_count, first = self._hour_sum, self._hour_count, self._hour_first
+        else:
+            agg = self._aggregate(self._since_mask(since))
+            hour_sum, hour_count, first = agg['hour_sum'], agg['hour_count'], agg['hour_first']
+        return [
+            (int(hour), float(hour_sum[hour] / hour_count[hour]))
+            for hour in _in_order(hour_count, first)
+        ]
+
+    def mean_score_by_content_type(self, since: datetime = None) -> Dict[str, float]:
+        """Mean score per content type, in order of first appearance"""
+        if since is None:
+            # Codes are assigned on first appearance, so code order is already first-seen order
+            type_sum, type_count = self._type_sum, self._type_count
+            first = np.arange(len(type_count))
+        else:
+            agg = self._aggregate(self._since_mask(since))
+            type_sum, type_count, first = agg['type_sum'], agg['type_count'], agg['type_first']
+        return {
+            self.content_types.labels[code]: float(type_sum[code] / type_count[code])
+            for code in _in_order(type_count, first)
+        }
+
+    def success_counts(self, since: datetime = None) -> Dict[str, Dict]:
+        """Counts of hooks, content types, timing ranges and factors among successful posts
+
+        Each dict is ordered by first appearance among successful posts.
+        """
+        if since is None:
+            counts, first = self._success, self._success_first
+        else:
+            agg = self._aggregate(self._since_mask(since))
+            counts, first = agg['success'], agg['success_first']
+
+        labels = {
+            'hooks': self.hooks,
+            'content_types': self.content_types,
+            'timing': self.timings,
+            'engagement_factors': self.factors
+        }
+        orders = {
+            'hooks': _in_tag_order(counts['hooks'], first['hooks'], self._tag_order['hooks']),
+            'content_types': _in_order(counts['content_types'], first['content_types']),
+            'timing': _in_order(counts['timing'], first['timing']),
+            'engagement_factors': _in_tag_order(
+                counts['engagement_factors'], first['engagement_factors'], self._tag_order['factors']
+            )
+        }
+        return {
+            key: {labels[key].labels[code]: int(counts[key][code]) for code in orders[key]}
+            for key in _SUCCESS_KEYS
+        }
+
+_NEVER = np.iinfo(np.int64).max
+
+_SUCCESS_KEYS = ('hooks', 'content_types', 'timing', 'engagement_factors')
+
+def _grow(total: np.ndarray, delta: np.ndarray, combine) -> np.ndarray:
+    """Combine delta into total elementwise, padding total when new groups appeared"""
+    if len(delta) > len(total):
+        pad = _NEVER if combine is np.minimum else 0
+        total = np.concatenate([total, np.full(len(delta) - len(total), pad, dtype=total.dtype)])
+    total[:len(delta)] = combine(total[:len(delta)], delta)
+    return total
+
+def _first_seen(codes: np.ndarray, index: np.ndarray, n: int) -> np.ndarray:
+    """Smallest row index per code"""
+    first = np.full(n, _NEVER, dtype=np.int64)
+    np.minimum.at(first, codes, index)
+    return first
+
+def _bit_hits(masks: np.ndarray, n_bits: int) -> np.ndarray:
+    """(rows, n_bits) boolean matrix of which bits each mask has set"""
+    bits = np.left_shift(np.uint64(1), np.arange(n_bits, dtype=np.uint64))
+    return (masks[:, None] & bits) != 0
+
+def _first_hit(hits: np.ndarray, index: np.ndarray) -> np.ndarray:
+    """Smallest row index per bit column (never for bits that are not set)"""
+    if not hits.shape[0]:
+        return np.full(hits.shape[1], _NEVER, dtype=np.int64)
+    return np.where(hits.any(axis=0), index[hits.argmax(axis=0)], _NEVER)
+
+def _in_order(counts: np.ndarray, first: np.ndarray) -> np.ndarray:
+    """Codes with a nonzero count, ordered by first appearance"""
+    present = np.flatnonzero(counts)
+    return present[np.argsort(first[present], kind='stable')]
+
+def _in_tag_order(counts: np.ndarray, first: np.ndarray, row_orders: Dict[int, List[int]]) -> List[int]:
+    """Tag codes with a nonzero count, ordered by first appearance, then by position in that row"""
+    def key(code: int) -> Tuple[int, int]:
+        row = int(first[code])
+        listed = row_orders.get(row)
+        return row, listed.index(code) if listed else code
+    return sorted(np.flatnonzero(counts).tolist(), key=key)
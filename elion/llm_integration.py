@@ -8,6 +8,7 @@ from custom_llm import MetaLlamaComponent
 import os
 from dotenv import load_dotenv
 from elion.data_storage import DataStorage
+from llm_metrics import FALLBACK, llm_metrics
 
 class LLMIntegration:
     def __init__(self):
@@ -96,24 +97,26 @@ Remember: You're not just sharing market analysis - you're leading a community o
                          market_state: Optional[Dict] = None) -> str:
         """Generate a natural response based on content and context"""
         
-        # Build the prompt
-        prompt = self._build_prompt(content, context, relationship, market_state)
-        
-        try:
-            # Generate response using Meta Llama API
-            response = self.llm._call(prompt)
-            
-            # Process response
-            processed_response = self._process_response(response, context)
+        with llm_metrics.track('llm_integration.generate_response') as call:
+            # Build the prompt
+            prompt = self._build_prompt(content, context, relationship, market_state)
             
-            # Update context memory
-            self._update_context_memory(content, processed_response, context)
-            
-            return processed_response
-            
-        except Exception as e:
-            print(f"Error generating response: {e}")
-            return self._get_fallback_response(content, context)
+            try:
+                # Generate response using Meta Llama API
+                response = self.llm._call(prompt)
+                
+                # Process response
+                processed_response = self._process_response(response, context)
+                
+                # Update context memory
+                self._update_context_memory(content, processed_response, context)
+                
+                return processed_response
+                
+            except Exception as e:
+                print(f"Error generating response: {e}")
+                call.outcome = FALLBACK
+                return self._get_fallback_response(content, context)
     
     def _build_prompt(self, 
                      content: str, 
@@ -1,17 +1,29 @@
 """Token monitoring and tracking functionality"""
 
+import heapq
 import time
-from typing import Dict, List, Optional
+from collections import deque
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime, timedelta
 
 class TokenMonitor:
-    """Monitors and tracks token performance over time"""
+    """Monitors and tracks token performance over time
     
-    def __init__(self, api_key: Optional[str] = None):
+    Tokens not seen for tracking_window are dropped lazily: a min-heap
+    holds one (seen, symbol) entry per token, and an update only pops the
+    entries older than the window. A popped token that was seen again
+    since is pushed back with its latest time, so each update costs
+    O(log n) amortized. Price and volume histories keep the last
+    history_limit points.
+    """
+    
+    def __init__(self, api_key: Optional[str] = None, history_limit: int = 1000):
         """Initialize token monitor"""
         self.api_key = api_key
         self.tracked_tokens = {}  # symbol -> {first_seen, last_price, etc}
         self.tracking_window = timedelta(days=7)  # Track tokens for 7 days
+        self.history_limit = history_limit
+        self._expiry: List[Tuple[datetime, str]] = []  # (seen at or before last_seen, symbol)
         
     def track_token(self, symbol: str, price: Optional[float] = None, volume: Optional[float] = None) -> None:
         """Track a new token or update existing token data
@@ -33,9 +45,10 @@ class TokenMonitor:
                 'highest_price': price if price else 0,
                 'lowest_price': price if price else float('inf'),
                 'highest_volume': volume if volume else 0,
-                'volume_history': [],
-                'price_history': []
+                'volume_history': deque(maxlen=self.history_limit),
+                'price_history': deque(maxlen=self.history_limit)
             }
+            heapq.heappush(self._expiry, (now, symbol))
             
         # Update existing token data
         token_data = self.tracked_tokens[symbol]
@@ -64,11 +77,17 @@ class TokenMonitor:
         now = datetime.now()
         cutoff = now - self.tracking_window
         
-        self.tracked_tokens = {
-            symbol: data 
-            for symbol, data in self.tracked_tokens.items()
-            if data['last_seen'] > cutoff
-        }
+        expiry = self._expiry
+        while expiry and expiry[0][0] <= cutoff:
+            _, symbol = heapq.heappop(expiry)
+            data = self.tracked_tokens.get(symbol)
+            if data is None:
+                continue
+            if data['last_seen'] > cutoff:
+                # Seen again since this entry was pushed
+                heapq.heappush(expiry, (data['last_seen'], symbol))
+            else:
+                del self.tracked_tokens[symbol]
         
     def get_token_stats(self, symbol: str) -> Optional[Dict]:
         """Get tracking stats for a token"""
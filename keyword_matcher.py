@@ -0,0 +1,89 @@
+"""
+Precompiled multi-keyword matcher for topic and category classification
+"""
+from typing import Dict, FrozenSet, Iterable, List, Mapping, Tuple, Union
+import re
+import string
+
+# Boundary modes: where a keyword may sit inside a longer word
+WORD = 'word'            # Letters on neither side: "sec" matches "SEC probe", not "second"
+PREFIX = 'prefix'        # No letter before: "nft" matches "NFTs", "ai" matches "AIOZ" but not "chain"
+SUBSTRING = 'substring'  # Anywhere: "inu" matches "SHIBAINU"
+
+KeywordSpec = Union[str, Tuple[str, str]]
+
+_LETTERS = frozenset(string.ascii_lowercase)
+
+class KeywordMatcher:
+    """Classifies text against labelled keyword groups with precompiled regex scans
+
+    groups maps a label to its keywords. A keyword is a string, matched
+    with the matcher's default boundary, or a (keyword, boundary) pair.
+    Matching is case-insensitive; digits and punctuation count as
+    boundaries, so "ai" is found in "ai16z" and "Fetch.ai". Keywords may
+    overlap: "dogpt" is both "dog" and "gpt", and "doge" also contains "dog".
+    """
+
+    def __init__(self, groups: Mapping[str, Iterable[KeywordSpec]], boundary: str = PREFIX):
+        self.order: List[str] = list(groups)
+        labels: Dict[str, List[str]] = {}
+        modes: Dict[str, str] = {}
+        for label, keywords in groups.items():
+            for keyword in keywords:
+                word, mode = (keyword, boundary) if isinstance(keyword, str) else keyword
+                word = word.lower()
+                if modes.setdefault(word, mode) != mode:
+                    raise ValueError(f"Keyword {word!r} is given with boundaries {modes[word]} and {mode}")
+                labels.setdefault(word, []).append(label)
+
+        # Each pattern reports the longest keyword starting at each position, so
+        # matches can overlap. Any other keyword starting there is a prefix of
+        # that match; precompute the labels of all of them for both cases of
+        # whether the position is a word start: (word, at_word_start) -> labels
+        self._hits: Dict[Tuple[str, bool], FrozenSet[str]] = {}
+        for word in modes:
+            for at_start in (True, False):
+                hit = set()
+                for shorter, mode in modes.items():
+                    if not word.startswith(shorter):
+                        continue
+                    if mode != SUBSTRING and not at_start:
+                        continue
+                    if mode == WORD and word[len(shorter):len(shorter) + 1] in _LETTERS:
+                        continue
+                    hit.update(labels[shorter])
+                self._hits[word, at_start] = frozenset(hit)
+
+        # Keywords needing a word start share one lookbehind, which fails fast
+        # inside words; substring keywords are scanned separately at every position
+        bounded, anywhere = [], []
+        for word in sorted(modes, key=len, reverse=True):
+            if modes[word] == SUBSTRING:
+                anywhere.append(re.escape(word))
+            else:
+                bounded.append(re.escape(word) + ('(?![a-z])' if modes[word] == WORD else ''))
+        # Text is lowercased before matching, which is cheaper than re.IGNORECASE
+        self._patterns = []
+        if bounded:
+            self._patterns.append(re.compile('(?<![a-z])(?=(' + '|'.join(bounded) + '))'))
+        if anywhere:
+            self._patterns.append(re.compile('(?=(' + '|'.join(anywhere) + '))'))
+
+    @staticmethod
+    def _text(texts: Iterable[str]) -> str:
+        return '\n'.join(text for text in texts if text).lower()
+
+    def labels(self, *texts: str) -> Tuple[str, ...]:
+        """Labels with a keyword in any of the texts, in group order"""
+        text = self._text(texts)
+        found = set()
+        for pattern in self._patterns:
+            for match in pattern.finditer(text):
+                start = match.start()
+                found |= self._hits[match.group(1), start == 0 or text[start - 1] not in _LETTERS]
+        return tuple(label for label in self.order if label in found)
+
+    def matches(self, *texts: str) -> bool:
+        """Whether any keyword occurs in any of the texts"""
+        text = self._text(texts)
+        return any(pattern.search(text) is not None for pattern in self._patterns)
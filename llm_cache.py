@@ -0,0 +1,174 @@
+"""
+Content-addressed response cache for LLM calls
+"""
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+import atexit
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r'\s+')
+
+class LLMResponseCache:
+    """TTL + LRU cache for LLM responses with optional JSON persistence
+
+    Keys are SHA-256 digests of the model, normalized prompt, normalized
+    system message and generation config, so prompts that differ only in
+    indentation or line wrapping share an entry.
+    """
+
+    def __init__(self, ttl: float = 600, max_entries: int = 256, path: str = None, flush_interval: float = 30):
+        """Initialize cache
+
+        Args:
+            ttl: Seconds an entry stays valid
+            max_entries: LRU capacity
+            path: Optional JSON file used to persist entries across restarts
+            flush_interval: Minimum seconds between writes to path
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.path = path
+        self.flush_interval = flush_interval
+
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._last_flush = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+        if self.path:
+            self._load()
+            atexit.register(self.flush)
+
+    @classmethod
+    def from_env(cls) -> Optional['LLMResponseCache']:
+        """Build cache from LLM_CACHE_* env vars (LLM_CACHE_TTL=0 disables it)"""
+        ttl = float(os.getenv('LLM_CACHE_TTL', 600))
+        if ttl <= 0:
+            return None
+        return cls(
+            ttl=ttl,
+            max_entries=int(os.getenv('LLM_CACHE_SIZE', 256)),
+            path=os.getenv('LLM_CACHE_FILE') or None
+        )
+
+    @staticmethod
+    def make_key(model: str, prompt: str, system_message: Optional[str], config: Dict[str, Any]) -> str:
+        """Digest of everything that determines the response"""
+        normalize = lambda text: _WHITESPACE.sub(' ', text).strip() if text else ''
+        material = json.dumps({
+            'model': model,
+            'prompt': normalize(prompt),
+            'system': normalize(system_message),
+            'config': config
+        }, sort_keys=True)
+        return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return a fresh cached response or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, value = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                self._dirty = True
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: str, value: str) -> None:
+        """Store a response, evicting least recently used entries past capacity"""
+        if value is None:
+            return
+
+        with self._lock:
+            self._entries[key] = (time.time() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+            self._dirty = True
+
+        if self.path and time.time() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def clear(self) -> None:
+        """Drop all entries and reset counters"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = self.expirations = 0
+            self._dirty = True
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit-rate metrics"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'persistent': bool(self.path)
+            }
+
+    def flush(self) -> None:
+        """Write unexpired entries to disk atomically"""
+        if not self.path:
+            return
+
+        with self._lock:
+            if not self._dirty:
+                return
+            now = time.time()
+            entries = [[k, exp, v] for k, (exp, v) in self._entries.items() if exp > now]
+            self._dirty = False
+            self._last_flush = now
+
+        try:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+            with os.fdopen(fd, 'w') as f:
+                json.dump({'version': 1, 'entries': entries}, f)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logger.error(f"Error saving LLM cache: {e}")
+
+    def _load(self) -> None:
+        """Load persisted entries, skipping expired ones"""
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+            now = time.time()
+            for key, expires_at, value in data.get('entries', [])[-self.max_entries:]:
+                if expires_at > now:
+                    self._entries[key] = (expires_at, value)
+            logger.info(f"Loaded {len(self._entries)} cached LLM responses from {self.path}")
+        except FileNotFoundError:
+            pass
+        except (json.JSONDecodeError, ValueError, TypeError) as e:
+            logger.warning(f"Ignoring unreadable LLM cache {self.path}: {e}")
@@ -0,0 +1,192 @@
+"""
+Per-call-site usage and latency metrics for LLM calls
+"""
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+from typing import Any, Callable, Dict, Iterator, Optional
+import logging
+import os
+import threading
+import time
+
+from tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (seconds) of the latency histogram buckets; the last bucket is unbounded
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60)
+
+# Outcomes a call can be recorded with
+OK = 'ok'
+CACHE_HIT = 'cache_hit'
+FALLBACK = 'fallback'
+ERROR = 'error'
+TIMEOUT = 'timeout'
+REJECTED = 'rejected'
+CANCELLED = 'cancelled'
+
+class CallRecord:
+    """Mutable outcome of one tracked call, filled in by the caller"""
+
+    __slots__ = ('outcome', 'prompt_tokens', 'output_tokens')
+
+    def __init__(self):
+        self.outcome = OK
+        self.prompt_tokens = 0
+        self.output_tokens = 0
+
+    def add_usage(self, usage: Optional[Dict]) -> None:
+        """Take token counts from a Gemini usageMetadata block"""
+        if not usage:
+            return
+        self.prompt_tokens += int(usage.get('promptTokenCount', 0) or 0)
+        self.output_tokens += int(usage.get('candidatesTokenCount', 0) or 0)
+
+class _SiteStats:
+    __slots__ = ('calls', 'outcomes', 'prompt_tokens', 'output_tokens', 'total_s', 'max_s', 'buckets')
+
+    def __init__(self):
+        self.calls = 0
+        self.outcomes: Dict[str, int] = {}
+        self.prompt_tokens = 0
+        self.output_tokens = 0
+        self.total_s = 0.0
+        self.max_s = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-th call (None for the overflow bucket)"""
+        if not self.calls:
+            return 0.0
+        rank = q * self.calls
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS, self.buckets):
+            seen += count
+            if seen >= rank:
+                return bound
+        return None
+
+    def to_dict(self) -> Dict[str, Any]:
+        labels = [f"le_{bound}" for bound in LATENCY_BUCKETS] + ['le_inf']
+        return {
+            'calls': self.calls,
+            'outcomes': dict(self.outcomes),
+            'fallback_rate': round(self.outcomes.get(FALLBACK, 0) / self.calls, 4) if self.calls else 0.0,
+            'prompt_tokens': self.prompt_tokens,
+            'output_tokens': self.output_tokens,
+            'latency': {
+                'total_s': round(self.total_s, 3),
+                'mean_s': round(self.total_s / self.calls, 3) if self.calls else 0.0,
+                'max_s': round(self.max_s, 3),
+                'p50_le_s': self.quantile(0.5),
+                'p95_le_s': self.quantile(0.95),
+                'buckets': dict(zip(labels, self.buckets))
+            }
+        }
+
+class LLMMetrics:
+    """Thread-safe registry of call counts, outcomes, tokens and latency histograms
+
+    Sites are free-form dotted names ("gemini.generate",
+    "content_generator.generate_ai_mystique"). A one-line summary per site is
+    logged every log_interval seconds (LLM_METRICS_LOG_INTERVAL, 0 disables).
+    """
+
+    def __init__(self, log_interval: float = None):
+        self.log_interval = float(os.getenv('LLM_METRICS_LOG_INTERVAL', 3600)) if log_interval is None else log_interval
+        self._sites: Dict[str, _SiteStats] = {}
+        self._lock = threading.Lock()
+        self._started = time.time()
+        self._last_log = time.monotonic()
+
+    def record(self, site: str, duration: float, outcome: str = OK,
+               prompt_tokens: int = 0, output_tokens: int = 0) -> None:
+        """Record one finished call"""
+        with self._lock:
+            stats = self._sites.get(site)
+            if stats is None:
+                stats = self._sites[site] = _SiteStats()
+            stats.calls += 1
+            stats.outcomes[outcome] = stats.outcomes.get(outcome, 0) + 1
+            stats.prompt_tokens += prompt_tokens
+            stats.output_tokens += output_tokens
+            stats.total_s += duration
+            stats.max_s = max(stats.max_s, duration)
+            stats.buckets[bisect_left(LATENCY_BUCKETS, duration)] += 1
+
+            due = self.log_interval > 0 and time.monotonic() - self._last_log >= self.log_interval
+            if due:
+                self._last_log = time.monotonic()
+
+        if due:
+            self.log_summary()
+
+    @contextmanager
+    def track(self, site: str) -> Iterator[CallRecord]:
+        """Time the enclosed block; set outcome/tokens on the yielded record
+
+        An exception escaping the block is recorded as an error and re-raised.
+        """
+        call = CallRecord()
+        start = time.perf_counter()
+        try:
+            with tracer.span(f"llm.{site}"):
+                yield call
+        except Exception:
+            call.outcome = ERROR
+            raise
+        finally:
+            self.record(site, time.perf_counter() - start, call.outcome, call.prompt_tokens, call.output_tokens)
+
+    def instrument(self, site: str, classify: Callable[[Any], str] = None) -> Callable:
+        """Decorator form of track()
+
+        classify maps the return value to an outcome; by default falsy
+        results count as fallbacks.
+        """
+        classify = classify or (lambda result: OK if result else FALLBACK)
+
+        def decorator(func: Callable) -> Callable:
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.track(site) as call:
+                    result = func(*args, **kwargs)
+                    call.outcome = classify(result)
+                    return result
+            return wrapper
+        return decorator
+
+    def snapshot(self) -> Dict[str, Any]:
+        """All site stats plus totals"""
+        with self._lock:
+            sites = {name: stats.to_dict() for name, stats in sorted(self._sites.items())}
+        return {
+            'since': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(self._started)),
+            'latency_buckets_s': list(LATENCY_BUCKETS),
+            # Tokens are only recorded at the request level, so these sums do not double count
+            'totals': {
+                'prompt_tokens': sum(s['prompt_tokens'] for s in sites.values()),
+                'output_tokens': sum(s['output_tokens'] for s in sites.values())
+            },
+            'sites': sites
+        }
+
+    def log_summary(self) -> None:
+        """Log one line per call site"""
+        for name, stats in self.snapshot()['sites'].items():
+            outcomes = ', '.join(f"{k}={v}" for k, v in sorted(stats['outcomes'].items()))
+            logger.info(
+                f"LLM {name}: {stats['calls']} calls ({outcomes}), "
+                f"mean {stats['latency']['mean_s']}s, max {stats['latency']['max_s']}s, "
+                f"tokens {stats['prompt_tokens']} in / {stats['output_tokens']} out"
+            )
+
+    def reset(self) -> None:
+        """Drop all recorded stats"""
+        with self._lock:
+            self._sites.clear()
+            self._started = time.time()
+
+# Process-wide registry used by all instrumented call sites
+llm_metrics = LLMMetrics()
@@ -0,0 +1,108 @@
+"""
+Logging setup and helpers for hot paths: lazy structured events, sampling and queued output
+"""
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Dict, Optional
+import atexit
+import logging
+import os
+import queue
+import sys
+import threading
+
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+# Per-token events are logged once every this many occurrences per key
+DEFAULT_SAMPLE_EVERY = int(os.getenv('LOG_SAMPLE_EVERY', '100'))
+
+_listener: Optional[QueueListener] = None
+
+class Event:
+    """A structured log message, only formatted if a handler emits it
+
+    logger.info(Event('token.update', symbol='BTC', price=1.0)) renders as
+    "token.update symbol=BTC price=1.0".
+    """
+
+    __slots__ = ('name', 'fields')
+
+    def __init__(self, name: str, **fields):
+        self.name = name
+        self.fields = fields
+
+    def __str__(self) -> str:
+        if not self.fields:
+            return self.name
+        return self.name + ' ' + ' '.join(f"{key}={value}" for key, value in self.fields.items())
+
+class EventSampler:
+    """Counts occurrences per key and lets one in every N through"""
+
+    def __init__(self, every: int = DEFAULT_SAMPLE_EVERY):
+        self.every = max(1, every)
+        self._counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def sample(self, key: str) -> int:
+        """Occurrences of key since it was last let through, or 0 to drop this one"""
+        with self._lock:
+            count = self._counts.get(key, 0) + 1
+            if count < self.every:
+                self._counts[key] = count
+                return 0
+            self._counts[key] = 0
+            return count
+
+_sampler = EventSampler()
+
+def log_sampled(logger: logging.Logger, level: int, key: str, msg, *args):
+    """Log msg for one in every LOG_SAMPLE_EVERY occurrences of key
+
+    Nothing is counted or formatted when the level is disabled. The
+    emitted record carries the number of occurrences it stands for.
+    """
+    if not logger.isEnabledFor(level):
+        return
+    count = _sampler.sample(key)
+    if count:
+        logger.log(level, msg, *args, extra={'sampled': count})
+
+def setup_logging(log_file: str = 'tweet_activity.log', level: Optional[str] = None,
+                  max_bytes: int = 5 * 1024 * 1024, backups: int = 3) -> Optional[QueueListener]:
+    """Route the root logger through a queue to the file and console handlers
+
+    Callers format each record's message (QueueHandler.prepare) and enqueue
+    it; the handler formatting, rotation and file and console writes happen
+    on the listener's thread. The level comes from LOG_LEVEL
+    (default INFO). Like basicConfig, it does nothing when the root logger
+    already has handlers, returning the running listener if there is one.
+    """
+    global _listener
+    root = logging.getLogger()
+    if root.handlers:
+        return _listener
+
+    level = (level or os.getenv('LOG_LEVEL', 'INFO')).upper()
+    formatter = logging.Formatter(LOG_FORMAT)
+    handlers = [
+        RotatingFileHandler(log_file, maxBytes=max_bytes, backupCount=backups),
+        logging.StreamHandler(sys.stdout)
+    ]
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    records = queue.SimpleQueue()
+    root.setLevel(level)
+    root.addHandler(QueueHandler(records))
+
+    _listener = QueueListener(records, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+    return _listener
+
+def stop_logging():
+    """Flush queued records and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
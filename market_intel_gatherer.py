@@ -1,11 +1,95 @@
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
+from concurrent.futures import ThreadPoolExecutor
+from collections import Counter
+import importlib.util
 import json
-from datetime import datetime
+from datetime import datetime, timedelta
+import atexit
 import os
+import threading
 import time
 import random
 
+# lxml parses several times faster than the stdlib parser; use it when installed
+HTML_PARSER = 'lxml' if importlib.util.find_spec('lxml') else 'html.parser'
+
+# Mentions are counted in hourly buckets; older buckets are dropped
+MENTION_RETENTION_HOURS = 7 * 24
+
+class MentionCounter:
+    """Per-project mention counts in hourly buckets
+    
+    Recording a mention and querying a window both touch only the
+    project's buckets, never the interaction history. Windows are counted
+    in whole hours: hours=12 covers the current hour and the 11 before it.
+    Projects are keyed case-insensitively under the first spelling seen.
+    """
+    
+    def __init__(self, retention_hours=MENTION_RETENTION_HOURS):
+        self.retention_hours = retention_hours
+        self.projects = {}
+    
+    @staticmethod
+    def _hour(when):
+        # Naive UTC datetimes; timestamp() would read them as local time
+        return int((when - datetime(1970, 1, 1)).total_seconds() // 3600)
+    
+    def add(self, project, when):
+        """Count one mention of project at when (naive UTC datetime)"""
+        key = project.lower()
+        entry = self.projects.get(key)
+        iso = when.isoformat()
+        if entry is None:
+            entry = self.projects[key] = {
+                'project': project,
+                'total': 0,
+                'buckets': {},
+                'first_mentioned': iso,
+                'last_mentioned': iso
+            }
+        hour = self._hour(when)
+        entry['buckets'][hour] = entry['buckets'].get(hour, 0) + 1
+        entry['total'] += 1
+        entry['first_mentioned'] = min(entry['first_mentioned'], iso)
+        entry['last_mentioned'] = max(entry['last_mentioned'], iso)
+        
+        oldest = hour - self.retention_hours
+        if min(entry['buckets']) < oldest:
+            entry['buckets'] = {h: c for h, c in entry['buckets'].items() if h >= oldest}
+    
+    def top(self, hours, limit, now):
+        """Most mentioned projects within the last hours, with their window counts"""
+        since = self._hour(now) - hours + 1
+        counted = []
+        for entry in self.projects.values():
+            mentions = sum(c for h, c in entry['buckets'].items() if h >= since)
+            if mentions:
+                counted.append((mentions, entry))
+        counted.sort(key=lambda x: x[0], reverse=True)
+        return [
+            {
+                'project': entry['project'],
+                'mentions': mentions,
+                'total_mentions': entry['total'],
+                'first_mentioned': entry['first_mentioned'],
+                'last_mentioned': entry['last_mentioned']
+            }
+            for mentions, entry in counted[:limit]
+        ]
+    
+    def snapshot(self):
+        """All-time counts in the project_mentions.json layout"""
+        return [
+            {
+                'project': entry['project'],
+                'mentions': entry['total'],
+                'first_mentioned': entry['first_mentioned'],
+                'last_mentioned': entry['last_mentioned']
+            }
+            for entry in self.projects.values()
+        ]
+
 class MarketIntelGatherer:
     def __init__(self):
         self.data_dir = 'market_data'
@@ -14,19 +98,39 @@ class MarketIntelGatherer:
         # Initialize data files
         self.files = {
             'trending': os.path.join(self.data_dir, 'trending_projects.json'),
-            'interactions': os.path.join(self.data_dir, 'user_interactions.json'),
+            # Append-only, one JSON interaction per line
+            'interactions': os.path.join(self.data_dir, 'user_interactions.jsonl'),
+            'legacy_interactions': os.path.join(self.data_dir, 'user_interactions.json'),
+            # Snapshot of the mention counts, written behind interactions
             'mentions': os.path.join(self.data_dir, 'project_mentions.json')
         }
         
-        # Load existing data
-        self.trending_projects = self._load_json(self.files['trending'])
-        self.user_interactions = self._load_json(self.files['interactions'])
-        self.project_mentions = self._load_json(self.files['mentions'])
-        
         # Initialize headers for web requests
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        self.request_timeout = 15  # seconds
+        
+        # Trending sources, fetched concurrently: (source, url, parser)
+        self.sources = [
+            ('coingecko_gainers', 'https://www.coingecko.com/en/crypto-gainers-losers', self._parse_coingecko),
+            ('dexscreener', 'https://dexscreener.com/trending', self._parse_dexscreener)
+        ]
+        
+        # Interaction bookkeeping is kept incrementally; the log is only read at startup
+        self._lock = threading.Lock()
+        self.mentions = MentionCounter()
+        self.user_projects = {}
+        self.mentions_flush_interval = 60  # seconds
+        self._mentions_dirty = False
+        self._mentions_saved_at = 0.0
+        
+        # Load existing data
+        self.trending_projects = self._load_json(self.files['trending'])
+        self._load_interactions()
+        atexit.register(self.flush)
     
     def _load_json(self, filepath):
         """Load JSON data from file"""
@@ -47,55 +151,102 @@ class MarketIntelGatherer:
         except Exception as e:
             print(f"Error saving to {filepath}: {e}")
     
-    def scrape_trending_projects(self):
-        """Scrape trending projects from various sources"""
+    def _load_interactions(self):
+        """Replay the interaction log into the mention and per-user counters
+        
+        An interactions file from before the log existed is converted once.
+        A line cut short by a crash mid-append is skipped.
+        """
+        path = self.files['interactions']
+        legacy = self.files['legacy_interactions']
         try:
-            # CoinGecko Gainers/Losers
-            response = requests.get('https://www.coingecko.com/en/crypto-gainers-losers', headers=self.headers)
-            if response.status_code == 200:
-                soup = BeautifulSoup(response.text, 'html.parser')
-                # Find gainers table
-                gainers = soup.find('table', {'data-target': 'gecko-table.table'})
-                if gainers:
-                    rows = gainers.find_all('tr')
-                    for row in rows[1:]:  # Skip header
-                        cols = row.find_all('td')
-                        if len(cols) >= 2:
-                            name_col = cols[1].text.strip()
-                            if name_col:
-                                project = {
-                                    'name': name_col,
-                                    'source': 'coingecko_gainers',
-                                    'time': datetime.utcnow().isoformat()
-                                }
-                                self.trending_projects['items'].append(project)
+            if not os.path.exists(path) and os.path.exists(legacy):
+                with open(path, 'w') as f:
+                    for interaction in self._load_json(legacy)['items']:
+                        f.write(json.dumps(interaction) + '\n')
             
-            # DEXScreener Trending
-            response = requests.get('https://dexscreener.com/trending', headers=self.headers)
+            if not os.path.exists(path):
+                return
+            with open(path, 'r') as f:
+                for line in f:
+                    try:
+                        self._count_interaction(json.loads(line))
+                    except (ValueError, KeyError):
+                        continue
+        except Exception as e:
+            print(f"Error loading interactions: {e}")
+    
+    def _count_interaction(self, interaction):
+        project = interaction['project']
+        self.mentions.add(project, datetime.fromisoformat(interaction['time']))
+        favorites = self.user_projects.setdefault(interaction['username'], Counter())
+        favorites[project] += 1
+    
+    def _fetch(self, url):
+        """GET url, returning the page text or None"""
+        try:
+            response = self.session.get(url, timeout=self.request_timeout)
             if response.status_code == 200:
-                soup = BeautifulSoup(response.text, 'html.parser')
-                trending_items = soup.find_all('div', {'class': 'chakra-card'})
-                for item in trending_items:
-                    name = item.find('span', {'class': 'chakra-text'})
-                    if name:
-                        project = {
-                            'name': name.text.strip(),
-                            'source': 'dexscreener',
-                            'time': datetime.utcnow().isoformat()
-                        }
-                        self.trending_projects['items'].append(project)
+                return response.text
+            print(f"Error fetching {url}: HTTP {response.status_code}")
+        except Exception as e:
+            print(f"Error fetching {url}: {e}")
+        return None
+    
+    def _parse_coingecko(self, html):
+        """Names from the CoinGecko gainers table"""
+        # Only table markup is built into the tree
+        soup = BeautifulSoup(html, HTML_PARSER, parse_only=SoupStrainer('table'))
+        names = []
+        gainers = soup.find('table', {'data-target': 'gecko-table.table'})
+        if gainers:
+            rows = gainers.find_all('tr')
+            for row in rows[1:]:  # Skip header
+                cols = row.find_all('td')
+                if len(cols) >= 2:
+                    name_col = cols[1].text.strip()
+                    if name_col:
+                        names.append(name_col)
+        return names
+    
+    def _parse_dexscreener(self, html):
+        """Names from the DEXScreener trending cards"""
+        soup = BeautifulSoup(html, HTML_PARSER, parse_only=SoupStrainer('div', {'class': 'chakra-card'}))
+        names = []
+        for item in soup.find_all('div', {'class': 'chakra-card'}):
+            name = item.find('span', {'class': 'chakra-text'})
+            if name:
+                names.append(name.text.strip())
+        return names
+    
+    def _scrape_source(self, source):
+        name, url, parse = source
+        html = self._fetch(url)
+        if html is None:
+            return []
+        try:
+            now = datetime.utcnow().isoformat()
+            return [{'name': project, 'source': name, 'time': now} for project in parse(html)]
+        except Exception as e:
+            print(f"Error parsing {name}: {e}")
+            return []
+    
+    def scrape_trending_projects(self):
+        """Scrape trending projects from all sources concurrently"""
+        try:
+            with ThreadPoolExecutor(max_workers=len(self.sources) or 1) as pool:
+                for projects in pool.map(self._scrape_source, self.sources):
+                    self.trending_projects['items'].extend(projects)
             
             # Keep only recent items (last 24 hours)
-            current_time = datetime.utcnow()
-            self.trending_projects['items'] = [
-                item for item in self.trending_projects['items']
-                if (current_time - datetime.fromisoformat(item['time'])).total_seconds() <= 24 * 3600
-            ]
+            cutoff = (datetime.utcnow() - timedelta(hours=24)).isoformat()
             
             # Remove duplicates (keep most recent)
             seen = set()
             unique_items = []
             for item in sorted(self.trending_projects['items'], key=lambda x: x['time'], reverse=True):
+                if item['time'] < cutoff:
+                    break
                 if item['name'].lower() not in seen:
                     seen.add(item['name'].lower())
                     unique_items.append(item)
@@ -105,12 +256,16 @@ class MarketIntelGatherer:
             self._save_json(self.trending_projects, self.files['trending'])
             
             print(f"Found {len(unique_items)} trending projects")
-            
+        
         except Exception as e:
             print(f"Error scraping trending projects: {e}")
     
     def track_interaction(self, username, project, interaction_type):
-        """Track user interactions with projects"""
+        """Track user interactions with projects
+        
+        The interaction is appended to the log; the mentions snapshot is
+        rewritten at most every mentions_flush_interval seconds.
+        """
         try:
             interaction = {
                 'username': username,
@@ -119,39 +274,30 @@ class MarketIntelGatherer:
                 'time': datetime.utcnow().isoformat()
             }
             
-            self.user_interactions['items'].append(interaction)
-            self._save_json(self.user_interactions, self.files['interactions'])
-            
-            # Also update project mentions
-            self._update_project_mentions(project)
+            with self._lock:
+                with open(self.files['interactions'], 'a') as f:
+                    f.write(json.dumps(interaction) + '\n')
+                
+                # Also update project mentions
+                self._count_interaction(interaction)
+                self._mentions_dirty = True
+                due = time.monotonic() - self._mentions_saved_at >= self.mentions_flush_interval
             
+            if due:
+                self.flush()
+        
         except Exception as e:
             print(f"Error tracking interaction: {e}")
     
-    def _update_project_mentions(self, project):
-        """Update project mention counts"""
-        try:
-            # Find existing project or create new entry
-            found = False
-            for item in self.project_mentions['items']:
-                if item['project'].lower() == project.lower():
-                    item['mentions'] += 1
-                    item['last_mentioned'] = datetime.utcnow().isoformat()
-                    found = True
-                    break
-            
-            if not found:
-                self.project_mentions['items'].append({
-                    'project': project,
-                    'mentions': 1,
-                    'first_mentioned': datetime.utcnow().isoformat(),
-                    'last_mentioned': datetime.utcnow().isoformat()
-                })
-            
-            self._save_json(self.project_mentions, self.files['mentions'])
-            
-        except Exception as e:
-            print(f"Error updating project mentions: {e}")
+    def flush(self):
+        """Write the mentions snapshot if it changed since the last write"""
+        with self._lock:
+            if not self._mentions_dirty:
+                return
+            snapshot = {'items': self.mentions.snapshot(), 'last_updated': datetime.utcnow().isoformat()}
+            self._mentions_dirty = False
+            self._mentions_saved_at = time.monotonic()
+        self._save_json(snapshot, self.files['mentions'])
     
     def get_trending_projects(self, category=None, limit=10):
         """Get trending projects, optionally filtered by category"""
@@ -167,33 +313,20 @@ class MarketIntelGatherer:
                 sorted_projects = [p for p in sorted_projects if p.get('category') == category]
             
             return sorted_projects[:limit]
-            
+        
         except Exception as e:
             print(f"Error getting trending projects: {e}")
             return []
     
     def get_most_mentioned_projects(self, hours=24, limit=10):
-        """Get most mentioned projects in the last X hours"""
+        """Get most mentioned projects in the last X hours
+        
+        'mentions' counts only the window; 'total_mentions' is all-time.
+        """
         try:
-            current_time = datetime.utcnow()
-            recent_projects = []
-            
-            for project in self.project_mentions['items']:
-                last_mentioned = datetime.fromisoformat(project['last_mentioned'])
-                hours_ago = (current_time - last_mentioned).total_seconds() / 3600
-                
-                if hours_ago <= hours:
-                    recent_projects.append(project)
-            
-            # Sort by mention count
-            sorted_projects = sorted(
-                recent_projects,
-                key=lambda x: x['mentions'],
-                reverse=True
-            )
-            
-            return sorted_projects[:limit]
-            
+            with self._lock:
+                return self.mentions.top(hours, limit, datetime.utcnow())
+        
         except Exception as e:
             print(f"Error getting most mentioned projects: {e}")
             return []
@@ -201,26 +334,16 @@ class MarketIntelGatherer:
     def get_user_favorites(self, username):
         """Get projects a user has interacted with"""
         try:
-            user_projects = {}
-            
-            for interaction in self.user_interactions['items']:
-                if interaction['username'] == username:
-                    project = interaction['project']
-                    user_projects[project] = user_projects.get(project, 0) + 1
-            
-            # Sort by interaction count
-            sorted_projects = sorted(
-                user_projects.items(),
-                key=lambda x: x[1],
-                reverse=True
-            )
+            with self._lock:
+                user_projects = self.user_projects.get(username, Counter())
+                sorted_projects = user_projects.most_common()
             
             return [{'project': p[0], 'interactions': p[1]} for p in sorted_projects]
-            
+        
         except Exception as e:
             print(f"Error getting user favorites: {e}")
             return []
-
+    
     def generate_market_insight(self):
         """Generate market insight based on collected data"""
         try:
@@ -260,7 +383,7 @@ class MarketIntelGatherer:
             
             # Return random insight or None if no insights
             return random.choice(insights) if insights else None
-            
+        
         except Exception as e:
             print(f"Error generating market insight: {e}")
             return None
@@ -0,0 +1,112 @@
+"""
+MinHash/LSH index for near-duplicate tweet detection
+"""
+from collections import deque
+from typing import Deque, Dict, FrozenSet, List, Set, Tuple
+import zlib
+
+import numpy as np
+
+_PRIME = np.uint64((1 << 31) - 1)
+
+def word_set(text: str) -> FrozenSet[str]:
+    """Lowercased whitespace-separated words, the unit of similarity"""
+    return frozenset(text.lower().split())
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    union = len(a | b)
+    return len(a & b) / union if union else 0.0
+
+class NearDuplicateIndex:
+    """Word-set Jaccard lookups over a sliding time window
+
+    Each text gets a MinHash signature of num_perm values, split into bands
+    of rows_per_band rows; texts sharing any band bucket become candidates
+    and are then checked with the exact Jaccard, so the index never reports
+    a false match. With the defaults (32 bands x 4 rows) a pair at 0.7
+    similarity becomes a candidate with probability > 0.999.
+
+    Entries must be added in timestamp order; anything older than max_age
+    seconds is expired on the next add or query.
+    """
+
+    def __init__(self, max_age: float = 7 * 24 * 3600, num_perm: int = 128, rows_per_band: int = 4, seed: int = 1):
+        if num_perm % rows_per_band:
+            raise ValueError("num_perm must be a multiple of rows_per_band")
+        self.max_age = max_age
+        self.num_perm = num_perm
+        self.rows_per_band = rows_per_band
+        self.bands = num_perm // rows_per_band
+
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, int(_PRIME), size=num_perm).astype(np.uint64)
+        self._b = rng.randint(0, int(_PRIME), size=num_perm).astype(np.uint64)
+
+        self._next_id = 0
+        self._entries: Dict[int, Tuple[float, FrozenSet[str], List[bytes]]] = {}
+        self._order: Deque[int] = deque()
+        self._buckets: List[Dict[bytes, Set[int]]] = [{} for _ in range(self.bands)]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _band_keys(self, words: FrozenSet[str]) -> List[bytes]:
+        hashes = np.fromiter(
+            (zlib.crc32(word.encode('utf-8')) for word in words), dtype=np.uint64, count=len(words)
+        ) % _PRIME
+        # (a * h + b) mod p for every permutation/word pair; products stay below 2**62
+        signature = ((np.outer(self._a, hashes) + self._b[:, None]) % _PRIME).min(axis=1)
+        rows = signature.astype(np.uint32).reshape(self.bands, self.rows_per_band)
+        return [row.tobytes() for row in rows]
+
+    def add(self, text: str, timestamp: float) -> None:
+        """Index text posted at timestamp (epoch seconds)"""
+        self.expire(timestamp)
+        words = word_set(text)
+        if not words:
+            return
+
+        entry_id = self._next_id
+        self._next_id += 1
+        keys = self._band_keys(words)
+        self._entries[entry_id] = (timestamp, words, keys)
+        self._order.append(entry_id)
+        for band, key in zip(self._buckets, keys):
+            band.setdefault(key, set()).add(entry_id)
+
+    def expire(self, now: float) -> None:
+        """Drop entries older than max_age"""
+        cutoff = now - self.max_age
+        while self._order and self._entries[self._order[0]][0] < cutoff:
+            entry_id = self._order.popleft()
+            _, _, keys = self._entries.pop(entry_id)
+            for band, key in zip(self._buckets, keys):
+                ids = band.get(key)
+                if ids is not None:
+                    ids.discard(entry_id)
+                    if not ids:
+                        del band[key]
+
+    def best_match(self, text: str, since: float = None) -> float:
+        """Highest Jaccard similarity to any candidate indexed after since (0.0 if none)"""
+        words = word_set(text)
+        if not words or not self._entries:
+            return 0.0
+
+        candidates: Set[int] = set()
+        for band, key in zip(self._buckets, self._band_keys(words)):
+            ids = band.get(key)
+            if ids:
+                candidates |= ids
+
+        best = 0.0
+        for entry_id in candidates:
+            timestamp, entry_words, _ = self._entries[entry_id]
+            if since is not None and timestamp <= since:
+                continue
+            best = max(best, jaccard(words, entry_words))
+        return best
+
+    def is_duplicate(self, text: str, threshold: float = 0.7, since: float = None) -> bool:
+        """Whether text is more than threshold similar to an entry indexed after since"""
+        return self.best_match(text, since) > threshold
@@ -0,0 +1,245 @@
+"""
+Operational counters and histograms, rendered in the Prometheus text format
+"""
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable, Dict, Iterable, Iterator, List, Sequence, Tuple
+import threading
+import time
+
+# Default histogram bucket upper bounds (seconds); +Inf is implicit
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+# Schedule lag is measured in seconds to minutes
+LAG_BUCKETS = (1, 5, 15, 30, 60, 120, 300, 600, 1800, 3600)
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+def _number(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+class _Metric:
+    """Shared bookkeeping; recording only touches a dict under a lock, formatting happens on scrape"""
+
+    kind = ''
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labelvalues: Tuple) -> Tuple[str, ...]:
+        if len(labelvalues) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {labelvalues}")
+        return tuple(str(value) for value in labelvalues)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+class Counter(_Metric):
+    """Monotonically increasing count per label set"""
+
+    kind = 'counter'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labelvalues, amount: float = 1) -> None:
+        key = self._key(labelvalues)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, *labelvalues) -> float:
+        return self._values.get(self._key(labelvalues), 0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return self.header() + [
+            f"{self.name}{_labels(self.labelnames, key)} {_number(value)}" for key, value in values
+        ]
+
+class Histogram(_Metric):
+    """Bucketed observations per label set, with sum and count"""
+
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [per-bucket counts (last is +Inf), sum]
+        self._series: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, *labelvalues) -> None:
+        key = self._key(labelvalues)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    @contextmanager
+    def time(self, *labelvalues) -> Iterator[None]:
+        """Observe the duration of the enclosed block, including when it raises"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labelvalues)
+
+    def instrument(self, *labelvalues) -> Callable:
+        """Decorator form of time()"""
+        def decorator(func: Callable) -> Callable:
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.time(*labelvalues):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def count(self, *labelvalues) -> int:
+        series = self._series.get(self._key(labelvalues))
+        return sum(series[0]) if series else 0
+
+    def render(self) -> List[str]:
+        with self._lock:
+            series = sorted((key, list(counts), total) for key, (counts, total) in self._series.items())
+        return self.header() + render_histogram(self.name, self.labelnames, self.buckets, series)
+
+def render_histogram(name: str, labelnames: Sequence[str], buckets: Sequence[float],
+                     series: Iterable[Tuple[Sequence[str], Sequence[int], float]]) -> List[str]:
+    """Sample lines for histogram series given as (label values, per-bucket counts, sum)
+
+    counts has one entry per bucket plus a trailing +Inf bucket and is not cumulative.
+    """
+    lines = []
+    for key, counts, total in series:
+        cumulative = 0
+        for bound, count in zip(list(buckets) + [float('inf')], counts):
+            cumulative += count
+            le = 'le="' + _number(bound) + '"'
+            lines.append(f"{name}_bucket{_labels(labelnames, key, le)} {cumulative}")
+        lines.append(f"{name}_sum{_labels(labelnames, key)} {_number(total)}")
+        lines.append(f"{name}_count{_labels(labelnames, key)} {cumulative}")
+    return lines
+
+class MetricsRegistry:
+    """Named metrics plus collectors that produce lines at scrape time
+
+    Collectors let subsystems with their own bookkeeping (LLM call stats)
+    be exported without recording anything twice.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], List[str]]] = []
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name: str, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric {name} is already registered as a {metric.kind}")
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, documentation, labelnames, buckets)
+
+    def add_collector(self, collector: Callable[[], List[str]]) -> None:
+        with self._lock:
+            self._collectors.append(collector)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format (0.0.4)"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors)
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        for collector in collectors:
+            lines.extend(collector())
+        return '\n'.join(lines) + '\n'
+
+# Content type of render() output
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Process-wide registry scraped by /metrics
+ops_metrics = MetricsRegistry()
+
+CRYPTORANK_FETCH_SECONDS = ops_metrics.histogram(
+    'elai_cryptorank_fetch_seconds', 'CryptoRank listing request latency', ['source', 'status'])
+CRYPTORANK_CACHE = ops_metrics.counter(
+    'elai_cryptorank_cache_total', 'CryptoRank listing lookups by cache result', ['result'])
+DATA_CACHE = ops_metrics.counter(
+    'elai_data_cache_total', 'Data source cache lookups and evictions by source and result',
+    ['source', 'result'])
+STRATEGY_RUN_SECONDS = ops_metrics.histogram(
+    'elai_strategy_run_seconds', 'Strategy analysis run time', ['strategy'])
+TRACKER_UPDATE_SECONDS = ops_metrics.histogram(
+    'elai_tracker_update_seconds', 'TokenHistoryTracker.update_token time')
+TRACKER_FLUSH_SECONDS = ops_metrics.histogram(
+    'elai_tracker_flush_seconds', 'TokenHistoryTracker.save_history time', ['storage'])
+POSTS = ops_metrics.counter(
+    'elai_posts_total', 'Outbox post attempts by tweet kind and outcome', ['kind', 'outcome'])
+SCHEDULE_LAG_SECONDS = ops_metrics.histogram(
+    'elai_schedule_lag_seconds', 'Delay between a job\'s scheduled time and when it ran', ['job'],
+    buckets=LAG_BUCKETS)
+
+def _collect_llm() -> List[str]:
+    """Export llm_metrics call stats as counters and a latency histogram"""
+    from llm_metrics import llm_metrics
+
+    snapshot = llm_metrics.snapshot()
+    sites = snapshot['sites']
+
+    lines = [
+        "# HELP elai_llm_calls_total LLM calls by call site and outcome",
+        "# TYPE elai_llm_calls_total counter"
+    ]
+    for name, stats in sites.items():
+        for outcome, count in sorted(stats['outcomes'].items()):
+            lines.append(f"elai_llm_calls_total{_labels(('site', 'outcome'), (name, outcome))} {count}")
+
+    lines += [
+        "# HELP elai_llm_tokens_total LLM tokens by call site and direction",
+        "# TYPE elai_llm_tokens_total counter"
+    ]
+    for name, stats in sites.items():
+        for direction in ('prompt', 'output'):
+            count = stats[f'{direction}_tokens']
+            lines.append(f"elai_llm_tokens_total{_labels(('site', 'direction'), (name, direction))} {count}")
+
+    lines += [
+        "# HELP elai_llm_latency_seconds LLM call latency by call site",
+        "# TYPE elai_llm_latency_seconds histogram"
+    ]
+    lines += render_histogram(
+        'elai_llm_latency_seconds', ('site',), snapshot['latency_buckets_s'],
+        (((name,), list(stats['latency']['buckets'].values()), stats['latency']['total_s'])
+         for name, stats in sites.items())
+    )
+    return lines
+
+ops_metrics.add_collector(_collect_llm)
@@ -6,6 +6,7 @@ import json
 import os
 import random
 from strategies.shared_utils import fetch_tokens, format_token_data
+from strategies.price_history import PriceHistory
 from strategies.volume_strategy import VolumeStrategy
 from strategies.trend_strategy import TrendStrategy
 import logging
@@ -24,6 +25,17 @@ class PortfolioTracker:
     MAX_24H_CHANGE = 50  # Max 50% price change in 24h for market data
     MIN_VOLUME = 1000000  # $1M minimum volume
     
+    # Binary price history; the old JSON file is imported once if present
+    PRICE_HISTORY_FILE = 'price_history.npz'
+    LEGACY_PRICE_HISTORY_FILE = 'price_history.json'
+    
+    # Minimum 24h volume of trade candidates per market tier
+    TIER_MIN_VOLUME = {
+        'weak': 5000000,  # Higher volume requirement
+        'normal': 2000000,  # Standard volume
+        'strong': 1000000  # Regular volume ok
+    }
+    
     def __init__(self, initial_capital: float = 100, api_key: str = None):
         """Initialize portfolio tracker with $100 and market data"""
         self.initial_capital = initial_capital
@@ -38,26 +50,29 @@ class PortfolioTracker:
         self.volume_strategy = VolumeStrategy(api_key)
         self.trend_strategy = TrendStrategy(api_key)
         
+        # Market health of the last token snapshot seen by find_realistic_trade
+        self._health = None
+        
         # Load or bootstrap price history
         self.price_history = self._load_price_history()
         if not self.price_history:
             self._bootstrap_historical_data()
-            
-    def _load_price_history(self) -> Dict:
+        
+        # Rolling indicators over the stored price series, one step per recorded snapshot
+        # Imported here: the elion package imports this module through its content generator
+        from elion.analysis.indicators import IndicatorEngine
+        self.indicators = IndicatorEngine()
+        for _, prices, volumes in self.price_history.steps(self.indicators.window):
+            self.indicators.update(prices, volumes)
+            
+    def _load_price_history(self) -> PriceHistory:
         """Load historical price data from file"""
-        try:
-            if os.path.exists('price_history.json'):
-                with open('price_history.json', 'r') as f:
-                    return json.load(f)
-            return {}
-        except:
-            return {}
+        return PriceHistory.load(self.PRICE_HISTORY_FILE, self.LEGACY_PRICE_HISTORY_FILE)
             
     def _save_price_history(self):
         """Save price history to file"""
         try:
-            with open('price_history.json', 'w') as f:
-                json.dump(self.price_history, f, indent=2)
+            self.price_history.save(self.PRICE_HISTORY_FILE)
         except Exception as e:
             print(f"Error saving price history: {e}")
             
@@ -68,17 +83,7 @@ class PortfolioTracker:
             if not tokens:
                 return
                 
-            for token in tokens[:100]:  # Only track top 100
-                symbol = token.get('symbol')
-                if not symbol:
-                    continue
-                    
-                self.price_history[symbol] = {
-                    'prices': [token.get('price', 0)],
-                    'volumes': [token.get('volume24h', 0)],
-                    'timestamps': [datetime.now().isoformat()]
-                }
-                
+            self.price_history.record(tokens[:100])  # Only track top 100
             self._save_price_history()
             
         except Exception as e:
@@ -145,6 +150,90 @@ class PortfolioTracker:
         except (ValueError, TypeError):
             return False
             
+    def _market_health(self, tokens: List[Dict]) -> Optional[Dict]:
+        """Market health and ranked trade candidate of a token snapshot
+        
+        Computed once per snapshot: fetch_tokens serves the same list
+        object until its cache expires, so repeated calls for a snapshot
+        reuse the scan.
+        """
+        health = self._health
+        if health is not None and health['tokens'] is tokens:
+            return health['result']
+            
+        # Analyze market health
+        valid_tokens = 0
+        down_tokens = 0
+        for token in tokens:
+            # For finding trades, we only validate basic token data
+            # Not the 24h price change since we're looking for volatile moves
+            if not self._validate_basic_token(token):
+                continue
+                
+            price_change = float(token.get('priceChange24h', 0))
+            if price_change < 0:
+                down_tokens += 1
+            valid_tokens += 1
+            
+        result = None
+        if valid_tokens:
+            # Calculate market health metrics
+            down_percentage = (down_tokens / valid_tokens) * 100
+            
+            if down_percentage > 70:  # Extremely bearish
+                tier = 'extreme_bearish'
+            elif down_percentage > 50:  # Weak market
+                tier = 'weak'
+            elif down_percentage > 30:  # Normal market
+                tier = 'normal'
+            else:  # Strong market (>70% up)
+                tier = 'strong'
+                
+            result = {
+                'down_percentage': down_percentage,
+                'tier': tier,
+                'trade_token': self._rank_candidates(tokens, tier)
+            }
+            
+        self._health = {'tokens': tokens, 'result': result}
+        return result
+        
+    def _rank_candidates(self, tokens: List[Dict], tier: str) -> Optional[Dict]:
+        """Best trade candidate for the market tier, or None if it fails validation"""
+        if tier == 'extreme_bearish':
+            return None
+            
+        min_volume = self.TIER_MIN_VOLUME[tier]
+        
+        # Find potential trades based on market condition
+        candidates = []
+        for token in tokens:
+            try:
+                volume = float(token.get('volume24h', 0))
+                mcap = float(token.get('marketCap', 0))
+                
+                if volume > min_volume and mcap > 10000000:
+                    # Rank by our preferred metric (volume or price change based on market)
+                    if tier == 'weak':
+                        # In weak markets, prefer higher volume tokens
+                        rank = volume
+                    else:
+                        # In normal/strong markets, balance volume and price change
+                        rank = volume * abs(float(token.get('priceChange24h', 0)))
+                    candidates.append((rank, token))
+            except (ValueError, TypeError):
+                continue
+                
+        if not candidates:
+            return None
+            
+        # First of the best ranked, as a stable descending sort would pick
+        best_rank = max(rank for rank, _ in candidates)
+        target_token = next(token for rank, token in candidates if rank == best_rank)
+        
+        # Skip large caps
+        return target_token if self._validate_token(target_token) else None
+        
     def find_realistic_trade(self, symbol_or_data: Any) -> Optional[Dict]:
         """Find trading opportunities based on market conditions"""
         try:
@@ -153,29 +242,15 @@ class PortfolioTracker:
             if not tokens:
                 return None
                 
-            # Analyze market health
-            valid_tokens = []
-            down_tokens = 0
-            for token in tokens:
-                # For finding trades, we only validate basic token data
-                # Not the 24h price change since we're looking for volatile moves
-                if not self._validate_basic_token(token):
-                    continue
-                    
-                price_change = float(token.get('priceChange24h', 0))
-                if price_change < 0:
-                    down_tokens += 1
-                valid_tokens.append(token)
-            
-            if not valid_tokens:
+            health = self._market_health(tokens)
+            if not health:
                 return None
                 
-            # Calculate market health metrics
-            down_percentage = (down_tokens / len(valid_tokens)) * 100
-            up_percentage = 100 - down_percentage
+            down_percentage = health['down_percentage']
+            tier = health['tier']
             
-            # Determine market condition and trading strategy
-            if down_percentage > 70:  # Extremely bearish
+            # Determine trading strategy for the market condition
+            if tier == 'extreme_bearish':
                 logger.info(f"Market bleeding: Over 70% tokens down. Halting trades.")
                 return {
                     'market_condition': 'extreme_bearish',
@@ -184,7 +259,7 @@ class PortfolioTracker:
                     'message': 'Market bleeding - preserving capital'
                 }
                 
-            elif down_percentage > 50:  # Weak market
+            elif tier == 'weak':
                 # 80% chance to skip trading
                 if random.random() < 0.8:
                     logger.info(f"Weak market: {down_percentage:.1f}% tokens down. Reducing trade frequency.")
@@ -196,51 +271,20 @@ class PortfolioTracker:
                     }
                 # Small gains in weak market
                 target_gain = random.uniform(2, 5)
-                min_volume = 5000000  # Higher volume requirement
                 
-            elif down_percentage > 30:  # Normal market
+            elif tier == 'normal':
                 # 20% chance to skip trading
                 if random.random() < 0.2:
                     return None
                 # Medium gains in normal market    
                 target_gain = random.uniform(5, 10)
-                min_volume = 2000000  # Standard volume
                 
-            else:  # Strong market (>70% up)
+            else:
                 # Large gains in strong market
                 target_gain = random.uniform(10, 20)
-                min_volume = 1000000  # Regular volume ok
-            
-            # Find potential trades based on market condition
-            candidates = []
-            for token in tokens:
-                try:
-                    price_change = float(token.get('priceChange24h', 0))
-                    volume = float(token.get('volume24h', 0))
-                    mcap = float(token.get('marketCap', 0))
-                    
-                    if volume > min_volume and mcap > 10000000:
-                        candidates.append(token)
-                except (ValueError, TypeError):
-                    continue
-            
-            if not candidates:
-                return None
                 
-            # Sort by our preferred metric (volume or price change based on market)
-            if down_percentage > 50:
-                # In weak markets, prefer higher volume tokens
-                candidates.sort(key=lambda x: float(x.get('volume24h', 0)), reverse=True)
-            else:
-                # In normal/strong markets, balance volume and price change
-                candidates.sort(key=lambda x: (
-                    float(x.get('volume24h', 0)) * abs(float(x.get('priceChange24h', 0)))
-                ), reverse=True)
-            
-            target_token = candidates[0]
-            
-            # Skip large caps
-            if not self._validate_token(target_token):
+            target_token = health['trade_token']
+            if target_token is None:
                 return None
                 
             # Calculate entry/exit to match our target gain
@@ -252,7 +296,7 @@ class PortfolioTracker:
             gain = round(((exit - entry) / entry) * 100, 2)
             
             # Generate timeframe based on market condition
-            if down_percentage > 50:
+            if tier == 'weak':
                 hours = random.randint(12, 24)  # Longer holds in weak market
             else:
                 hours = random.randint(4, 12)  # Faster trades in strong market
@@ -265,7 +309,7 @@ class PortfolioTracker:
                 'timeframe': f"{hours}h",
                 'volume_change': float(target_token.get('volume24h', 0)),
                 'price_change_24h': float(target_token.get('priceChange24h', 0)),
-                'market_condition': 'weak' if down_percentage > 50 else 'normal' if down_percentage > 30 else 'strong'
+                'market_condition': tier
             }
             
         except Exception as e:
@@ -350,14 +394,11 @@ class PortfolioTracker:
         try:
             # For BTC, enforce stricter validation
             if symbol == 'BTC':
-                # Get historical price data
-                historical_data = self.price_history.get(symbol, {})
-                if not historical_data:
+                # Get 24h high and low from historical price data
+                high_low = self.price_history.high_low(symbol, hours=24)
+                if not high_low:
                     return False
-                    
-                # Get 24h high and low
-                high_24h = float(historical_data.get('high_24h', price * 1.1))
-                low_24h = float(historical_data.get('low_24h', price * 0.9))
+                high_24h, low_24h = high_low
                 
                 # Price must be within 5% of 24h range
                 if price < low_24h * 0.95 or price > high_24h * 1.05:
@@ -427,18 +468,14 @@ class PortfolioTracker:
         
     def update_prices(self, market_data: Dict):
         """Update current prices and save history"""
-        date = datetime.now().strftime('%Y-%m-%d')
-        
         if isinstance(market_data, list):  # Handle validated token list
-            # Store today's prices
-            self.price_history[date] = {}
-            for token in market_data:
-                if all(k in token for k in ['symbol', 'price']):
-                    self.price_history[date][token['symbol']] = {
-                        'price': float(token['price']),
-                        'volume': float(token.get('volume24h', 0)),
-                        'change24h': float(token.get('priceChange24h', 0))
-                    }
+            # Store current prices and advance the indicators
+            recorded = self.price_history.record(market_data)
+            if recorded:
+                self.indicators.update(
+                    {symbol: price for symbol, (price, _) in recorded.items()},
+                    {symbol: volume for symbol, (_, volume) in recorded.items()}
+                )
             
             # Save updated history
             self._save_price_history()
@@ -480,12 +517,14 @@ class PortfolioTracker:
             'trades': self.trades,
             'daily_trades': self.daily_trades,
             'best_trade': self.best_trade,
-            'start_date': self.start_date,
-            'price_history': self.price_history
+            'start_date': self.start_date
         }
         with open(filename, 'w') as f:
             json.dump(state, f)
             
+        # Price history is kept in its own binary file
+        self._save_price_history()
+            
     def load_state(self, filename: str = 'portfolio_state.json') -> None:
         """Load portfolio state from file"""
         if os.path.exists(filename):
@@ -497,7 +536,10 @@ class PortfolioTracker:
                 self.daily_trades = state['daily_trades']
                 self.best_trade = state['best_trade']
                 self.start_date = state['start_date']
-                self.price_history = state.get('price_history', {})
+                
+                # States saved before the binary history carry it inline
+                if state.get('price_history'):
+                    self.price_history.import_legacy(state['price_history'])
 
     def get_portfolio_stats(self) -> Dict:
         """Get current portfolio statistics"""
@@ -0,0 +1,240 @@
+"""Bounded per-symbol price history in NumPy ring buffers"""
+
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+import json
+import logging
+import os
+import re
+import tempfile
+import time
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Samples kept per symbol (PRICE_HISTORY_CAPACITY); the oldest are overwritten
+DEFAULT_CAPACITY = int(os.getenv('PRICE_HISTORY_CAPACITY', 2016))
+
+_DATE_KEY = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+
+# Row order of a symbol's buffer
+_TS, _PRICE, _VOLUME = 0, 1, 2
+
+class _Ring:
+    """One symbol's samples: a (3, n) float64 array used as a circular buffer
+
+    Storage starts small and doubles until it reaches capacity, so rarely
+    seen symbols stay cheap.
+    """
+
+    __slots__ = ('data', 'head', 'size')
+
+    def __init__(self, initial: int):
+        self.data = np.empty((3, initial))
+        self.head = 0  # Next slot to write
+        self.size = 0
+
+    @classmethod
+    def from_samples(cls, samples: np.ndarray) -> '_Ring':
+        """Ring holding (3, n) samples given oldest first"""
+        ring = cls.__new__(cls)
+        ring.data = np.array(samples, dtype=np.float64)
+        ring.size = samples.shape[1]
+        ring.head = 0  # Storage is exactly full: the next append grows it or overwrites the oldest
+        return ring
+
+    def append(self, ts: float, price: float, volume: float, capacity: int):
+        slots = self.data.shape[1]
+        if self.size == slots and slots < capacity:
+            # Storage only grows before the oldest sample is overwritten, so samples
+            # are in order in [0, slots) and head has wrapped to 0; write after them
+            grown = np.empty((3, min(capacity, slots * 2)))
+            grown[:, :slots] = self.data
+            self.data = grown
+            self.head = slots
+            slots = grown.shape[1]
+        self.data[:, self.head] = (ts, price, volume)
+        self.head = (self.head + 1) % slots
+        self.size = min(self.size + 1, slots)
+
+    def ordered(self) -> np.ndarray:
+        """(3, size) samples, oldest first"""
+        if self.size < self.data.shape[1]:
+            return self.data[:, :self.size]
+        return np.concatenate((self.data[:, self.head:], self.data[:, :self.head]), axis=1)
+
+class PriceHistory:
+    """Fixed-capacity price and volume history per symbol
+
+    Each symbol keeps its last capacity samples (epoch timestamp, price,
+    volume) as float64, so memory stays bounded however long the bot
+    runs. Window queries are vectorized over the samples in range.
+    Samples are expected in time order per symbol.
+
+    Persisted as an .npz file holding one array per field, with every
+    symbol's samples concatenated oldest first.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        self.capacity = max(1, capacity)
+        self._rings: Dict[str, _Ring] = {}
+
+    def __len__(self) -> int:
+        return len(self._rings)
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self._rings
+
+    def __bool__(self) -> bool:
+        return bool(self._rings)
+
+    def symbols(self) -> Iterable[str]:
+        return self._rings.keys()
+
+    def append(self, symbol: str, price: float, volume: float = 0.0, ts: float = None):
+        """Record one sample; ts defaults to now"""
+        ring = self._rings.get(symbol)
+        if ring is None:
+            ring = self._rings[symbol] = _Ring(min(16, self.capacity))
+        ring.append(time.time() if ts is None else ts, price, volume, self.capacity)
+
+    def record(self, tokens: Iterable[Dict], ts: float = None) -> Dict[str, Tuple[float, float]]:
+        """Record price and 24h volume of every token with a symbol and price
+
+        Returns the recorded (price, volume) per symbol.
+        """
+        ts = time.time() if ts is None else ts
+        recorded = {}
+        for token in tokens:
+            symbol = token.get('symbol')
+            if not symbol or token.get('price') is None:
+                continue
+            try:
+                price, volume = float(token['price']), float(token.get('volume24h') or 0)
+            except (ValueError, TypeError):
+                continue
+            self.append(symbol, price, volume, ts)
+            recorded[symbol] = (price, volume)
+        return recorded
+
+    def steps(self, limit: int) -> List[Tuple[float, Dict[str, float], Dict[str, float]]]:
+        """(timestamp, prices, volumes) for the newest limit timestamps, oldest first
+
+        Each step holds the symbols that have a sample at that timestamp, as
+        written by one record() call.
+        """
+        steps: Dict[float, Tuple[Dict[str, float], Dict[str, float]]] = {}
+        for symbol, ring in self._rings.items():
+            samples = ring.ordered()[:, -limit:]
+            for ts, price, volume in samples.T.tolist():
+                prices, volumes = steps.setdefault(ts, ({}, {}))
+                prices[symbol] = price
+                volumes[symbol] = volume
+        return [(ts, *steps[ts]) for ts in sorted(steps)[-limit:]]
+
+    def window(self, symbol: str, hours: float = None, now: float = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(timestamps, prices, volumes) of the last hours, oldest first; all samples if hours is None"""
+        ring = self._rings.get(symbol)
+        if ring is None:
+            empty = np.empty(0)
+            return empty, empty, empty
+        samples = ring.ordered()
+        if hours is not None:
+            since = (time.time() if now is None else now) - hours * 3600
+            samples = samples[:, np.searchsorted(samples[_TS], since):]
+        return samples[_TS], samples[_PRICE], samples[_VOLUME]
+
+    def latest(self, symbol: str) -> Optional[Tuple[float, float, float]]:
+        """(timestamp, price, volume) of the newest sample"""
+        ring = self._rings.get(symbol)
+        if ring is None or not ring.size:
+            return None
+        ts, price, volume = ring.data[:, ring.head - 1]
+        return float(ts), float(price), float(volume)
+
+    def high_low(self, symbol: str, hours: float = 24, now: float = None) -> Optional[Tuple[float, float]]:
+        """Highest and lowest price over the last hours, None without samples"""
+        _, prices, _ = self.window(symbol, hours, now)
+        if not prices.size:
+            return None
+        return float(prices.max()), float(prices.min())
+
+    def change(self, symbol: str, hours: float = 24, now: float = None) -> Optional[float]:
+        """Percent change from the first to the last price in the window"""
+        _, prices, _ = self.window(symbol, hours, now)
+        if prices.size < 2 or prices[0] == 0:
+            return None
+        return float((prices[-1] / prices[0] - 1) * 100)
+
+    def save(self, path: str):
+        """Write all samples to path atomically"""
+        symbols = list(self._rings)
+        samples = [self._rings[symbol].ordered() for symbol in symbols]
+        stacked = np.concatenate(samples, axis=1) if samples else np.empty((3, 0))
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.savez(
+                    f,
+                    symbols=np.array(symbols, dtype=str),
+                    counts=np.array([s.shape[1] for s in samples], dtype=np.int64),
+                    ts=stacked[_TS], price=stacked[_PRICE], volume=stacked[_VOLUME]
+                )
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    @classmethod
+    def load(cls, path: str, legacy_path: str = None, capacity: int = DEFAULT_CAPACITY) -> 'PriceHistory':
+        """Load from path, else import legacy_path (price_history.json), else start empty"""
+        history = cls(capacity)
+        try:
+            if os.path.exists(path):
+                with np.load(path) as data:
+                    offsets = np.concatenate(([0], np.cumsum(data['counts'])))
+                    ts, price, volume = data['ts'], data['price'], data['volume']
+                    for symbol, start, stop in zip(data['symbols'], offsets[:-1], offsets[1:]):
+                        if stop == start:
+                            continue
+                        # Only the newest capacity samples fit
+                        start = max(start, stop - history.capacity)
+                        history._rings[str(symbol)] = _Ring.from_samples(
+                            np.stack((ts[start:stop], price[start:stop], volume[start:stop]))
+                        )
+            elif legacy_path and os.path.exists(legacy_path):
+                with open(legacy_path, 'r') as f:
+                    history.import_legacy(json.load(f))
+                logger.info(f"Imported price history for {len(history)} symbols from {legacy_path}")
+        except Exception as e:
+            logger.error(f"Error loading price history: {e}")
+        return history
+
+    def import_legacy(self, data: Dict):
+        """Add samples from the old JSON layouts
+
+        Keys are either symbols with 'prices'/'volumes'/'timestamps' lists
+        or YYYY-MM-DD dates mapping symbols to {'price', 'volume'}.
+        """
+        samples = []
+        for key, value in data.items():
+            if not isinstance(value, dict):
+                continue
+            if _DATE_KEY.match(key):
+                ts = datetime.strptime(key, '%Y-%m-%d').timestamp()
+                for symbol, entry in value.items():
+                    if isinstance(entry, dict) and 'price' in entry:
+                        samples.append((ts, symbol, entry['price'], entry.get('volume', 0)))
+            else:
+                for stamp, price, volume in zip(value.get('timestamps', []), value.get('prices', []),
+                                                value.get('volumes', [])):
+                    samples.append((datetime.fromisoformat(stamp).timestamp(), key, price, volume))
+
+        samples.sort(key=lambda sample: sample[0])
+        for ts, symbol, price, volume in samples:
+            try:
+                self.append(symbol, float(price), float(volume or 0), ts)
+            except (ValueError, TypeError):
+                continue
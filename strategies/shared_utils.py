@@ -4,6 +4,7 @@ import os
 import sys
 import time
 import json
+import logging
 import requests
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
@@ -15,6 +16,19 @@ if project_root not in sys.path:
     sys.path.append(project_root)
 
 from strategies.cryptorank_client import CryptoRankAPI
+from log_utils import log_sampled
+from ops_metrics import CRYPTORANK_CACHE, CRYPTORANK_FETCH_SECONDS
+from tracing import tracer
+from keyword_matcher import SUBSTRING, KeywordMatcher
+
+logger = logging.getLogger(__name__)
+
+# Stablecoin markers, matched anywhere in a symbol or name ("FDUSD", "USDe")
+STABLECOINS = KeywordMatcher({
+    'stablecoin': [
+        'usd', 'usdt', 'usdc', 'dai', 'busd', 'tusd', 'susd', 'lusd', 'frax', 'ausd', 'cusd', 'ousd', 'usds', 'usdd', 'fdusd'
+    ]
+}, boundary=SUBSTRING)
 
 # Cache settings
 _token_cache = {}  # Dict to store different sorted results
@@ -147,8 +161,9 @@ def filter_tokens_by_volume(tokens: list, min_volume_mcap_ratio: float = 1.0) ->
 def filter_tokens_by_trend(tokens: List[Dict], min_price_change: float = 5.0) -> List[Dict]:
     """Filter tokens by price trend"""
     trend_tokens = []
-    print(f"\nFiltering {len(tokens)} tokens for trends...")
-    print("First token data:", json.dumps(tokens[0], indent=2))
+    logger.debug("Filtering %d tokens for trends", len(tokens))
+    if tokens and logger.isEnabledFor(logging.DEBUG):
+        logger.debug("First token data: %s", json.dumps(tokens[0], indent=2))
     
     for token in tokens:
         try:
@@ -157,23 +172,23 @@ def filter_tokens_by_trend(tokens: List[Dict], min_price_change: float = 5.0) ->
             
             # Skip stablecoins (using both symbol and price check)
             if is_likely_stablecoin(symbol, price):
-                print(f"Skipping stablecoin: {symbol}")
+                logger.debug("Skipping stablecoin: %s", symbol)
                 continue
                 
             # Get price change
             price_change = float(token.get('priceChange24h', 0))
-            print(f"Token {symbol}: Price change = {price_change:+.1f}%")
+            logger.debug("Token %s: Price change = %+.1f%%", symbol, price_change)
             
             # Check if meets minimum change threshold
             if abs(price_change) >= min_price_change:
-                print(f"Found trending token: {symbol} ({price_change:+.1f}%)")
+                logger.debug("Found trending token: %s (%+.1f%%)", symbol, price_change)
                 trend_tokens.append(token)
                 
         except Exception as e:
-            print(f"Error filtering token: {str(e)}")
+            log_sampled(logger, logging.WARNING, 'trend.filter.error', "Error filtering token: %s", e)
             continue
             
-    print(f"\nFound {len(trend_tokens)} trending tokens")
+    logger.info("Found %d trending tokens out of %d", len(trend_tokens), len(tokens))
     return trend_tokens
 
 def format_token_data(token: Dict) -> Dict:
@@ -205,24 +220,14 @@ def process_tokens(tokens: List[Dict]) -> List[Dict]:
 
 def is_likely_stablecoin(symbol: str, price: float = None) -> bool:
     """Check if token is likely a stablecoin based on symbol and price"""
-    # Common stablecoin identifiers
-    stablecoin_patterns = [
-        'usd', 'usdt', 'usdc', 'dai', 'busd', 'tusd', 'susd', 'lusd', 'frax', 'ausd', 'cusd', 'ousd', 'usds'
-    ]
-    
-    # Convert symbol to lowercase
-    symbol = symbol.lower()
-    
-    # Check if symbol contains stablecoin pattern
-    for pattern in stablecoin_patterns:
-        if pattern in symbol:
-            # If price is provided, verify it's near $1 (within 20% range)
-            if price is not None:
-                return 0.8 <= price <= 1.2
-            return True
-            
-    return False
+    if not STABLECOINS.matches(symbol):
+        return False
+    # If price is provided, verify it's near $1 (within 20% range)
+    if price is not None:
+        return 0.8 <= price <= 1.2
+    return True
 
+@tracer.spanned('fetch')
 def fetch_tokens(api_key: str, sort_by='volume24h', direction='DESC', print_first=0, limit=1000) -> list:
     """Fetch tokens from CryptoRank API with specified sorting"""
     global _token_cache, _last_fetch_time
@@ -232,8 +237,10 @@ def fetch_tokens(api_key: str, sort_by='volume24h', direction='DESC', print_firs
     cache_key = f"{sort_by}_{direction}_{limit}"
     
     if _token_cache.get(cache_key) and current_time - _last_fetch_time < CACHE_DURATION:
-        print("Using cached token data")
+        logger.debug("Using cached token data")
+        CRYPTORANK_CACHE.inc('hit')
         return _token_cache[cache_key]
+    CRYPTORANK_CACHE.inc('miss')
     
     # Add delay between API calls
     if current_time - _last_fetch_time < 2:  # Wait at least 2 seconds between calls
@@ -255,29 +262,30 @@ def fetch_tokens(api_key: str, sort_by='volume24h', direction='DESC', print_firs
         
         # Make API request with key in header
         headers = {'X-Api-Key': api_key}
-        response = requests.get(f"{base_url}{endpoint}", params=params, headers=headers)
-        print(f"Response status: {response.status_code}")
+        start = time.perf_counter()
+        try:
+            response = requests.get(f"{base_url}{endpoint}", params=params, headers=headers)
+        except Exception:
+            CRYPTORANK_FETCH_SECONDS.observe(time.perf_counter() - start, 'shared', 'error')
+            raise
+        CRYPTORANK_FETCH_SECONDS.observe(time.perf_counter() - start, 'shared', response.status_code)
+        logger.debug("Response status: %s", response.status_code)
         
         if response.status_code != 200:
-            print(f"Error fetching data: {response.text}")
-            print("Rate limit headers:", dict(response.headers))
+            logger.error("Error fetching data: %s", response.text)
+            logger.error("Rate limit headers: %s", dict(response.headers))
             return []
             
         # Parse response
         data = response.json()
         raw_tokens = data.get('data', [])
         
-        # Debug: Show raw data for first token
-        if raw_tokens:
-            print("\nRaw data for first token:")
-            print(json.dumps(raw_tokens[0], indent=2))
-        
-        if print_first > 0:
-            print("\nFirst token raw data:")
-            print(json.dumps(raw_tokens[0], indent=2))
-            print("\nFirst token values:")
+        # Dump the first token only when asked to or debugging; it is large
+        if raw_tokens and (print_first > 0 or logger.isEnabledFor(logging.DEBUG)):
+            level = logging.INFO if print_first > 0 else logging.DEBUG
+            logger.log(level, "First token raw data:\n%s", json.dumps(raw_tokens[0], indent=2))
             values = raw_tokens[0].get('values', {}).get('USD', {})
-            print(json.dumps(values, indent=2))
+            logger.log(level, "First token values:\n%s", json.dumps(values, indent=2))
             
         # Format token data
         formatted_tokens = []
@@ -305,10 +313,11 @@ def fetch_tokens(api_key: str, sort_by='volume24h', direction='DESC', print_firs
                 
                 formatted_tokens.append(formatted_token)
             except Exception as e:
-                print(f"Error formatting token {token.get('symbol')}: {str(e)}")
+                log_sampled(logger, logging.WARNING, 'fetch.format.error',
+                            "Error formatting token %s: %s", token.get('symbol'), e)
                 continue
                 
-        print(f"Found {len(formatted_tokens)} tokens")
+        logger.info("Found %d tokens", len(formatted_tokens))
         
         # Update cache with new data
         _token_cache[cache_key] = formatted_tokens
@@ -317,7 +326,7 @@ def fetch_tokens(api_key: str, sort_by='volume24h', direction='DESC', print_firs
         return formatted_tokens
         
     except Exception as e:
-        print(f"Error fetching tokens: {str(e)}")
+        logger.error(f"Error fetching tokens: {e}")
         return []
 
 def get_portfolio_data(tokens: List[Dict], holdings: Dict) -> Dict:
@@ -9,6 +9,10 @@ import logging
 import redis
 import threading
 
+from log_utils import Event, log_sampled
+from ops_metrics import TRACKER_FLUSH_SECONDS, TRACKER_UPDATE_SECONDS
+from tracing import tracer
+
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -208,6 +212,10 @@ class TokenHistoryTracker:
     
     def save_history(self):
         """Save token history to storage"""
+        with TRACKER_FLUSH_SECONDS.time('redis' if self.using_redis else 'file'):
+            self._save_history()
+    
+    def _save_history(self):
         try:
             data = {
                 symbol: token.to_dict() 
@@ -216,64 +224,59 @@ class TokenHistoryTracker:
             
             if self.using_redis:
                 try:
-                    logger.info(f"Attempting to save {len(data)} tokens to Redis")
                     json_data = json.dumps(data)
-                    logger.info(f"JSON data size: {len(json_data)} bytes")
                     self.redis.set('token_history', json_data)
-                    logger.info(f"Saved {len(self.token_history)} tokens to Redis")
+                    logger.debug("Saved %d tokens to Redis (%d bytes)", len(data), len(json_data))
                     
-                    # Verify data was saved
-                    saved_data = self.redis.get('token_history')
-                    if saved_data:
-                        saved_json = json.loads(saved_data)
-                        logger.info(f"Successfully verified Redis data - found {len(saved_json)} tokens")
-                        logger.info("Tokens in Redis: " + ", ".join(saved_json.keys()))
-                    else:
-                        logger.error("Failed to verify Redis data - get returned None")
+                    # Read back to verify only when debugging; it doubles the Redis traffic per save
+                    if logger.isEnabledFor(logging.DEBUG):
+                        saved_data = self.redis.get('token_history')
+                        if saved_data:
+                            logger.debug("Verified Redis data - found %d tokens", len(json.loads(saved_data)))
+                        else:
+                            logger.error("Failed to verify Redis data - get returned None")
                 except Exception as e:
                     logger.error(f"Redis operation failed: {e}")
                     logger.error(f"Redis connection status: {self.redis.ping() if hasattr(self.redis, 'ping') else 'No ping method'}")
             else:
                 with open(self.history_file, 'w') as f:
                     json.dump(data, f, indent=2)
-                logger.info(f"Saved {len(self.token_history)} tokens to file")
+                logger.debug("Saved %d tokens to file", len(data))
                 
         except Exception as e:
             logger.error(f"Error saving token history: {e}")
     
+    @TRACKER_UPDATE_SECONDS.instrument()
     def update_token(self, token: Dict):
-        """Update token data in history"""
+        """Update token data in history
+        
+        Runs once per token per analysis, so per-token details are logged at
+        DEBUG and skips and updates as sampled INFO/WARNING events.
+        """
         try:
             # Extract token data using normalized format from TokenMonitor.run_analysis()
             symbol = token.get('symbol', '').upper()
             if not symbol:
-                logger.warning("No symbol found in token data")
+                log_sampled(logger, logging.WARNING, 'token.skip.symbol', "No symbol found in token data")
                 return
                 
-            # Log raw token data
-            logger.info(f"[{symbol}] Raw token data: {token}")
+            logger.debug("[%s] Raw token data: %s", symbol, token)
             
             with self._lock:  # Ensure thread safety for the entire update operation
-                # Extract values with detailed logging
                 try:
                     price = float(token.get('price', 0))
                     # Try API format first, fallback to strategy format
                     volume = float(token.get('volume24h', token.get('volume', 0)))
                     mcap = float(token.get('marketCap', token.get('mcap', 0)))
                     
-                    # Log extracted values
-                    logger.info(f"[{symbol}] Extracted values - price: {price}, volume: {volume}, mcap: {mcap}")
+                    logger.debug("[%s] Extracted values - price: %s, volume: %s, mcap: %s", symbol, price, volume, mcap)
                     
                     # Validate values
-                    if price <= 0:
-                        logger.warning(f"[{symbol}] Skipping token due to invalid price: {price}")
-                        return
-                    if volume <= 0:
-                        logger.warning(f"[{symbol}] Skipping token due to invalid volume: {volume}")
-                        return
-                    if mcap <= 0:
-                        logger.warning(f"[{symbol}] Skipping token due to invalid market cap: {mcap}")
-                        return
+                    for field, value in (('price', price), ('volume', volume), ('mcap', mcap)):
+                        if value <= 0:
+                            log_sampled(logger, logging.WARNING, f'token.skip.{field}',
+                                        Event('token.skip', symbol=symbol, reason=f'invalid {field}', value=value))
+                            return
                         
                 except (ValueError, TypeError) as e:
                     logger.error(f"[{symbol}] Error converting values: {e}")
@@ -284,11 +287,9 @@ class TokenHistoryTracker:
                 
                 # Update existing token or create new one
                 if symbol in self.token_history:
-                    logger.info(f"[{symbol}] Updating existing token")
                     token_data = self.token_history[symbol]
-                    
-                    # Log current state before update
-                    logger.info(f"[{symbol}] Current state: price={token_data.current_price}, volume={token_data.current_volume}, mcap={token_data.current_mcap}")
+                    logger.debug("[%s] Current state: price=%s, volume=%s, mcap=%s", symbol,
+                                 token_data.current_price, token_data.current_volume, token_data.current_mcap)
                     
                     # Update current values
                     token_data.current_price = price
@@ -296,58 +297,52 @@ class TokenHistoryTracker:
                     token_data.current_mcap = mcap
                     token_data.last_updated = current_time
                     
-                    logger.info(f"[{symbol}] Updated state: price={token_data.current_price}, volume={token_data.current_volume}, mcap={token_data.current_mcap}")
-                    
                     # Calculate time since first mention
                     time_diff = current_time - token_data.first_mention_date
-                    logger.info(f"[{symbol}] Time since first mention: {time_diff}")
                     
                     # Update time-based metrics if enough time has passed
                     # Continue updating these values even after the time period
                     if time_diff >= timedelta(hours=24):
-                        logger.info(f"[{symbol}] Updating 24h metrics")
                         token_data.price_24h_after = price
                         token_data.volume_24h_after = volume
                     
                     if time_diff >= timedelta(hours=48):
-                        logger.info(f"[{symbol}] Updating 48h metrics")
                         token_data.price_48h_after = price
                         token_data.volume_48h_after = volume
                     
                     if time_diff >= timedelta(days=7):
-                        logger.info(f"[{symbol}] Updating 7d metrics")
                         token_data.price_7d_after = price
                         token_data.volume_7d_after = volume
                     
                     # Update max values (now tracked beyond 7 days)
                     if price > token_data.max_price_7d:
-                        logger.info(f"[{symbol}] New max price: {price}")
                         token_data.max_price_7d = price
                         token_data.max_price_7d_date = current_time
                         # Avoid division by zero for price gain calculation
                         if token_data.first_mention_price > 0:
                             token_data.max_gain_percentage_7d = ((price - token_data.first_mention_price) / token_data.first_mention_price) * 100
-                            logger.info(f"[{symbol}] New max gain: {token_data.max_gain_percentage_7d}%")
                         else:
                             token_data.max_gain_percentage_7d = 0
                             logger.warning(f"[{symbol}] First mention price is 0, cannot calculate gain percentage")
                     
                     if volume > token_data.max_volume_7d:
-                        logger.info(f"[{symbol}] New max volume: {volume}")
                         token_data.max_volume_7d = volume
                         token_data.max_volume_7d_date = current_time
                         # Avoid division by zero for volume increase calculation
                         if token_data.first_mention_volume_24h > 0:
                             token_data.max_volume_increase_7d = ((volume - token_data.first_mention_volume_24h) / token_data.first_mention_volume_24h) * 100
-                            logger.info(f"[{symbol}] New max volume increase: {token_data.max_volume_increase_7d}%")
                         else:
                             token_data.max_volume_increase_7d = 0
                             logger.warning(f"[{symbol}] First mention volume is 0, cannot calculate volume increase")
                     
+                    log_sampled(logger, logging.INFO, 'token.update', Event(
+                        'token.update', symbol=symbol, price=price, volume=volume, mcap=mcap, age=time_diff,
+                        max_gain=token_data.max_gain_percentage_7d
+                    ))
+                    
                     # Save after update
                     self.save_history()
                 else:
-                    logger.info(f"[{symbol}] Creating new token history")
                     self.token_history[symbol] = TokenHistoricalData(
                         symbol=symbol,
                         first_mention_date=current_time,
@@ -360,7 +355,8 @@ class TokenHistoryTracker:
                         current_mcap=mcap,
                         last_updated=current_time
                     )
-                    logger.info(f"[{symbol}] Created new token entry")
+                    # New tokens are rare enough to log every time
+                    logger.info(Event('token.new', symbol=symbol, price=price, volume=volume, mcap=mcap))
                     
                     # Save after creation
                     self.save_history()
@@ -532,6 +528,7 @@ class TokenHistoryTracker:
             
         return patterns
 
+    @tracer.spanned('history.recent_performance')
     def get_recent_performance(self) -> Dict:
         """Get recent token performance data for tweet formatting using a smart selection system"""
         tokens = []
@@ -7,6 +7,7 @@ from datetime import datetime
 from strategies.token_history_tracker import TokenHistoryTracker
 from strategies.volume_strategy import VolumeStrategy
 from strategies.trend_strategy import TrendStrategy
+from tracing import tracer
 
 logger = logging.getLogger(__name__)
 
@@ -25,11 +26,13 @@ class TokenMonitor:
         self.trend_strategy = TrendStrategy(api_key)
         self.history_tracker = TokenHistoryTracker()
         
+    @tracer.traced('run_analysis')
     def run_analysis(self) -> Dict:
         """Run both strategies and track tokens they find"""
         # Get tokens from both strategies
         volume_data = self.volume_strategy.analyze()
         trend_data = self.trend_strategy.analyze()
+        updates = []
         
         # Track tokens from volume strategy
         if volume_data and 'spikes' in volume_data:
@@ -43,7 +46,7 @@ class TokenMonitor:
                     'priceChange24h': token.get('price_change', 0)
                 }
                 logger.info(f"Volume spike token data: {formatted_token}")
-                self.history_tracker.update_token(formatted_token)
+                updates.append(formatted_token)
                 
         if volume_data and 'anomalies' in volume_data:
             logger.info(f"Processing {len(volume_data['anomalies'])} tokens from volume anomalies")
@@ -56,7 +59,7 @@ class TokenMonitor:
                     'priceChange24h': token.get('price_change', 0)
                 }
                 logger.info(f"Volume anomaly token data: {formatted_token}")
-                self.history_tracker.update_token(formatted_token)
+                updates.append(formatted_token)
         
         # Track tokens from trend strategy
         if trend_data and 'trend_tokens' in trend_data:
@@ -71,10 +74,14 @@ class TokenMonitor:
                     'priceChange24h': token['price_change']  # Trend strategy uses 'price_change'
                 }
                 logger.info(f"Trend token data: {formatted_token}")
-                self.history_tracker.update_token(formatted_token)
+                updates.append(formatted_token)
         else:
             logger.warning("No 'trend_tokens' found in trend data")
         
+        with tracer.span('history.update'):
+            for formatted_token in updates:
+                self.history_tracker.update_token(formatted_token)
+        
         # Return original strategy data unchanged
         return {
             'volume_data': volume_data or {},
@@ -20,6 +20,23 @@ from strategies.shared_utils import (
     is_likely_stablecoin,
     get_movement_description
 )
+from ops_metrics import STRATEGY_RUN_SECONDS
+from tracing import tracer
+from keyword_matcher import SUBSTRING, KeywordMatcher
+
+# Token categories matched against name and symbol. Keywords need a word start
+# ("ai" matches "AIOZ" and "Fetch.ai", not "Chain"); common meme-name parts match
+# anywhere ("POPCAT", "SafeMoon", "ShibaInu").
+TOKEN_CATEGORIES = KeywordMatcher({
+    'ai': ['ai', 'artificial', 'intelligence', 'neural', 'brain', 'machine', 'learning', ('gpt', SUBSTRING),
+           'llm', 'cognitive', 'deep'],
+    'gaming': ['game', 'gaming', 'play', 'metaverse', 'nft', 'guild'],
+    'meme': [('doge', SUBSTRING), ('shib', SUBSTRING), ('pepe', SUBSTRING), 'wojak', 'meme', 'chad', 'elon',
+             ('cat', SUBSTRING), ('dog', SUBSTRING), ('inu', SUBSTRING), ('moon', SUBSTRING), 'safe',
+             ('baby', SUBSTRING), 'erc404'],
+    # Extra meme markers only used for meme+AI hybrids
+    'meme_hybrid': ['frog', 'coin']
+})
 
 class TrendStrategy:
     """Analyzes market trends"""
@@ -28,6 +45,8 @@ class TrendStrategy:
         """Initialize trend strategy"""
         self.api_key = api_key
         
+    @STRATEGY_RUN_SECONDS.instrument('trend')
+    @tracer.spanned('analysis.trend')
     def analyze(self) -> Dict:
         """Analyze current market trends"""
         try:
@@ -118,6 +137,7 @@ class TrendStrategy:
         else:
             return "➡️"  # Stable
 
+    @tracer.spanned('format.trend')
     def format_twitter_output(self, trend_tokens: list) -> str:
         """Format output for Twitter (max 280 chars)"""
         if not trend_tokens:
@@ -214,8 +234,6 @@ def calculate_trend_score(token: Dict) -> float:
 
 def analyze_ai_tokens(tokens: List[Dict], limit: int = 3) -> List[Dict]:
     """Find and analyze AI-related tokens"""
-    ai_keywords = ['ai', 'artificial', 'intelligence', 'neural', 'brain', 'machine', 'learning', 'gpt', 'llm', 'cognitive', 'deep']
-    
     filtered_tokens = []
     seen_symbols = set()
     
@@ -234,10 +252,10 @@ def analyze_ai_tokens(tokens: List[Dict], limit: int = 3) -> List[Dict]:
             mcap = float(token_info['mcap'])
             volume = float(token_info['volume'])
             
-            if symbol in seen_symbols or is_likely_stablecoin(token_info):
+            if symbol in seen_symbols or is_likely_stablecoin(token_info['symbol'], token_info['price']):
                 continue
                 
-            if any(keyword in name or keyword in symbol for keyword in ai_keywords):
+            if 'ai' in TOKEN_CATEGORIES.labels(name, symbol):
                 trend_score = calculate_trend_score(token_info)
                 if trend_score > 30 and volume > 100_000:  # Only require volume
                     token_info['trend_score'] = trend_score
@@ -255,7 +273,6 @@ def analyze_ai_tokens(tokens: List[Dict], limit: int = 3) -> List[Dict]:
 def analyze_gaming_tokens(tokens: List[Dict], limit: int = 3) -> List[Dict]:
     """Find and analyze gaming-related tokens"""
     gaming_tokens = []
-    gaming_keywords = ['game', 'gaming', 'play', 'metaverse', 'nft', 'guild']
     seen_symbols = set()
     
     for token in tokens:
@@ -273,10 +290,10 @@ def analyze_gaming_tokens(tokens: List[Dict], limit: int = 3) -> List[Dict]:
             mcap = float(token_info.get('mcap', 0))
             volume = float(token_info.get('volume', 0))
             
-            if symbol in seen_symbols or is_likely_stablecoin(token_info):
+            if symbol in seen_symbols or is_likely_stablecoin(token_info['symbol'], token_info['price']):
                 continue
                 
-            if any(keyword in name or keyword in symbol for keyword in gaming_keywords):
+            if 'gaming' in TOKEN_CATEGORIES.labels(name, symbol):
                 trend_score = calculate_trend_score(token_info)
                 if trend_score > 30 and volume > 100_000:
                     token_info['trend_score'] = trend_score
@@ -294,7 +311,6 @@ def analyze_gaming_tokens(tokens: List[Dict], limit: int = 3) -> List[Dict]:
 def analyze_meme_tokens(tokens: List[Dict], limit: int = 3) -> List[Dict]:
     """Find and analyze meme-related tokens"""
     meme_tokens = []
-    meme_keywords = ['doge', 'shib', 'pepe', 'wojak', 'meme', 'chad', 'elon', 'cat', 'dog', 'inu', 'moon', 'safe', 'baby', 'erc404']
     seen_symbols = set()
     
     for token in tokens:
@@ -312,10 +328,10 @@ def analyze_meme_tokens(tokens: List[Dict], limit: int = 3) -> List[Dict]:
             mcap = float(token_info.get('mcap', 0))
             volume = float(token_info.get('volume', 0))
             
-            if symbol in seen_symbols or is_likely_stablecoin(token_info):
+            if symbol in seen_symbols or is_likely_stablecoin(token_info['symbol'], token_info['price']):
                 continue
                 
-            if any(keyword in name or keyword in symbol for keyword in meme_keywords):
+            if 'meme' in TOKEN_CATEGORIES.labels(name, symbol):
                 trend_score = calculate_trend_score(token_info)
                 if trend_score > 30 and volume > 100_000:
                     token_info['trend_score'] = trend_score
@@ -332,9 +348,6 @@ def analyze_meme_tokens(tokens: List[Dict], limit: int = 3) -> List[Dict]:
 
 def analyze_memeai_tokens(tokens: List[Dict], limit: int = 3) -> List[Dict]:
     """Find and analyze meme+AI hybrid tokens"""
-    ai_keywords = ['ai', 'artificial', 'intelligence', 'neural', 'brain', 'machine', 'learning', 'gpt', 'llm', 'cognitive']
-    meme_keywords = ['meme', 'doge', 'shib', 'pepe', 'wojak', 'chad', 'inu', 'elon', 'moon', 'frog', 'cat', 'dog', 'coin', 'safe', 'baby']
-    
     filtered_tokens = []
     seen_symbols = set()
     
@@ -351,12 +364,13 @@ def analyze_memeai_tokens(tokens: List[Dict], limit: int = 3) -> List[Dict]:
         mcap = float(token_info['mcap'])
         volume = float(token_info['volume'])
         
-        if symbol in seen_symbols or is_likely_stablecoin(token_info):
+        if symbol in seen_symbols or is_likely_stablecoin(token_info['symbol'], token_info['price']):
             continue
             
         # Check if token has both AI and meme keywords
-        has_ai = any(keyword in name or keyword in symbol for keyword in ai_keywords)
-        has_meme = any(keyword in name or keyword in symbol for keyword in meme_keywords)
+        labels = TOKEN_CATEGORIES.labels(name, symbol)
+        has_ai = 'ai' in labels
+        has_meme = 'meme' in labels or 'meme_hybrid' in labels
         
         if has_ai and has_meme:
             trend_score = calculate_trend_score(token_info)
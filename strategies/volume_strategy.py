@@ -26,6 +26,9 @@ if project_root not in sys.path:
     sys.path.append(project_root)
 
 from strategies.scoring_base import BaseScoring
+from strategies.shared_utils import STABLECOINS
+from ops_metrics import CRYPTORANK_FETCH_SECONDS, STRATEGY_RUN_SECONDS
+from tracing import tracer
 
 class CryptoRankAPI:
     """CryptoRank API V2 client"""
@@ -116,7 +119,11 @@ class CryptoRankAPI:
             'orderDirection': 'DESC'
         }
         
+        start = time.perf_counter()
         response = self._make_request('currencies', params)
+        CRYPTORANK_FETCH_SECONDS.observe(
+            time.perf_counter() - start, 'volume_strategy', response.status_code if response else 'error'
+        )
         
         if not response or response.status_code != 200:
             print(f"Error fetching tokens: {response.text if response else 'No response'}")
@@ -125,6 +132,7 @@ class CryptoRankAPI:
         data = response.json()
         return data.get('data', [])
 
+@tracer.spanned('fetch')
 def fetch_tokens(api_key: str = None, sort_by='volume24h', direction='DESC', print_first=0):
     """Fetch tokens from CryptoRank API with specified sorting"""
     api_key = api_key or os.getenv('CRYPTORANK_API_KEY')
@@ -231,14 +239,10 @@ def is_likely_stablecoin(token_info):
     """Check if token is likely a stablecoin based on price and name"""
     try:
         price = float(token_info['price'])
-        symbol = str(token_info['symbol']).upper()
-        name = str(token_info.get('name', '')).upper()
         
-        # Price near $1
+        # Price near $1 and a stablecoin indicator in name/symbol
         if 0.95 <= price <= 1.05:
-            # Common stablecoin indicators in name/symbol
-            stablecoin_indicators = ['USD', 'USDT', 'USDC', 'DAI', 'BUSD', 'TUSD', 'USDD', 'FDUSD']
-            return any(indicator in symbol or indicator in name for indicator in stablecoin_indicators)
+            return STABLECOINS.matches(str(token_info['symbol']), str(token_info.get('name', '')))
         return False
     except (ValueError, TypeError, KeyError):
         return False  # If we can't parse the price, assume it's not a stablecoin
@@ -294,7 +298,7 @@ def filter_tokens_by_volume(tokens, min_volume_mcap_ratio=0.1):
             
             if mcap > 0:
                 ratio = (volume / mcap) * 100  # Convert to percentage
-                logger.info(f"Token: {symbol}, Volume: ${volume:,.2f}, MCap: ${mcap:,.2f}, V/MC: {ratio:.1f}%")
+                logger.debug("Token: %s, Volume: $%.2f, MCap: $%.2f, V/MC: %.1f%%", symbol, volume, mcap, ratio)
                 if ratio >= min_volume_mcap_ratio * 100:  # More than 10% volume/mcap
                     filtered_tokens.append((ratio, token_info))
                     seen_symbols.add(symbol)
@@ -431,6 +435,8 @@ class VolumeStrategy:
         self.llm = llm
         self.recent_tokens = set()  # Track recently posted tokens
         
+    @STRATEGY_RUN_SECONDS.instrument('volume')
+    @tracer.spanned('analysis.volume')
     def analyze(self) -> Dict:
         """Analyze volume patterns and return market data"""
         try:
@@ -476,6 +482,7 @@ class VolumeStrategy:
             print(f"Error in volume analysis: {e}")
             return None
 
+    @tracer.spanned('format.volume')
     def format_twitter_output(self, spikes: list, anomalies: list, history: Dict = None) -> str:
         """Format output for Twitter (max 280 chars)"""
         tweet = ""
@@ -0,0 +1,28 @@
+"""Test keyword classification of token names and news text"""
+from keyword_matcher import SUBSTRING, WORD, KeywordMatcher
+from strategies.trend_strategy import TOKEN_CATEGORIES
+
+def test_overlapping_keywords_from_different_labels():
+    """Keywords sharing letters each count for their own label"""
+    assert TOKEN_CATEGORIES.labels('dogpt') == ('ai', 'meme')
+    assert TOKEN_CATEGORIES.labels('DogeGPT', 'DGPT') == ('ai', 'meme')
+
+def test_shorter_keyword_at_same_start():
+    """A keyword that is a prefix of a longer match still counts"""
+    matcher = KeywordMatcher({'long': [('doge', SUBSTRING)], 'short': ['dog']})
+    assert matcher.labels('doge') == ('long', 'short')
+    assert matcher.labels('hotdoge') == ('long',)
+
+def test_boundaries():
+    """Word keywords need boundaries on both sides, prefix keywords only before"""
+    matcher = KeywordMatcher({'regulation': [('sec', WORD)], 'ai': ['ai']})
+    assert matcher.labels('SEC probe') == ('regulation',)
+    assert matcher.labels('second chain') == ()
+    assert matcher.labels('ai16z', 'Fetch.ai') == ('ai',)
+    assert matcher.matches('AIOZ')
+    assert not matcher.matches('Chain')
+
+def test_compound_meme_names():
+    """Meme-name parts inside compound names still mark the token as meme"""
+    for name in ('Popcat', 'POPCAT', 'Hotdog', 'Bobcat', 'SafeMoon', 'SHIBABABY', 'BabyDoge', 'DogWifHat'):
+        assert 'meme' in TOKEN_CATEGORIES.labels(name, name.upper()), name
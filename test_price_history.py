@@ -0,0 +1,53 @@
+"""Test bounded price history ring buffers"""
+import numpy as np
+from strategies.price_history import PriceHistory, _Ring
+
+def test_ring_keeps_order_while_growing_and_wrapping():
+    """Samples stay oldest-first past the initial storage and past capacity"""
+    history = PriceHistory(capacity=100)
+    for i in range(20):
+        history.append('A', float(i), 0.0, float(i))
+    ts, prices, _ = history.window('A')
+    assert np.array_equal(prices, np.arange(20.0))
+    assert np.array_equal(ts, np.arange(20.0))
+
+    for i in range(20, 250):
+        history.append('A', float(i), 0.0, float(i))
+    _, prices, _ = history.window('A')
+    assert np.array_equal(prices, np.arange(150.0, 250.0))
+    assert history.latest('A') == (249.0, 249.0, 0.0)
+
+def test_ring_from_samples_grows_in_order():
+    """A ring loaded exactly full appends after its samples"""
+    samples = np.stack((np.arange(16.0), np.arange(16.0), np.zeros(16)))
+    ring = _Ring.from_samples(samples)
+    for i in range(16, 40):
+        ring.append(float(i), float(i), 0.0, capacity=32)
+    assert np.array_equal(ring.ordered()[1], np.arange(8.0, 40.0))
+
+def test_change_over_window():
+    """Percent change uses the first and last price in the window"""
+    history = PriceHistory(capacity=100)
+    for i in range(30):
+        history.append('A', 100.0 + i, 0.0, 1000.0 + i * 3600)
+    assert history.change('A', hours=100, now=1000.0 + 29 * 3600) == (129.0 / 100.0 - 1) * 100
+
+def test_save_load_round_trip(tmp_path):
+    """Saved samples load back in order"""
+    history = PriceHistory(capacity=50)
+    for i in range(70):
+        history.append('A', float(i), 1.0, float(i))
+    path = str(tmp_path / 'price_history.npz')
+    history.save(path)
+    loaded = PriceHistory.load(path, capacity=50)
+    assert np.array_equal(loaded.window('A')[1], np.arange(20.0, 70.0))
+
+def test_record_and_steps_group_by_timestamp():
+    """Each record() call becomes one step holding the symbols it wrote"""
+    history = PriceHistory(capacity=10)
+    assert history.record([{'symbol': 'A', 'price': 1, 'volume24h': 5}, {'symbol': 'B'}], ts=1.0) == {'A': (1.0, 5.0)}
+    for ts in range(2, 6):
+        history.record([{'symbol': 'A', 'price': ts}, {'symbol': 'B', 'price': ts * 10}], ts=float(ts))
+    steps = history.steps(3)
+    assert [ts for ts, _, _ in steps] == [3.0, 4.0, 5.0]
+    assert steps[-1][1] == {'A': 5.0, 'B': 50.0}
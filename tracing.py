@@ -0,0 +1,304 @@
+"""
+Per-cycle trace spans and on-demand profiling of posting cycles
+"""
+from collections import Counter, deque
+from contextlib import contextmanager
+from functools import wraps
+from typing import Any, Callable, Dict, Iterator, List, Optional
+import cProfile
+import io
+import logging
+import os
+import pstats
+import sys
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+CPROFILE = 'cprofile'
+SAMPLING = 'sampling'
+
+class Span:
+    __slots__ = ('name', 'depth', 'start', 'duration', 'error')
+
+    def __init__(self, name: str, depth: int, start: float):
+        self.name = name
+        self.depth = depth
+        self.start = start
+        self.duration = 0.0
+        self.error = None
+
+class Trace:
+    """One cycle: the root span's name and wall-clock start plus every nested span"""
+
+    __slots__ = ('name', 'started_at', 'start', 'duration', 'error', 'spans', '_depth')
+
+    def __init__(self, name: str):
+        self.name = name
+        self.started_at = time.time()
+        self.start = time.perf_counter()
+        self.duration = 0.0
+        self.error = None
+        self.spans: List[Span] = []
+        self._depth = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'name': self.name,
+            'started_at': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(self.started_at)),
+            'duration_ms': round(self.duration * 1000, 3),
+            'error': self.error,
+            'spans': [
+                {
+                    'name': span.name,
+                    'depth': span.depth,
+                    'offset_ms': round((span.start - self.start) * 1000, 3),
+                    'duration_ms': round(span.duration * 1000, 3),
+                    'error': span.error
+                }
+                for span in self.spans
+            ]
+        }
+
+class CycleProfiler:
+    """Profiles the next N traced cycles and aggregates the result
+
+    cprofile mode runs cProfile in the cycle's thread. sampling mode
+    polls the cycle thread's stack every interval seconds from a helper
+    thread and counts collapsed stacks, which costs far less on long
+    cycles. Only one cycle is profiled at a time.
+    """
+
+    def __init__(self):
+        self.mode: Optional[str] = None
+        self.remaining = 0
+        self.cycles: List[str] = []
+        self.interval = 0.005
+        self._stats: Optional[pstats.Stats] = None
+        self._stacks: Counter = Counter()
+        self._samples = 0
+        self._active = False
+        self._lock = threading.Lock()
+
+    def arm(self, cycles: int, mode: str = CPROFILE, interval: float = 0.005) -> None:
+        """Profile the next cycles traced cycles, discarding earlier results"""
+        if mode not in (CPROFILE, SAMPLING):
+            raise ValueError(f"Unknown profiling mode: {mode}")
+        with self._lock:
+            self.mode = mode
+            self.remaining = max(0, int(cycles))
+            self.interval = interval
+            self.cycles = []
+            self._stats = None
+            self._stacks = Counter()
+            self._samples = 0
+
+    def _claim(self) -> Optional[str]:
+        with self._lock:
+            if self.remaining <= 0 or self._active:
+                return None
+            self.remaining -= 1
+            self._active = True
+            return self.mode
+
+    @contextmanager
+    def cycle(self, name: str) -> Iterator[None]:
+        """Profile the enclosed cycle if profiling is armed"""
+        mode = self._claim()
+        if mode is None:
+            yield
+            return
+        try:
+            if mode == CPROFILE:
+                with self._cprofile():
+                    yield
+            else:
+                with self._sample(threading.get_ident()):
+                    yield
+        finally:
+            with self._lock:
+                self.cycles.append(name)
+                self._active = False
+
+    @contextmanager
+    def _cprofile(self) -> Iterator[None]:
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError as e:
+            # Another profiler is already active in this thread
+            logger.warning(f"Could not start cProfile: {e}")
+            yield
+            return
+        try:
+            yield
+        finally:
+            profile.disable()
+            with self._lock:
+                if self._stats is None:
+                    self._stats = pstats.Stats(profile)
+                else:
+                    self._stats.add(profile)
+
+    @contextmanager
+    def _sample(self, thread_id: int) -> Iterator[None]:
+        done = threading.Event()
+
+        def sample():
+            while not done.wait(self.interval):
+                frame = sys._current_frames().get(thread_id)
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                    frame = frame.f_back
+                with self._lock:
+                    self._stacks[';'.join(reversed(stack))] += 1
+                    self._samples += 1
+
+        sampler = threading.Thread(target=sample, name='cycle-sampler', daemon=True)
+        sampler.start()
+        try:
+            yield
+        finally:
+            done.set()
+            sampler.join()
+
+    def report(self, limit: int = 40) -> Dict[str, Any]:
+        """Status plus the aggregated profile of the cycles profiled so far"""
+        with self._lock:
+            result = {
+                'mode': self.mode,
+                'remaining_cycles': self.remaining,
+                'profiled_cycles': list(self.cycles),
+                'active': self._active
+            }
+            if self.mode == CPROFILE and self._stats is not None:
+                out = io.StringIO()
+                self._stats.stream = out
+                self._stats.sort_stats('cumulative').print_stats(limit)
+                result['profile'] = out.getvalue()
+            elif self.mode == SAMPLING:
+                result['samples'] = self._samples
+                result['interval_s'] = self.interval
+                # Collapsed stacks ("frame;frame;frame count"), ready for flamegraph tools
+                result['stacks'] = [f"{stack} {count}" for stack, count in self._stacks.most_common(limit)]
+        return result
+
+class Tracer:
+    """Records nested spans per cycle into a ring buffer of recent traces
+
+    trace() opens a cycle (or acts as a span when one is already open in
+    the thread); span() marks a stage inside it and costs two clock reads
+    when a cycle is open and nothing otherwise. The last max_traces cycles
+    are kept (TRACE_BUFFER_SIZE).
+    """
+
+    def __init__(self, max_traces: int = None):
+        max_traces = int(os.getenv('TRACE_BUFFER_SIZE', 200)) if max_traces is None else max_traces
+        self._traces: deque = deque(maxlen=max_traces)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.profiler = CycleProfiler()
+
+    @contextmanager
+    def trace(self, name: str) -> Iterator[None]:
+        """Record the enclosed block as a cycle"""
+        if getattr(self._local, 'trace', None) is not None:
+            with self.span(name):
+                yield
+            return
+
+        trace = self._local.trace = Trace(name)
+        try:
+            with self.profiler.cycle(name):
+                yield
+        except BaseException as e:
+            trace.error = type(e).__name__
+            raise
+        finally:
+            trace.duration = time.perf_counter() - trace.start
+            self._local.trace = None
+            with self._lock:
+                self._traces.append(trace)
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        """Record the enclosed block as a stage of the current cycle, if any"""
+        trace = getattr(self._local, 'trace', None)
+        if trace is None:
+            yield
+            return
+
+        span = Span(name, trace._depth, time.perf_counter())
+        trace.spans.append(span)
+        trace._depth += 1
+        try:
+            yield
+        except BaseException as e:
+            span.error = type(e).__name__
+            raise
+        finally:
+            trace._depth -= 1
+            span.duration = time.perf_counter() - span.start
+
+    def traced(self, name: str) -> Callable:
+        """Decorator form of trace()"""
+        return self._decorator(self.trace, name)
+
+    def spanned(self, name: str) -> Callable:
+        """Decorator form of span()"""
+        return self._decorator(self.span, name)
+
+    @staticmethod
+    def _decorator(context: Callable, name: str) -> Callable:
+        def decorator(func: Callable) -> Callable:
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                with context(name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def recent(self, limit: int = 20, name: str = None) -> List[Dict[str, Any]]:
+        """Most recent traces first, optionally only cycles with the given name"""
+        with self._lock:
+            traces = list(self._traces)
+        traces = [trace for trace in reversed(traces) if name is None or trace.name == name]
+        return [trace.to_dict() for trace in traces[:limit]]
+
+    def summary(self) -> Dict[str, Any]:
+        """Per cycle name: count and mean/max duration of the cycle and each stage"""
+        with self._lock:
+            traces = list(self._traces)
+
+        cycles: Dict[str, Dict[str, Any]] = {}
+        for trace in traces:
+            cycle = cycles.setdefault(trace.name, {'count': 0, 'total_s': 0.0, 'max_s': 0.0, 'stages': {}})
+            cycle['count'] += 1
+            cycle['total_s'] += trace.duration
+            cycle['max_s'] = max(cycle['max_s'], trace.duration)
+            for span in trace.spans:
+                stage = cycle['stages'].setdefault(span.name, {'count': 0, 'total_s': 0.0, 'max_s': 0.0})
+                stage['count'] += 1
+                stage['total_s'] += span.duration
+                stage['max_s'] = max(stage['max_s'], span.duration)
+
+        def finish(stats: Dict[str, Any]) -> Dict[str, Any]:
+            return {
+                'count': stats['count'],
+                'mean_ms': round(stats['total_s'] / stats['count'] * 1000, 3),
+                'max_ms': round(stats['max_s'] * 1000, 3)
+            }
+
+        return {
+            name: {
+                **finish(cycle),
+                'stages': {stage: finish(stats) for stage, stats in cycle['stages'].items()}
+            }
+            for name, cycle in cycles.items()
+        }
+
+# Process-wide tracer used by all instrumented cycles
+tracer = Tracer()
@@ -9,11 +9,96 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 import random
 
+from near_duplicate_index import NearDuplicateIndex, jaccard, word_set
+
 logger = logging.getLogger(__name__)
 
+# Keywords behind get_market_mood (substring matches, as before)
+BULLISH_WORDS = {'moon', 'pump', 'breakout', 'accumulation', 'bullish', 'launch', 'integration'}
+BEARISH_WORDS = {'dump', 'crash', 'bearish', 'correction', 'fear'}
+
+def engagement_score(engagement: Dict) -> int:
+    """Weighted engagement used for thresholds and averages"""
+    return (
+        engagement.get('likes', 0) + 
+        engagement.get('retweets', 0) * 2 + 
+        engagement.get('replies', 0) * 3  # Weight replies more
+    )
+
+class HourBucket:
+    """Aggregates for tweets posted within one clock hour"""
+
+    __slots__ = ('tweets', 'count', 'likes', 'retweets', 'replies', 'bull', 'bear',
+                 'personas', 'categories', 'tokens')
+
+    def __init__(self):
+        self.tweets: List[tuple] = []  # (posted_at, tweet)
+        self.count = 0
+        self.likes = 0
+        self.retweets = 0
+        self.replies = 0
+        self.bull = 0
+        self.bear = 0
+        self.personas: Dict[str, int] = {}
+        self.categories: Dict[str, List[int]] = {}  # category -> [tweets, category engagement]
+        self.tokens: Dict[str, int] = {}
+
+    def add(self, tweet: Dict, sign: int = 1):
+        """Fold one tweet's contribution in (sign=-1 takes it back out)"""
+        engagement = tweet.get('engagement', {})
+        content = tweet['content'].lower()
+        self.count += sign
+        self.likes += sign * engagement.get('likes', 0)
+        self.retweets += sign * engagement.get('retweets', 0)
+        self.replies += sign * engagement.get('replies', 0)
+        self.bull += sign * sum(1 for word in BULLISH_WORDS if word in content)
+        self.bear += sign * sum(1 for word in BEARISH_WORDS if word in content)
+        self.personas[tweet['persona']] = self.personas.get(tweet['persona'], 0) + sign
+        category = self.categories.setdefault(tweet['category'], [0, 0])
+        category[0] += sign
+        category[1] += sign * (engagement.get('retweets', 0) * 2 + engagement.get('likes', 0))
+        for token in tweet.get('tokens', []):
+            self.tokens[token] = self.tokens.get(token, 0) + sign
+
+    def merge(self, other: 'HourBucket'):
+        """Add another bucket's aggregates (tweet refs are not copied)"""
+        self.count += other.count
+        self.likes += other.likes
+        self.retweets += other.retweets
+        self.replies += other.replies
+        self.bull += other.bull
+        self.bear += other.bear
+        for persona, n in other.personas.items():
+            self.personas[persona] = self.personas.get(persona, 0) + n
+        for name, (n, score) in other.categories.items():
+            category = self.categories.setdefault(name, [0, 0])
+            category[0] += n
+            category[1] += score
+        for token, n in other.tokens.items():
+            self.tokens[token] = self.tokens.get(token, 0) + n
+
+    @property
+    def engagement(self) -> int:
+        return self.likes + self.retweets * 2 + self.replies * 3
+
 class TweetHistoryManager:
-    def __init__(self, history_file: str = "elion_tweet_history.json"):
+    """Tweet history kept as a JSON snapshot plus an append-only JSONL journal
+
+    Every change is appended to the journal as one small record and applied
+    in memory; the snapshot is only rewritten when the journal is compacted
+    (every compact_every records, and on startup if a journal was left over).
+    Loading reads the snapshot, which holds the recent window, and replays
+    the journal on top of it.
+
+    Time-window queries read per-hour HourBuckets maintained as tweets are
+    added, trimmed or re-scored, so their cost depends on the window length
+    rather than the number of stored tweets.
+    """
+
+    def __init__(self, history_file: str = "elion_tweet_history.json", compact_every: int = 500):
         self.history_file = history_file
+        self.journal_file = f"{history_file}.journal"
+        self.compact_every = compact_every
         self.max_history_size = 300 * 1024 * 1024  # 300MB in bytes
         self.history = self._load_history()
         
@@ -69,6 +154,95 @@ class TweetHistoryManager:
         if 'hot_projects' not in self.history:
             self.history['hot_projects'] = []
         
+        # Rolling per-hour aggregates (keyed by the hour's start) and per hour-of-day totals
+        self.hourly: Dict[datetime, HourBucket] = {}
+        self.hour_of_day = [HourBucket() for _ in range(24)]
+        for tweet in self.history['tweets']:
+            self._bucket_add(tweet)
+        
+        # Replay changes made since the last snapshot, then fold them in
+        self._journal_records = self._replay_journal()
+        if self._journal_records:
+            self._save_history()
+        
+        # Near-duplicate index over the last week of tweets
+        self.duplicate_index = NearDuplicateIndex(max_age=7 * 24 * 3600)
+        self._rebuild_duplicate_index()
+        
+    def _rebuild_duplicate_index(self):
+        """Index recent tweets for is_recent_duplicate"""
+        cutoff = datetime.now().timestamp() - self.duplicate_index.max_age
+        for tweet in self.history['tweets']:
+            try:
+                timestamp = datetime.fromisoformat(tweet['timestamp']).timestamp()
+            except (KeyError, TypeError, ValueError):
+                continue
+            if timestamp > cutoff:
+                self.duplicate_index.add(tweet['content'], timestamp)
+        
+    def _bucket_add(self, tweet: Dict, sign: int = 1):
+        """Add (or with sign=-1 remove) a tweet in the hourly aggregates"""
+        try:
+            posted_at = datetime.fromisoformat(tweet['timestamp'])
+        except (KeyError, TypeError, ValueError):
+            return
+        
+        hour = posted_at.replace(minute=0, second=0, microsecond=0)
+        bucket = self.hourly.get(hour)
+        if bucket is None:
+            if sign < 0:
+                return
+            bucket = self.hourly[hour] = HourBucket()
+        
+        bucket.add(tweet, sign)
+        self.hour_of_day[hour.hour].add(tweet, sign)
+        if sign > 0:
+            bucket.tweets.append((posted_at, tweet))
+        else:
+            bucket.tweets = [entry for entry in bucket.tweets if entry[1] is not tweet]
+            if not bucket.tweets:
+                del self.hourly[hour]
+
+    def _window_buckets(self, cutoff: datetime) -> List[tuple]:
+        """(hour, bucket) pairs that can hold tweets posted after cutoff"""
+        boundary = cutoff.replace(minute=0, second=0, microsecond=0)
+        span = int((datetime.now() - boundary).total_seconds() // 3600) + 1
+        if span >= len(self.hourly):
+            return [(hour, bucket) for hour, bucket in self.hourly.items() if hour >= boundary]
+        
+        buckets = []
+        for offset in range(span + 1):
+            hour = boundary + timedelta(hours=offset)
+            bucket = self.hourly.get(hour)
+            if bucket is not None:
+                buckets.append((hour, bucket))
+        return buckets
+
+    def _window(self, cutoff: datetime) -> HourBucket:
+        """Aggregate of tweets posted after cutoff
+
+        Whole buckets are merged; only the bucket containing cutoff is
+        filtered tweet by tweet.
+        """
+        total = HourBucket()
+        boundary = cutoff.replace(minute=0, second=0, microsecond=0)
+        for hour, bucket in self._window_buckets(cutoff):
+            if hour > boundary:
+                total.merge(bucket)
+            else:
+                for posted_at, tweet in bucket.tweets:
+                    if posted_at > cutoff:
+                        total.add(tweet)
+        return total
+
+    def _window_tweets(self, cutoff: datetime) -> List[Dict]:
+        """Tweets posted after cutoff, read from the buckets that cover the window"""
+        return [
+            tweet
+            for _, bucket in self._window_buckets(cutoff)
+            for posted_at, tweet in bucket.tweets if posted_at > cutoff
+        ]
+
     def _load_history(self) -> Dict:
         """Load tweet history from file"""
         default_history = {
@@ -102,6 +276,8 @@ class TweetHistoryManager:
         
         # Keep only last 1000 tweets
         if len(self.history['tweets']) > 1000:
+            for tweet in self.history['tweets'][:-1000]:
+                self._bucket_add(tweet, sign=-1)
             self.history['tweets'] = self.history['tweets'][-1000:]
         
         # Convert sets to lists for JSON serialization
@@ -124,64 +300,113 @@ class TweetHistoryManager:
                 )
 
     def _save_history(self):
-        """Save tweet history to file with cleanup"""
+        """Compact: write a snapshot of the current state and truncate the journal"""
         self._cleanup_old_history()
         
-        # Create temp file for atomic save
+        # Write to a temp file and atomically swap it in
         temp_file = f"{self.history_file}.tmp"
-        backup_file = f"{self.history_file}.bak"
-        
         try:
-            # Write to temp file first
             with open(temp_file, 'w') as f:
-                json.dump(self.history, f, indent=2)
-            
-            # Create backup of current file
-            if os.path.exists(self.history_file):
-                try:
-                    os.replace(self.history_file, backup_file)
-                except OSError:
-                    pass
-            
-            # Atomic replace of current file with temp file
+                json.dump(self.history, f, separators=(',', ':'))
             os.replace(temp_file, self.history_file)
-            
-            # Remove backup if everything succeeded
-            if os.path.exists(backup_file):
-                os.remove(backup_file)
-                
         except Exception as e:
-            # Restore from backup if save fails
-            if os.path.exists(backup_file):
-                os.replace(backup_file, self.history_file)
-            # Clean up temp file
             if os.path.exists(temp_file):
                 os.remove(temp_file)
             raise e
+        
+        # Snapshot now covers everything in the journal
+        with open(self.journal_file, 'w'):
+            pass
+        self._journal_records = 0
+
+    def _append(self, record: Dict):
+        """Apply a change in memory and append it to the journal"""
+        self._apply(record)
+        with open(self.journal_file, 'a') as f:
+            f.write(json.dumps(record, separators=(',', ':')) + '\n')
+        
+        self._journal_records += 1
+        if self._journal_records >= self.compact_every:
+            self._save_history()
+
+    def _replay_journal(self) -> int:
+        """Apply journal records written after the snapshot, returning how many"""
+        if not os.path.exists(self.journal_file):
+            return 0
+        
+        count = 0
+        with open(self.journal_file, 'r') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # A crash mid-write leaves at most one torn line at the end
+                    logger.warning(f"Skipping unreadable journal record in {self.journal_file}")
+                    continue
+                self._apply(record)
+                count += 1
+        return count
+
+    def _apply(self, record: Dict):
+        """Apply one journal record to the in-memory history"""
+        op = record['op']
+        if op == 'tweet':
+            tweet = record['tweet']
+            self.history['tweets'].append(tweet)
+            self.history['metadata']['total_tweets'] += 1
+            self.history['personas'][tweet['persona']] = self.history['personas'].get(tweet['persona'], 0) + 1
+            self.history['topics'][tweet['category']] = self.history['topics'].get(tweet['category'], 0) + 1
+            self.history['tokens'].extend(tweet['tokens'])
+            self._bucket_add(tweet)
+            self._cleanup_old_history()
+        elif op == 'project_engagement':
+            stats = self.history['project_stats'].setdefault(record['project'], {
+                'mentions': 0,
+                'total_engagement': 0,
+                'last_mentioned': None
+            })
+            stats['mentions'] += 1
+            stats['total_engagement'] += record['score']
+            stats['last_mentioned'] = record['timestamp']
+        elif op == 'tweet_engagement':
+            self._apply_tweet_engagement(record['id'], record['metrics'])
+        elif op in ('interaction', 'personality_trait', 'tweet_type'):
+            counters = self.history[{
+                'interaction': 'interactions',
+                'personality_trait': 'personality_stats',
+                'tweet_type': 'tweet_types'
+            }[op]]
+            if record['name'] in counters:
+                counters[record['name']] += 1
+        elif op == 'favorite_human':
+            self.history['favorite_humans'].append(record['username'])
+        elif op == 'running_joke':
+            self.history['running_jokes'].append(record['joke'])
+        elif op == 'hot_project':
+            self.history['hot_projects'].append(record['project'])
+            # Keep only last 10 hot projects
+            if len(self.history['hot_projects']) > 10:
+                self.history['hot_projects'] = self.history['hot_projects'][-10:]
+        else:
+            logger.warning(f"Unknown tweet history journal op: {op}")
 
     def add_tweet(self, tweet_content: str, persona: str, category: str):
         """Add a new tweet to history"""
         # Extract mentioned tokens
         tokens = [word for word in tweet_content.split() if word.startswith('$')]
         
+        now = datetime.now()
         tweet = {
             'content': tweet_content,
             'persona': persona,
             'category': category,
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': now.isoformat(),
             'tokens': tokens
         }
+        self.duplicate_index.add(tweet_content, now.timestamp())
         
-        # Update statistics
-        self.history['tweets'].append(tweet)
-        self.history['metadata']['total_tweets'] += 1
-        self.history['personas'][persona] = self.history['personas'].get(persona, 0) + 1
-        self.history['topics'][category] = self.history['topics'].get(category, 0) + 1
-        self.history['tokens'].extend(tokens)
-        
-        # Cleanup if needed
-        self._cleanup_old_history()
-        self._save_history()
+        # Update statistics and journal the tweet
+        self._append({'op': 'tweet', 'tweet': tweet})
     
     def _cleanup_if_needed(self):
         """Cleanup old tweets if file size exceeds limit"""
@@ -189,6 +414,8 @@ class TweetHistoryManager:
             return
             
         current_size = os.path.getsize(self.history_file)
+        if os.path.exists(self.journal_file):
+            current_size += os.path.getsize(self.journal_file)
         if current_size > self.max_history_size:
             logger.info(f"History file size ({current_size} bytes) exceeds limit ({self.max_history_size} bytes). Cleaning up...")
             
@@ -198,6 +425,8 @@ class TweetHistoryManager:
             keep_count = max(keep_count, 1000)  # Keep at least 1000 tweets
             
             # Keep most recent tweets
+            for tweet in self.history['tweets'][:-keep_count]:
+                self._bucket_add(tweet, sign=-1)
             self.history['tweets'] = self.history['tweets'][-keep_count:]
             
             # Reset statistics
@@ -220,16 +449,9 @@ class TweetHistoryManager:
             self.history['tokens'].extend(tweet.get('tokens', []))
     
     def get_recent_tokens(self, days: int = 3) -> list:
-        """Get tokens mentioned in last N days"""
-        cutoff = datetime.now() - timedelta(days=days)
-        recent_tokens = []
-        
-        for tweet in self.history['tweets']:
-            tweet_date = datetime.fromisoformat(tweet['timestamp'])
-            if tweet_date > cutoff:
-                recent_tokens.extend(tweet.get('tokens', []))
-        
-        return recent_tokens
+        """Get tokens mentioned in last N days, once per mention, grouped by token"""
+        counts = self._window(datetime.now() - timedelta(days=days)).tokens
+        return [token for token, n in counts.items() for _ in range(n)]
     
     def get_persona_stats(self) -> Dict:
         """Get statistics about persona usage"""
@@ -243,18 +465,20 @@ class TweetHistoryManager:
         """Check if similar content was tweeted recently"""
         cutoff = datetime.now() - timedelta(hours=hours)
         
+        # Windows inside the index's retention are answered from MinHash candidates
+        if hours * 3600 <= self.duplicate_index.max_age:
+            return self.duplicate_index.is_duplicate(content, threshold=0.7, since=cutoff.timestamp())
+        
         # Get recent tweets
         recent_tweets = [
             tweet['content'] for tweet in self.history['tweets']
             if datetime.fromisoformat(tweet['timestamp']) > cutoff
         ]
         
-        # Simple similarity check (can be improved)
-        content_words = set(content.lower().split())
+        # Word-set Jaccard against each recent tweet
+        content_words = word_set(content)
         for tweet in recent_tweets:
-            tweet_words = set(tweet.lower().split())
-            similarity = len(content_words.intersection(tweet_words)) / len(content_words.union(tweet_words))
-            if similarity > 0.7:  # 70% similar words
+            if jaccard(content_words, word_set(tweet)) > 0.7:  # 70% similar words
                 return True
         
         return False
@@ -263,13 +487,9 @@ class TweetHistoryManager:
         """Suggest a persona based on recent usage and category"""
         # Get persona usage in last 24h
         cutoff = datetime.now() - timedelta(hours=24)
-        recent_personas = {}
-        
-        for tweet in self.history['tweets']:
-            tweet_date = datetime.fromisoformat(tweet['timestamp'])
-            if tweet_date > cutoff:
-                persona = tweet['persona']
-                recent_personas[persona] = recent_personas.get(persona, 0) + 1
+        recent_personas = {
+            persona: count for persona, count in self._window(cutoff).personas.items() if count > 0
+        }
         
         # Prefer less used personas
         all_personas = {'alpha_hunter', 'degen_trader', 'tech_analyst', 'meta_commentary', 'insider_ai'}
@@ -280,29 +500,17 @@ class TweetHistoryManager:
         
         # If all used, pick least used
         return min(recent_personas.items(), key=lambda x: x[1])[0]
-    
+
     def get_market_mood(self, hours: int = 24) -> str:
         """Analyze recent tweets to determine market mood"""
-        cutoff = datetime.now() - timedelta(hours=hours)
-        recent_tweets = [
-            tweet for tweet in self.history['tweets']
-            if datetime.fromisoformat(tweet['timestamp']) > cutoff
-        ]
+        recent = self._window(datetime.now() - timedelta(hours=hours))
         
-        if not recent_tweets:
+        if not recent.count:
             return 'neutral'
         
-        # Simple sentiment analysis based on keywords
-        bullish_words = {'moon', 'pump', 'breakout', 'accumulation', 'bullish', 'launch', 'integration'}
-        bearish_words = {'dump', 'crash', 'bearish', 'correction', 'fear'}
-        
-        bull_count = 0
-        bear_count = 0
-        
-        for tweet in recent_tweets:
-            content = tweet['content'].lower()
-            bull_count += sum(1 for word in bullish_words if word in content)
-            bear_count += sum(1 for word in bearish_words if word in content)
+        # Keyword hit counts were tallied per tweet on insert
+        bull_count = recent.bull
+        bear_count = recent.bear
         
         if bull_count > bear_count * 1.5:
             return 'bullish'
@@ -312,39 +520,23 @@ class TweetHistoryManager:
 
     def track_project_engagement(self, project: str, engagement: dict):
         """Track engagement metrics for specific projects"""
-        if project not in self.history['project_stats']:
-            self.history['project_stats'][project] = {
-                'mentions': 0,
-                'total_engagement': 0,
-                'last_mentioned': None
-            }
-        
-        stats = self.history['project_stats'][project]
-        stats['mentions'] += 1
-        stats['total_engagement'] += (engagement.get('retweets', 0) * 2 + engagement.get('likes', 0))
-        stats['last_mentioned'] = datetime.now().isoformat()
-        self._save_history()
+        self._append({
+            'op': 'project_engagement',
+            'project': project,
+            'score': engagement.get('retweets', 0) * 2 + engagement.get('likes', 0),
+            'timestamp': datetime.now().isoformat()
+        })
 
     def get_top_performing_categories(self, days: int = 7):
         """Get categories sorted by engagement"""
-        cutoff = datetime.now() - timedelta(days=days)
-        category_stats = {}
-        
-        for tweet in self.history['tweets']:
-            if datetime.fromisoformat(tweet['timestamp']) > cutoff:
-                category = tweet['category']
-                if category not in category_stats:
-                    category_stats[category] = {
-                        'tweets': 0,
-                        'engagement': 0
-                    }
-                category_stats[category]['tweets'] += 1
-                engagement = tweet.get('engagement', {})
-                engagement_score = (
-                    engagement.get('retweets', 0) * 2 + 
-                    engagement.get('likes', 0)
-                )
-                category_stats[category]['engagement'] += engagement_score
+        recent = self._window(datetime.now() - timedelta(days=days))
+        category_stats = {
+            category: {
+                'tweets': tweets,
+                'engagement': engagement
+            }
+            for category, (tweets, engagement) in recent.categories.items() if tweets > 0
+        }
         
         # Sort by engagement per tweet
         return sorted(
@@ -353,42 +545,39 @@ class TweetHistoryManager:
             reverse=True
         )
 
+    def _count_tweet_type(self, tweet_type: str) -> str:
+        """Record that tweet_type was chosen and return it"""
+        self._append({'op': 'tweet_type', 'name': tweet_type})
+        return tweet_type
+
     def get_tweet_type_for_next_post(self):
         """Determine next tweet type based on cycle position"""
         total_tweets = self.history['metadata'].get('total_tweets', 0)
         
         # Portfolio updates every 200 posts
         if total_tweets > 0 and total_tweets % 200 == 0:
-            self.history['tweet_types']['portfolio_update'] += 1
-            return 'portfolio_update'
+            return self._count_tweet_type('portfolio_update')
             
         position_in_cycle = total_tweets % 50
         
         # Update tweet type counts
         if position_in_cycle in [5, 15, 25, 35, 45]:  # Every 10th post is a gem call
-            self.history['tweet_types']['gem_alpha'] += 1
-            return 'gem_alpha'
+            return self._count_tweet_type('gem_alpha')
         elif position_in_cycle in [8, 18, 28, 38, 48]:  # Review user suggestions
-            self.history['tweet_types']['shill_review'] += 1
-            return 'shill_review'
+            return self._count_tweet_type('shill_review')
         elif position_in_cycle in [10, 30]:  # Posts 10 and 30 are AI self-aware
-            self.history['tweet_types']['ai_aware'] += 1
-            return 'ai_aware'
+            return self._count_tweet_type('ai_aware')
         elif position_in_cycle in [20, 40]:  # Posts 20 and 40 are controversial
-            self.history['tweet_types']['controversial'] += 1
-            return 'controversial'
+            return self._count_tweet_type('controversial')
         elif position_in_cycle == 0:  # Last post in cycle is a giveaway
-            self.history['tweet_types']['giveaway'] += 1
-            return 'giveaway'
+            return self._count_tweet_type('giveaway')
             
         # For regular posts, check if we have any high-performing gems
         high_performers = self.get_hot_projects(hours=24)
         if high_performers and random.random() < 0.3:  # 30% chance to brag about winning calls
-            self.history['tweet_types']['gem_update'] += 1
-            return 'gem_update'
+            return self._count_tweet_type('gem_update')
             
-        self.history['tweet_types']['regular'] += 1
-        return 'regular'
+        return self._count_tweet_type('regular')
 
     def get_hot_projects(self, hours: Optional[int] = None) -> List[Dict]:
         """Get currently hot projects based on engagement"""
@@ -407,25 +596,12 @@ class TweetHistoryManager:
 
     def get_recent_engagement(self, hours: int = 24) -> float:
         """Calculate average engagement for recent tweets"""
-        cutoff = datetime.now() - timedelta(hours=hours)
-        recent_tweets = [
-            tweet for tweet in self.history['tweets']
-            if datetime.fromisoformat(tweet['timestamp']) > cutoff
-        ]
+        recent = self._window(datetime.now() - timedelta(hours=hours))
         
-        if not recent_tweets:
+        if not recent.count:
             return 0.0
         
-        total_engagement = 0
-        for tweet in recent_tweets:
-            engagement = tweet.get('engagement', {})
-            total_engagement += (
-                engagement.get('retweets', 0) * 2 + 
-                engagement.get('likes', 0) + 
-                engagement.get('replies', 0) * 3  # Weight replies more
-            )
-        
-        return total_engagement / len(recent_tweets)
+        return recent.engagement / recent.count
 
     def get_viral_threshold(self) -> float:
         """Calculate viral threshold based on historical performance"""
@@ -450,30 +626,11 @@ class TweetHistoryManager:
 
     def get_best_posting_times(self) -> list:
         """Analyze best times to post based on engagement"""
-        time_scores = {}
-        
-        for tweet in self.history['tweets']:
-            timestamp = datetime.fromisoformat(tweet['timestamp'])
-            hour = timestamp.hour
-            
-            if hour not in time_scores:
-                time_scores[hour] = {'total': 0, 'count': 0}
-            
-            engagement = tweet.get('engagement', {})
-            score = (
-                engagement.get('likes', 0) + 
-                engagement.get('retweets', 0) * 2 + 
-                engagement.get('replies', 0) * 3
-            )
-            
-            time_scores[hour]['total'] += score
-            time_scores[hour]['count'] += 1
-        
-        # Calculate average score for each hour
+        # Calculate average score for each hour of the day
         best_times = [
-            (hour, stats['total'] / stats['count'])
-            for hour, stats in time_scores.items()
-            if stats['count'] > 0
+            (hour, bucket.engagement / bucket.count)
+            for hour, bucket in enumerate(self.hour_of_day)
+            if bucket.count > 0
         ]
         
         # Return top 5 hours sorted by score
@@ -484,10 +641,10 @@ class TweetHistoryManager:
         cutoff = datetime.now() - timedelta(hours=hours)
         
         # Find recent tweets about this project
+        project = project.lower()
         project_tweets = [
-            tweet for tweet in self.history['tweets']
-            if project.lower() in tweet['content'].lower() and
-            datetime.fromisoformat(tweet['timestamp']) > cutoff
+            tweet for tweet in self._window_tweets(cutoff)
+            if project in tweet['content'].lower()
         ]
         
         if not project_tweets:
@@ -495,13 +652,7 @@ class TweetHistoryManager:
             
         # Check if any had good engagement
         for tweet in project_tweets:
-            engagement = tweet.get('engagement', {})
-            score = (
-                engagement.get('retweets', 0) * 2 + 
-                engagement.get('likes', 0) + 
-                engagement.get('replies', 0) * 3
-            )
-            if score >= 20:  # Threshold for follow-up
+            if engagement_score(tweet.get('engagement', {})) >= 20:  # Threshold for follow-up
                 return True
                 
         return False
@@ -522,15 +673,11 @@ class TweetHistoryManager:
 
     def track_interaction(self, interaction_type: str):
         """Track different types of interactions to maintain personality balance"""
-        if interaction_type in self.history['interactions']:
-            self.history['interactions'][interaction_type] += 1
-        self._save_history()
+        self._append({'op': 'interaction', 'name': interaction_type})
 
     def track_personality_trait(self, trait: str):
         """Track usage of personality traits to keep them balanced"""
-        if trait in self.history['personality_stats']:
-            self.history['personality_stats'][trait] += 1
-        self._save_history()
+        self._append({'op': 'personality_trait', 'name': trait})
 
     def get_personality_balance(self) -> dict:
         """Get stats about personality trait usage"""
@@ -541,11 +688,18 @@ class TweetHistoryManager:
 
     def update_tweet_engagement(self, tweet_id: str, engagement_metrics: dict):
         """Update engagement metrics for a tweet"""
+        if any(tweet.get('id') == tweet_id for tweet in self.history['tweets']):
+            self._append({'op': 'tweet_engagement', 'id': tweet_id, 'metrics': engagement_metrics})
+
+    def _apply_tweet_engagement(self, tweet_id: str, engagement_metrics: dict):
         for tweet in self.history['tweets']:
             if tweet.get('id') == tweet_id:
                 if 'engagement' not in tweet:
                     tweet['engagement'] = {}
+                # Re-score the tweet in its hour bucket
+                self._bucket_add(tweet, sign=-1)
                 tweet['engagement'].update(engagement_metrics)
+                self._bucket_add(tweet)
                 
                 # Track viral tweets
                 if (engagement_metrics.get('likes', 0) > 100 or 
@@ -556,8 +710,6 @@ class TweetHistoryManager:
                         'engagement': tweet['engagement'],
                         'type': tweet.get('tweet_type')
                     })
-                
-                self._save_history()
                 break
 
     def get_engagement_strategy(self) -> dict:
@@ -575,31 +727,15 @@ class TweetHistoryManager:
 
     def _calculate_engagement_rate(self) -> float:
         """Calculate average engagement rate for recent tweets"""
-        total_engagement = 0
-        tweet_count = 0
-        cutoff = datetime.now() - timedelta(days=7)
-        
-        for tweet in self.history['tweets']:
-            if datetime.fromisoformat(tweet['timestamp']) > cutoff:
-                engagement = tweet.get('engagement', {})
-                total_engagement += (
-                    engagement.get('likes', 0) + 
-                    engagement.get('retweets', 0) * 2 + 
-                    engagement.get('replies', 0) * 3
-                )
-                tweet_count += 1
-        
-        return total_engagement / tweet_count if tweet_count > 0 else 0
+        return self.get_recent_engagement(hours=7 * 24)
 
     def add_favorite_human(self, username: str):
         """Add a human to Elion's favorites list"""
-        self.history['favorite_humans'].append(username)
-        self._save_history()
+        self._append({'op': 'favorite_human', 'username': username})
 
     def add_running_joke(self, joke: str):
         """Add a running joke to track"""
-        self.history['running_jokes'].append(joke)
-        self._save_history()
+        self._append({'op': 'running_joke', 'joke': joke})
 
     def get_favorite_humans(self, limit: int = 5) -> list:
         """Get Elion's favorite humans to interact with"""
@@ -612,15 +748,14 @@ class TweetHistoryManager:
     def add_hot_project(self, symbol: str, roi: float):
         """Add hot project to tracking"""
         try:
-            self.history['hot_projects'].append({
-                'symbol': symbol,
-                'roi': roi,
-                'timestamp': datetime.now().isoformat()
+            self._append({
+                'op': 'hot_project',
+                'project': {
+                    'symbol': symbol,
+                    'roi': roi,
+                    'timestamp': datetime.now().isoformat()
+                }
             })
-            
-            # Keep only last 10 hot projects
-            if len(self.history['hot_projects']) > 10:
-                self.history['hot_projects'] = self.history['hot_projects'][-10:]
                 
         except Exception as e:
             print(f"Error adding hot project: {e}")
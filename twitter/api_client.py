@@ -4,13 +4,37 @@ import os
 import tweepy
 import logging
 import asyncio
-from typing import Optional, Dict, List
+from typing import Callable, Optional, Dict, List, Mapping
+
+from twitter.rate_limiter import endpoint_key
 
 logger = logging.getLogger(__name__)
 
 class TwitterAPI:
-    def __init__(self):
-        """Initialize Twitter API client"""
+    def __init__(self, client: Optional[tweepy.Client] = None):
+        """Initialize Twitter API client
+        
+        Args:
+            client: Optional tweepy.Client-compatible transport. When omitted,
+                TWITTER_TRANSPORT=local selects the in-process stand-in,
+                otherwise a real tweepy.Client is created from env credentials.
+        """
+        # Called with (endpoint key, response headers) after every API response
+        self.header_listeners: List[Callable[[str, Mapping[str, str]], None]] = []
+        self.api = self._create_client(client)
+        self._install_header_hook()
+    
+    def _create_client(self, client: Optional[tweepy.Client]) -> tweepy.Client:
+        """Pick the transport"""
+        if client is not None:
+            logger.info(f"Using provided Twitter client: {type(client).__name__}")
+            return client
+            
+        if os.getenv('TWITTER_TRANSPORT', '').lower() == 'local':
+            from twitter.local_client import LocalTwitterClient
+            logger.info("Using local Twitter API stand-in")
+            return LocalTwitterClient(wait_on_rate_limit=False)
+            
         # Initialize Twitter API clients
         logger.info("Initializing Twitter client...")
         
@@ -22,18 +46,52 @@ class TwitterAPI:
             else:
                 logger.warning(f"✗ {key} is not set")
         
-        self.api = tweepy.Client(
+        client = tweepy.Client(
             consumer_key=os.getenv('TWITTER_CLIENT_ID'),
             consumer_secret=os.getenv('TWITTER_CLIENT_SECRET'),
             access_token=os.getenv('TWITTER_ACCESS_TOKEN'),
             access_token_secret=os.getenv('TWITTER_ACCESS_TOKEN_SECRET'),
             bearer_token=os.getenv('TWITTER_BEARER_TOKEN'),
-            wait_on_rate_limit=True
+            wait_on_rate_limit=False  # 429s are handled by RateLimiter from the response headers
         )
         logger.info("Twitter client initialized")
+        return client
     
-    def create_tweet(self, text: str, reply_to_id: str = None) -> Optional[Dict]:
-        """Create a new tweet"""
+    def _install_header_hook(self):
+        """Wrap the client's request() so rate limit headers reach header_listeners
+        
+        tweepy drops response headers from its return values, so they are
+        captured at the HTTP layer, including on error responses.
+        """
+        request = getattr(self.api, 'request', None)
+        if request is None:
+            return
+        
+        def request_with_headers(method, route, *args, **kwargs):
+            try:
+                response = request(method, route, *args, **kwargs)
+            except tweepy.errors.HTTPException as e:
+                self._notify_headers(method, route, e.response.headers)
+                raise
+            self._notify_headers(method, route, response.headers)
+            return response
+        
+        self.api.request = request_with_headers
+    
+    def _notify_headers(self, method: str, route: str, headers: Mapping[str, str]):
+        endpoint = endpoint_key(method, route)
+        for listener in self.header_listeners:
+            try:
+                listener(endpoint, headers)
+            except Exception as e:
+                logger.error(f"Error handling rate limit headers for {endpoint}: {e}")
+    
+    def create_tweet(self, text: str, reply_to_id: str = None, raise_errors: bool = False) -> Optional[Dict]:
+        """Create a new tweet
+
+        Rate limit errors always propagate; other errors are logged and
+        swallowed unless raise_errors is set.
+        """
         try:
             response = self.api.create_tweet(
                 text=text,
@@ -50,6 +108,8 @@ class TwitterAPI:
             raise  # Propagate rate limit error up
         except Exception as e:
             logger.error(f"Error posting tweet: {e}")
+            if raise_errors:
+                raise
             return None
     
     async def create_tweet_async(self, text: str, reply_to_id: str = None) -> Optional[Dict]:
@@ -79,6 +139,28 @@ class TwitterAPI:
             logger.error(f"Error getting tweet {tweet_id}: {e}")
             return None
             
+    def get_tweets(self, tweet_ids: List[str], fields: list = None) -> Dict[str, Dict]:
+        """Look up tweets by ID, up to 100 per request, keyed by tweet ID
+        
+        Tweets that were deleted or are not visible are left out. Rate limit
+        errors propagate; other errors end the lookup with what was fetched.
+        """
+        tweets = {}
+        for start in range(0, len(tweet_ids), 100):
+            try:
+                response = self.api.get_tweets(
+                    ids=tweet_ids[start:start + 100],
+                    tweet_fields=fields or ['public_metrics', 'created_at']
+                )
+            except tweepy.errors.TooManyRequests:
+                raise
+            except Exception as e:
+                logger.error(f"Error getting tweets: {e}")
+                break
+            for tweet in response.data or []:
+                tweets[str(tweet.id)] = tweet.data
+        return tweets
+            
     def get_tweet_responses(self, tweet_id: str) -> List[Dict]:
         """Get responses to a tweet"""
         try:
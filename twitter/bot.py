@@ -7,8 +7,8 @@ import logging
 import schedule
 import threading
 from datetime import datetime, timedelta
+from typing import Callable, Optional
 import sys
-from logging.handlers import RotatingFileHandler
 import tempfile
 import atexit
 import tweepy
@@ -23,15 +23,10 @@ except ImportError:
 # Add parent directory to Python path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-# Initialize logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        RotatingFileHandler('tweet_activity.log', maxBytes=5*1024*1024, backupCount=3),  # 5MB per file, keep 3 backup files
-        logging.StreamHandler(sys.stdout)  # Add console output
-    ]
-)
+from log_utils import setup_logging
+
+# Initialize logging: queued to a 5MB rotating file (3 backups) and the console
+setup_logging('tweet_activity.log')
 
 logger = logging.getLogger(__name__)
 
@@ -142,12 +137,28 @@ def is_bot_running():
         logger.error(f"Error checking Redis lock: {e}")
         return False
 
-from custom_llm import GeminiComponent
+from async_llm import AsyncGeminiComponent
 from twitter.api_client import TwitterAPI
 from twitter.rate_limiter import RateLimiter
+from twitter.outbox import PostOutbox, PENDING, POSTED
+from twitter.engagement_collector import EngagementCollector
 from twitter.history_manager import TweetHistory
 from elion.elion import Elion
+from elion.engagement.metrics import EngagementMetrics
 from strategies.volume_strategy import VolumeStrategy
+from ops_metrics import POSTS, SCHEDULE_LAG_SECONDS
+from tracing import tracer
+
+# Outbox priorities: fresh market analysis goes out before formats and backups
+PRIORITY_ANALYSIS = 20
+PRIORITY_FORMAT = 10
+PRIORITY_BACKUP = 0
+
+# Alternatives requested from a formatter when its tweet duplicates recent content
+MAX_VARIANT_ATTEMPTS = 3
+
+# Market analysis is stale after this many seconds in the outbox
+ANALYSIS_TTL = 2 * 3600
 
 class AIGamingBot:
     """Twitter bot for AI-powered crypto insights"""
@@ -155,8 +166,12 @@ class AIGamingBot:
     # Tokens to exclude from all analysis
     EXCLUDED_TOKENS = {'BTC', 'ETH'}
     
-    def __init__(self):
-        """Initialize Twitter bot"""
+    def __init__(self, api: TwitterAPI = None):
+        """Initialize Twitter bot
+        
+        Args:
+            api: Optional preconfigured TwitterAPI (e.g. backed by the local stand-in)
+        """
         logger.info("\nInitializing Twitter bot...")
         
         # Initialize retry settings
@@ -165,13 +180,26 @@ class AIGamingBot:
         self.retry_count = 0
         
         # Initialize core components
-        self.api = TwitterAPI()
+        self.api = api or TwitterAPI()
         self.rate_limiter = RateLimiter()
+        self.api.header_listeners.append(self.rate_limiter.record_headers)
+        self.outbox = PostOutbox(
+            os.getenv('OUTBOX_DB', 'outbox.db'),
+            content_window=float(os.getenv('DUPLICATE_WINDOW_DAYS', 7)) * 86400
+        )
         self.history = TweetHistory()
         
-        # Initialize Elion
+        # Public metrics of posted tweets, looked up in batches and fed to analytics
+        self.engagement_metrics = EngagementMetrics()
+        self.engagement = EngagementCollector(
+            self.api, self.rate_limiter, os.getenv('ENGAGEMENT_DB', 'engagement.db')
+        )
+        self.engagement.listeners.append(self.history.update_metrics)
+        self.engagement.listeners.append(self.engagement_metrics.track_engagement)
+        
+        # Initialize Elion (LLM calls are concurrency-limited and deadline-bounded)
         logger.info("Initializing Elion...")
-        self.elion = Elion(GeminiComponent(
+        self.elion = Elion(AsyncGeminiComponent(
             api_key=os.getenv('AI_ACCESS_TOKEN'),
             api_base=os.getenv('AI_API_URL')
         ))
@@ -241,44 +269,131 @@ class AIGamingBot:
         schedule.every().day.at("20:00").do(self.post_format_tweet)  # Mid US
         schedule.every().day.at("22:00").do(self.post_format_tweet)  # Late US (before trend)
 
-    def _post_tweet(self, tweet):
-        """Post a tweet with error handling and backup content"""
-        try:
-            # Wait for rate limit before posting
-            self.rate_limiter.wait()
-            
-            # Try to post main tweet
-            response = self.api.create_tweet(tweet)
-            if response:
-                logger.info(f"Posted tweet: {tweet}")
-                return True
-                
-        except tweepy.errors.TooManyRequests:
-            # Let rate limit errors propagate up
-            raise
-        except Exception as e:
-            # If it's a duplicate content error, don't try backup tweet
-            if "duplicate content" in str(e).lower():
-                logger.warning("Duplicate tweet detected, skipping backup attempt")
-                return False
-                
-            logger.error(f"Error posting main tweet: {e}")
+    def _post_tweet(self, tweet, kind: str = 'post', priority: int = PRIORITY_FORMAT, ttl: float = None,
+                    regenerate: Callable[[], Optional[str]] = None):
+        """Queue a tweet in the outbox and try to post it right away
+        
+        If the same content was posted recently, regenerate (when given) is
+        asked for up to MAX_VARIANT_ATTEMPTS alternatives before giving up,
+        so no API call is spent on a duplicate.
+        
+        Returns True once the tweet is posted or safely queued for a later
+        drain (e.g. while rate limited), False if it was rejected or already
+        queued/posted.
+        """
+        tweet = self._fresh_variant(tweet, regenerate)
+        if not tweet:
+            return False
+        entry_id = self.outbox.enqueue(tweet, kind=kind, priority=priority, ttl=ttl)
+        if entry_id is None:
+            return False
+        self.drain_outbox()
+        return self.outbox.status(entry_id) in (PENDING, POSTED)
+    
+    def _fresh_variant(self, tweet: str, regenerate: Callable[[], Optional[str]] = None) -> Optional[str]:
+        """Return tweet, or an alternative if its content was posted recently"""
+        if not self.outbox.was_posted(tweet):
+            return tweet
+        
+        if regenerate:
+            for _ in range(MAX_VARIANT_ATTEMPTS):
+                try:
+                    variant = regenerate()
+                except Exception as e:
+                    logger.error(f"Error generating alternative tweet: {e}")
+                    break
+                if variant and not self.outbox.was_posted(variant):
+                    logger.info("Content already posted recently, using alternative variant")
+                    return variant
+        
+        logger.warning("Duplicate content detected before posting, skipping")
+        return None
+    
+    @tracer.spanned('post')
+    def drain_outbox(self, max_posts: int = 1) -> int:
+        """Post queued tweets in priority order while the rate limiter allows
+        
+        Returns the number of tweets posted.
+        """
+        posted = 0
+        while posted < max_posts and self.rate_limiter.can_post():
+            entry = self.outbox.claim_next()
+            if entry is None:
+                break
+            
+            # Content posted since the entry was queued would only be rejected by the API
+            if self.outbox.was_posted(entry['text']):
+                logger.warning(f"Queued {entry['kind']} tweet duplicates recent content, skipping")
+                self.outbox.mark_failed(entry['id'], "duplicate content (pre-flight)")
+                POSTS.inc(entry['kind'], 'duplicate_local')
+                continue
             
-            # Only try backup tweet for non-duplicate errors
             try:
-                logger.info("Attempting to post backup tweet...")
-                backup_tweet = self.elion.tweet_formatters.get_backup_tweet()
-                if backup_tweet:
-                    response = self.api.create_tweet(backup_tweet)
-                    if response:
-                        logger.info(f"Posted backup tweet: {backup_tweet}")
-                        return True
-                    
+                response = self.api.create_tweet(entry['text'], raise_errors=True)
+            except tweepy.errors.TooManyRequests as e:
+                # Keep the tweet queued until the limiter lets us post again
+                self.rate_limiter.handle_rate_limit(headers=e.response.headers)
+                self.outbox.release(entry['id'], self.rate_limiter.next_allowed_time())
+                POSTS.inc(entry['kind'], 'rate_limited')
+                break
+            except tweepy.errors.Forbidden as e:
+                if "duplicate content" in str(e).lower():
+                    # Remember it so the next attempt at this content is caught locally
+                    self.outbox.remember_content(entry['text'])
+                    if entry['recovered']:
+                        # The attempt interrupted by a restart went through after all
+                        logger.info(f"Recovered {entry['kind']} tweet was already posted")
+                        self.outbox.mark_posted(entry['id'])
+                    else:
+                        logger.warning("Duplicate tweet detected, skipping backup attempt")
+                        self.outbox.mark_failed(entry['id'], str(e))
+                    POSTS.inc(entry['kind'], 'duplicate')
+                    continue
+                logger.error(f"Tweet rejected: {e}")
+                self.outbox.mark_failed(entry['id'], str(e))
+                POSTS.inc(entry['kind'], 'rejected')
+                self._queue_backup_tweet(entry)
+                continue
             except Exception as e:
-                logger.error(f"Error posting backup tweet: {e}")
+                response = None
+                error = str(e)
+            else:
+                error = "invalid response"
             
-        return False
+            if response:
+                logger.info(f"Posted {entry['kind']} tweet: {entry['text']}")
+                tweet_id = str(response.get('id'))
+                self.outbox.mark_posted(entry['id'], tweet_id)
+                self.history.add_tweet({'id': tweet_id, 'text': entry['text'], 'kind': entry['kind']})
+                self.engagement.track(tweet_id, kind=entry['kind'])
+                self.rate_limiter.update_counts()
+                POSTS.inc(entry['kind'], 'posted')
+                posted += 1
+            elif self.outbox.retry_later(entry['id'], error):
+                POSTS.inc(entry['kind'], 'retry')
+            else:
+                logger.error(f"Giving up on {entry['kind']} tweet after {entry['attempts'] + 1} attempts: {error}")
+                POSTS.inc(entry['kind'], 'failed')
+                self._queue_backup_tweet(entry)
+        
+        return posted
+    
+    def _queue_backup_tweet(self, failed_entry: dict):
+        """Queue a backup tweet in place of one that could not be posted"""
+        if failed_entry['kind'] == 'backup':
+            return
+        try:
+            backup_tweet = self._fresh_variant(
+                self.elion.tweet_formatters.get_backup_tweet(),
+                self.elion.tweet_formatters.get_backup_tweet
+            )
+            if backup_tweet:
+                logger.info("Queueing backup tweet...")
+                self.outbox.enqueue(backup_tweet, kind='backup', priority=PRIORITY_BACKUP)
+        except Exception as e:
+            logger.error(f"Error queueing backup tweet: {e}")
 
+    @tracer.traced('post_format_tweet')
     def post_format_tweet(self):
         """Post tweet using format based on current hour"""
         try:
@@ -303,7 +418,7 @@ class AIGamingBot:
             # Format tweet using appropriate data
             tweet = None
             if format_type == 'performance_compare':
-                tweet = self.elion.format_tweet(format_type, market_data)
+                format_data = market_data
             else:
                 # Convert history data to the format expected by formatters
                 formatted_data = {
@@ -320,14 +435,18 @@ class AIGamingBot:
                         if isinstance(token, dict)
                     ]
                 }
-                tweet = self.elion.format_tweet(format_type, formatted_data)
+                format_data = formatted_data
+            tweet = self.elion.format_tweet(format_type, format_data)
                 
             if not tweet:
                 logger.warning(f"Failed to format {format_type} tweet")
                 return self._post_fallback_tweet()
                 
-            # Post the tweet
-            return self._post_tweet(tweet)
+            # Post the tweet (re-formatting picks another template variant/tags on duplicates)
+            return self._post_tweet(
+                tweet, kind='format',
+                regenerate=lambda: self.elion.format_tweet(format_type, format_data, variant='B')
+            )
             
         except Exception as e:
             logger.error(f"Error posting format tweet: {e}")
@@ -346,7 +465,7 @@ class AIGamingBot:
                 content = "🤖 *Processing market data... neural nets recalibrating* Meanwhile, stay sharp and watch those charts! 👀"
                 
             # Post tweet using correct method name
-            self._post_tweet(content)
+            self._post_tweet(content, regenerate=lambda: self.elion.content.generate_ai_mystique(market_data))
             
         except Exception as e:
             logger.error(f"Error posting AI mystique tweet: {e}")
@@ -386,6 +505,7 @@ class AIGamingBot:
         except Exception as e:
             logger.error(f"Error posting summary tweet: {e}")
             
+    @tracer.traced('post_trend')
     def post_trend(self):
         """Post trend analysis tweet"""
         try:
@@ -413,9 +533,15 @@ class AIGamingBot:
                 logger.warning("Failed to format trend tweet")
                 return self._post_fallback_tweet()
                 
+            # Alternatives lead with the next token down, so a repeated ranking still reads differently
+            variants = (trend_tokens[skip:] for skip in range(1, len(trend_tokens)))
+            
             # Post tweet and track tokens
             try:
-                if self._post_tweet(tweet):
+                if self._post_tweet(
+                    tweet, kind='trend', priority=PRIORITY_ANALYSIS, ttl=ANALYSIS_TTL,
+                    regenerate=lambda: self.elion.trend_strategy.format_twitter_output(next(variants, []))
+                ):
                     # Only track tokens if tweet was successful
                     for token in trend_tokens:
                         self.history.track_token(token['symbol'])
@@ -432,6 +558,7 @@ class AIGamingBot:
             logger.error(f"Error in trend analysis: {e}")
             return self._post_fallback_tweet()
 
+    @tracer.traced('post_volume')
     def post_volume(self):
         """Post volume analysis tweet"""
         try:
@@ -487,8 +614,18 @@ class AIGamingBot:
                 logger.warning("Failed to format volume tweet")
                 return self._post_fallback_tweet()
                 
+            # Alternatives lead with the next token down (anomalies are listed before spikes)
+            anomalies, spikes = volume_data.get('anomalies', []), volume_data.get('spikes', [])
+            variants = (
+                self.elion.volume_strategy.format_twitter_output(
+                    spikes[max(0, skip - len(anomalies)):], anomalies[skip:], history=history
+                )
+                for skip in range(1, len(anomalies) + len(spikes))
+            )
+            
             # Post tweet and track tokens
-            self._post_tweet(tweet)
+            self._post_tweet(tweet, kind='volume', priority=PRIORITY_ANALYSIS,
+                             ttl=ANALYSIS_TTL, regenerate=lambda: next(variants, None))
             # Track tokens using TokenMonitor
             self.elion.token_monitor.run_analysis()
                 
@@ -503,7 +640,10 @@ class AIGamingBot:
             logger.info("Attempting to post fallback tweet...")
             backup_tweet = self.elion.tweet_formatters.get_backup_tweet()
             if backup_tweet:
-                return self._post_tweet(backup_tweet)
+                return self._post_tweet(
+                    backup_tweet, kind='backup', priority=PRIORITY_BACKUP,
+                    regenerate=self.elion.tweet_formatters.get_backup_tweet
+                )
             else:
                 logger.error("No backup tweet available")
                 return False
@@ -517,6 +657,14 @@ class AIGamingBot:
             return False
         return symbol.upper() not in self.EXCLUDED_TOKENS
 
+    def _seconds_until_next_check(self, post_delay_until: float) -> float:
+        """Sleep until the next job is due and posting is allowed, capped at a minute"""
+        now = time.time()
+        idle = schedule.idle_seconds()
+        due = now + max(idle, 0) if idle is not None else now + 60
+        wake_at = max(due, post_delay_until, self.rate_limiter.next_allowed_time())
+        return min(max(wake_at - now, 1), 60)
+
     def run(self):
         """Run the bot"""
         try:
@@ -526,6 +674,9 @@ class AIGamingBot:
             # Set up fresh schedule starting from next occurrence
             self._schedule_tweets()
             
+            # Refresh engagement metrics in the background
+            self.engagement.start()
+            
             # Track last post time
             last_post_time = 0
             min_post_delay = 300  # 5 minutes between posts
@@ -535,10 +686,17 @@ class AIGamingBot:
                 try:
                     current_time = time.time()
                     
+                    # Posting jobs stay pending (not dropped) while the limiter is cooling down
+                    limiter_wait = self.rate_limiter.seconds_until_allowed()
+                    
                     # Only process a job if enough time has passed since last post
-                    if current_time - last_post_time >= min_post_delay:
-                        # Get all pending jobs
-                        pending_jobs = [job for job in schedule.get_jobs() if job.should_run]
+                    if current_time - last_post_time >= min_post_delay and limiter_wait <= 0:
+                        # Tweets left queued by earlier jobs go out before new content is generated
+                        if self.drain_outbox():
+                            last_post_time = current_time
+                            pending_jobs = []
+                        else:
+                            pending_jobs = [job for job in schedule.get_jobs() if job.should_run]
                         
                         if pending_jobs:
                             # Sort jobs by their next run time
@@ -548,16 +706,19 @@ class AIGamingBot:
                             try:
                                 job = pending_jobs[0]
                                 logger.info(f"Running scheduled job: {job.job_func.__name__}")
+                                SCHEDULE_LAG_SECONDS.observe(
+                                    max(0.0, (datetime.now() - job.next_run).total_seconds()), job.job_func.__name__
+                                )
                                 job.run()
                                 last_post_time = current_time
                                 
-                            except tweepy.errors.TooManyRequests:
-                                # Handle rate limit with proper cooldown
-                                self.rate_limiter.handle_rate_limit()
+                            except tweepy.errors.TooManyRequests as e:
+                                # Start the cooldown without blocking; the job is retried once it ends
+                                self.rate_limiter.handle_rate_limit(headers=e.response.headers)
                             except Exception as e:
                                 logger.error(f"Error running scheduled job: {e}")
                     
-                    time.sleep(60)  # Check every minute
+                    time.sleep(self._seconds_until_next_check(last_post_time + min_post_delay))
                     
                 except Exception as e:
                     logger.error(f"Error in main loop: {e}")
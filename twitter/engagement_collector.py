@@ -0,0 +1,223 @@
+"""Batched collection of public metrics for posted tweets"""
+
+from typing import Callable, Dict, List, Optional
+import logging
+import sqlite3
+import threading
+import time
+
+import tweepy
+
+from twitter.rate_limiter import endpoint_key
+
+logger = logging.getLogger(__name__)
+
+# Tweet lookup endpoint used for batched metrics
+LOOKUP_ENDPOINT = endpoint_key('GET', '/2/tweets')
+
+# The lookup endpoint accepts at most this many IDs per request
+MAX_BATCH = 100
+
+METRIC_FIELDS = ('like_count', 'retweet_count', 'reply_count', 'quote_count', 'bookmark_count', 'impression_count')
+
+class EngagementCollector:
+    """Refreshes public metrics of recently posted tweets as a time series
+
+    Posted tweets are registered with track(). collect_due() looks up every
+    tweet whose refresh is due (young tweets more often than old ones) in
+    a single batched request of up to 100 IDs, appends a sample per tweet
+    and passes the metrics to listeners. Calls are paced from the lookup
+    endpoint's rate limit headers so the remaining budget is spread over
+    its window, with a reserve left for other readers.
+
+    start() runs collect_due() on a daemon thread; the simulation calls it
+    directly.
+    """
+
+    def __init__(self, api, rate_limiter, db_path: str = 'engagement.db', track_for: float = 7 * 86400,
+                 min_refresh: float = 15 * 60, max_refresh: float = 6 * 3600, reserve: float = 0.2):
+        """Initialize collector
+
+        Args:
+            api: TwitterAPI used for lookups
+            rate_limiter: RateLimiter fed by the API's rate limit headers
+            db_path: SQLite file for tracked tweets and metric samples
+            track_for: Seconds after posting a tweet's metrics are refreshed
+            min_refresh: Shortest refresh interval (new tweets)
+            max_refresh: Longest refresh interval (old tweets)
+            reserve: Fraction of the lookup budget left for other callers
+        """
+        self.api = api
+        self.rate_limiter = rate_limiter
+        self.db_path = db_path
+        self.track_for = track_for
+        self.min_refresh = min_refresh
+        self.max_refresh = max_refresh
+        self.reserve = reserve
+        # Called with (tweet_id, public_metrics) for every sample
+        self.listeners: List[Callable[[str, Dict], None]] = []
+        self._next_call = 0.0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._init_db()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _init_db(self):
+        """Create tables"""
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS tracked_tweets (
+                    tweet_id TEXT PRIMARY KEY,
+                    kind TEXT,
+                    posted_at REAL NOT NULL,
+                    collected_at REAL
+                )
+            ''')
+            conn.execute(f'''
+                CREATE TABLE IF NOT EXISTS tweet_metrics (
+                    tweet_id TEXT NOT NULL,
+                    collected_at REAL NOT NULL,
+                    {', '.join(f'{field} INTEGER' for field in METRIC_FIELDS)},
+                    PRIMARY KEY (tweet_id, collected_at)
+                )
+            ''')
+
+    def track(self, tweet_id: str, kind: str = None, posted_at: float = None):
+        """Start collecting metrics for a posted tweet"""
+        with self._connect() as conn:
+            conn.execute(
+                'INSERT OR IGNORE INTO tracked_tweets (tweet_id, kind, posted_at) VALUES (?, ?, ?)',
+                (str(tweet_id), kind, posted_at or time.time())
+            )
+
+    def _refresh_interval(self, age: float) -> float:
+        """A quarter of the tweet's age, clamped to [min_refresh, max_refresh]"""
+        return min(max(age / 4, self.min_refresh), self.max_refresh)
+
+    def due_ids(self, now: float = None, limit: int = MAX_BATCH) -> List[str]:
+        """Tracked tweets whose refresh is due, stalest first"""
+        now = now or time.time()
+        with self._connect() as conn:
+            rows = conn.execute('''
+                SELECT tweet_id, posted_at, collected_at FROM tracked_tweets
+                WHERE posted_at >= ?
+                ORDER BY COALESCE(collected_at, 0), posted_at
+            ''', (now - self.track_for,)).fetchall()
+        due = [
+            row['tweet_id'] for row in rows
+            if row['collected_at'] is None
+            or now - row['collected_at'] >= self._refresh_interval(now - row['posted_at'])
+        ]
+        return due[:limit]
+
+    def collect_due(self) -> int:
+        """Run one batched lookup if one is due and the rate limit allows
+
+        Returns the number of tweets sampled.
+        """
+        with self._lock:
+            now = time.time()
+            if now < self._next_call or self.rate_limiter.seconds_until_allowed(LOOKUP_ENDPOINT) > 0:
+                return 0
+            ids = self.due_ids(now)
+            if not ids:
+                return 0
+
+            try:
+                tweets = self.api.get_tweets(ids, fields=['public_metrics'])
+            except tweepy.errors.TooManyRequests:
+                logger.warning("Rate limited looking up tweet metrics, backing off")
+                self._next_call = self.rate_limiter.next_allowed_time(LOOKUP_ENDPOINT)
+                return 0
+            self._next_call = time.time() + self.rate_limiter.spacing(LOOKUP_ENDPOINT, self.reserve)
+
+            samples = {
+                tweet_id: tweet['public_metrics']
+                for tweet_id, tweet in tweets.items() if tweet.get('public_metrics')
+            }
+            self._store(ids, samples, time.time())
+
+        for tweet_id, metrics in samples.items():
+            for listener in self.listeners:
+                try:
+                    listener(tweet_id, metrics)
+                except Exception as e:
+                    logger.error(f"Error handling metrics for tweet {tweet_id}: {e}")
+        logger.info(f"Collected metrics for {len(samples)}/{len(ids)} tweets")
+        return len(samples)
+
+    def _store(self, ids: List[str], samples: Dict[str, Dict], collected_at: float):
+        """Append samples and mark every requested tweet as collected"""
+        with self._connect() as conn:
+            conn.executemany(
+                f'''INSERT OR REPLACE INTO tweet_metrics (tweet_id, collected_at, {', '.join(METRIC_FIELDS)})
+                    VALUES (?, ?, {', '.join('?' for _ in METRIC_FIELDS)})''',
+                [
+                    (tweet_id, collected_at, *(metrics.get(field) for field in METRIC_FIELDS))
+                    for tweet_id, metrics in samples.items()
+                ]
+            )
+            # Missing (deleted) tweets are marked too so they do not block the queue
+            conn.executemany(
+                'UPDATE tracked_tweets SET collected_at = ? WHERE tweet_id = ?',
+                [(collected_at, tweet_id) for tweet_id in ids]
+            )
+
+    def series(self, tweet_id: str) -> List[Dict]:
+        """All samples for a tweet, oldest first"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                'SELECT * FROM tweet_metrics WHERE tweet_id = ? ORDER BY collected_at', (str(tweet_id),)
+            ).fetchall()
+            return [dict(row) for row in rows]
+
+    def latest(self, since: float = None) -> Dict[str, Dict]:
+        """Most recent sample per tweet, optionally only for tweets posted after since"""
+        with self._connect() as conn:
+            rows = conn.execute('''
+                SELECT m.*, t.kind, t.posted_at FROM tweet_metrics m
+                JOIN tracked_tweets t ON t.tweet_id = m.tweet_id
+                WHERE m.collected_at = (
+                    SELECT MAX(collected_at) FROM tweet_metrics WHERE tweet_id = m.tweet_id
+                ) AND t.posted_at >= ?
+            ''', (since or 0,)).fetchall()
+            return {row['tweet_id']: dict(row) for row in rows}
+
+    def purge(self, older_than: float = 30 * 86400):
+        """Drop tweets (and their samples) posted more than older_than seconds ago"""
+        cutoff = time.time() - older_than
+        with self._connect() as conn:
+            conn.execute('''
+                DELETE FROM tweet_metrics WHERE tweet_id IN (
+                    SELECT tweet_id FROM tracked_tweets WHERE posted_at < ?
+                )
+            ''', (cutoff,))
+            conn.execute('DELETE FROM tracked_tweets WHERE posted_at < ?', (cutoff,))
+
+    def start(self, poll_interval: float = 60):
+        """Collect in a daemon thread until stop()"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+
+        def run():
+            while not self._stop.is_set():
+                try:
+                    self.collect_due()
+                except Exception as e:
+                    logger.error(f"Error collecting engagement metrics: {e}")
+                self._stop.wait(poll_interval)
+
+        self._thread = threading.Thread(target=run, name='engagement-collector', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
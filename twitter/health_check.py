@@ -4,6 +4,8 @@ import threading
 from http.server import HTTPServer, BaseHTTPRequestHandler
 import logging
 
+from ops_metrics import CONTENT_TYPE, ops_metrics
+
 logger = logging.getLogger(__name__)
 
 class HealthCheckHandler(BaseHTTPRequestHandler):
@@ -13,6 +15,16 @@ class HealthCheckHandler(BaseHTTPRequestHandler):
             self.send_header('Content-type', 'text/html')
             self.end_headers()
             self.wfile.write(b"OK")
+        elif self.path == '/metrics':
+            body = ops_metrics.render().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-type', CONTENT_TYPE)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        else:
+            self.send_response(404)
+            self.end_headers()
     
     def log_message(self, format, *args):
         # Suppress logging
@@ -0,0 +1,381 @@
+"""Local stand-in for the Twitter v2 API
+
+LocalTwitterClient subclasses tweepy.Client and answers requests in-process
+instead of over HTTP. Responses are real requests.Response objects, so tweepy's
+own parsing, exception mapping and wait_on_rate_limit handling run unchanged.
+"""
+
+import json
+import logging
+import random
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from http import HTTPStatus
+from typing import Dict, List, Optional, Tuple
+
+import requests
+import tweepy
+from tweepy.errors import (
+    BadRequest,
+    Forbidden,
+    HTTPException,
+    NotFound,
+    TooManyRequests,
+    TwitterServerError,
+    Unauthorized,
+)
+
+logger = logging.getLogger(__name__)
+
+# (requests per window, window in seconds) for each endpoint
+DEFAULT_RATE_LIMITS = {
+    'create_tweet': (17, 24 * 3600),    # Free tier user post cap
+    'get_tweets': (15, 15 * 60),
+    'search_recent': (60, 15 * 60),
+    'get_me': (25, 24 * 3600)
+}
+
+DUPLICATE_DETAIL = "You are not allowed to create a Tweet with duplicate content."
+TOO_LONG_DETAIL = "Your Tweet text is too long."
+
+class VirtualClock:
+    """Manually advanced clock for running simulations faster than real time"""
+
+    def __init__(self, start: float = None):
+        """Initialize clock at a unix timestamp (defaults to now)"""
+        self._now = float(start if start is not None else time.time())
+        self._lock = threading.Lock()
+        self.datetime = self._make_datetime()
+
+    def time(self) -> float:
+        """Current virtual unix time"""
+        return self._now
+
+    def sleep(self, seconds: float) -> None:
+        """Advance the clock instead of blocking"""
+        if seconds > 0:
+            with self._lock:
+                self._now += seconds
+
+    def advance_to(self, timestamp: float) -> None:
+        """Move the clock forward to timestamp (never backwards)"""
+        with self._lock:
+            self._now = max(self._now, float(timestamp))
+
+    def now(self, tz=None) -> datetime:
+        """Current virtual local (or tz-aware) datetime"""
+        return datetime.fromtimestamp(self._now, tz)
+
+    def utcnow(self) -> datetime:
+        """Current virtual naive UTC datetime"""
+        return datetime.fromtimestamp(self._now, timezone.utc).replace(tzinfo=None)
+
+    def _make_datetime(self):
+        """Build a datetime subclass whose now()/utcnow() read this clock"""
+        clock = self
+
+        class ClockDatetime(datetime):
+            @classmethod
+            def now(cls, tz=None):
+                return clock.now(tz)
+
+            @classmethod
+            def utcnow(cls):
+                return clock.utcnow()
+
+        return ClockDatetime
+
+class LocalTwitterClient(tweepy.Client):
+    """tweepy.Client that serves create_tweet, get_tweet(s), search_recent_tweets
+    and get_me from memory, with per-endpoint rate limits and duplicate checks"""
+
+    def __init__(self, clock: VirtualClock = None, rate_limits: Dict[str, Tuple[int, int]] = None,
+                 duplicate_window: int = 24 * 3600, fail_rate: float = 0.0, seed: int = None,
+                 user_id: str = '1000000001', username: str = 'elai_local', **kwargs):
+        """Initialize stand-in
+
+        Args:
+            clock: Clock providing time()/sleep(); defaults to the time module
+            rate_limits: Overrides for DEFAULT_RATE_LIMITS
+            duplicate_window: Seconds during which identical text is rejected
+            fail_rate: Probability that create_tweet returns a 503
+            seed: Seed for failure injection and simulated engagement
+            kwargs: Passed through to tweepy.Client (e.g. wait_on_rate_limit)
+        """
+        super().__init__(**kwargs)
+        self.clock = clock or time
+        self.rate_limits = {**DEFAULT_RATE_LIMITS, **(rate_limits or {})}
+        self.duplicate_window = duplicate_window
+        self.fail_rate = fail_rate
+        self.user = {'id': user_id, 'name': 'ELAI', 'username': username}
+
+        self.tweets: Dict[str, Dict] = {}
+        self.users: Dict[str, Dict] = {user_id: self.user}
+        self.stats = Counter()  # "<endpoint>:<status>" -> count
+        self.forbidden = Counter()  # "<endpoint>:<detail>" -> count of 403 responses
+
+        self._windows: Dict[str, Dict] = {}
+        self._next_id = 1870000000000000000
+        self._rng = random.Random(seed)
+        self._lock = threading.RLock()
+
+    def request(self, method, route, params=None, json=None, user_auth=False):
+        """Serve a request locally, mirroring tweepy.BaseClient.request"""
+        while True:
+            response = self._dispatch(method, route, params or {}, json or {})
+            status = response.status_code
+
+            if status == 429 and self.wait_on_rate_limit:
+                reset_time = int(response.headers['x-rate-limit-reset'])
+                sleep_time = reset_time - int(self.clock.time()) + 1
+                if sleep_time > 0:
+                    logger.warning(f"Rate limit exceeded. Sleeping for {sleep_time} seconds.")
+                    self.clock.sleep(sleep_time)
+                continue
+
+            if status == 400:
+                raise BadRequest(response)
+            if status == 401:
+                raise Unauthorized(response)
+            if status == 403:
+                raise Forbidden(response)
+            if status == 404:
+                raise NotFound(response)
+            if status == 429:
+                raise TooManyRequests(response)
+            if status >= 500:
+                raise TwitterServerError(response)
+            if not 200 <= status < 300:
+                raise HTTPException(response)
+
+            return response
+
+    def add_reply(self, tweet_id: str, text: str, username: str = 'crypto_fan') -> str:
+        """Seed a reply from another user into a conversation"""
+        with self._lock:
+            user = next((u for u in self.users.values() if u['username'] == username), None)
+            if not user:
+                user = {'id': str(2000000000 + len(self.users)), 'name': username, 'username': username}
+                self.users[user['id']] = user
+            parent = self.tweets[str(tweet_id)]
+            return self._store_tweet(text, user['id'], parent['conversation_id'], str(tweet_id))['id']
+
+    def reset(self) -> None:
+        """Forget all tweets, windows and counters"""
+        with self._lock:
+            self.tweets.clear()
+            self._windows.clear()
+            self.stats.clear()
+            self.forbidden.clear()
+
+    def _dispatch(self, method: str, route: str, params: Dict, body: Dict) -> requests.Response:
+        """Route a request to its handler"""
+        if method == 'POST' and route == '/2/tweets':
+            endpoint, handler = 'create_tweet', lambda: self._create_tweet(body)
+        elif method == 'GET' and route == '/2/tweets/search/recent':
+            endpoint, handler = 'search_recent', lambda: self._search_recent(params)
+        elif method == 'GET' and route == '/2/tweets':
+            endpoint, handler = 'get_tweets', lambda: self._get_tweets(params.get('ids', '').split(','), params)
+        elif method == 'GET' and route.startswith('/2/tweets/') and route.count('/') == 3:
+            endpoint, handler = 'get_tweets', lambda: self._get_tweet(route.rsplit('/', 1)[1], params)
+        elif method == 'GET' and route == '/2/users/me':
+            endpoint, handler = 'get_me', lambda: (200, {'data': dict(self.user)})
+        else:
+            return self._response(404, {'title': 'Not Found', 'detail': f"No local route for {method} {route}"},
+                                  {}, method, route)
+
+        with self._lock:
+            allowed, headers = self._consume(endpoint)
+            if not allowed:
+                status, payload = 429, {'title': 'Too Many Requests', 'detail': 'Too Many Requests',
+                                        'type': 'about:blank', 'status': 429}
+            else:
+                status, payload = handler()
+
+        self.stats[f"{endpoint}:{status}"] += 1
+        if status == 403:
+            self.forbidden[f"{endpoint}:{payload.get('detail')}"] += 1
+        return self._response(status, payload, headers, method, route)
+
+    def _consume(self, endpoint: str) -> Tuple[bool, Dict[str, str]]:
+        """Take one request from the endpoint's fixed window, returning rate-limit headers"""
+        limit, window = self.rate_limits[endpoint]
+        now = self.clock.time()
+        state = self._windows.get(endpoint)
+        if not state or now >= state['reset']:
+            state = {'remaining': limit, 'reset': int(now) + window}
+            self._windows[endpoint] = state
+
+        allowed = state['remaining'] > 0
+        if allowed:
+            state['remaining'] -= 1
+
+        headers = {
+            'x-rate-limit-limit': str(limit),
+            'x-rate-limit-remaining': str(state['remaining']),
+            'x-rate-limit-reset': str(state['reset'])
+        }
+        if endpoint == 'create_tweet':
+            headers.update({
+                'x-user-limit-24hour-limit': str(limit),
+                'x-user-limit-24hour-remaining': str(state['remaining']),
+                'x-user-limit-24hour-reset': str(state['reset'])
+            })
+        return allowed, headers
+
+    def _create_tweet(self, body: Dict) -> Tuple[int, Dict]:
+        """Handle POST /2/tweets"""
+        text = (body.get('text') or '').strip()
+        if not text:
+            return 400, {'errors': [{'message': 'text or media is required'}], 'title': 'Invalid Request'}
+        if len(text) > 280:
+            return 403, {'detail': TOO_LONG_DETAIL, 'title': 'Forbidden', 'status': 403}
+        if self.fail_rate and self._rng.random() < self.fail_rate:
+            return 503, {'title': 'Service Unavailable', 'detail': 'Service Unavailable', 'status': 503}
+
+        now = self.clock.time()
+        for tweet in self.tweets.values():
+            if (tweet['author_id'] == self.user['id'] and tweet['text'] == text
+                    and now - tweet['_posted_at'] < self.duplicate_window):
+                return 403, {'detail': DUPLICATE_DETAIL, 'type': 'about:blank',
+                             'title': 'Forbidden', 'status': 403}
+
+        reply = body.get('reply') or {}
+        parent_id = reply.get('in_reply_to_tweet_id')
+        parent = self.tweets.get(str(parent_id)) if parent_id else None
+        conversation_id = parent['conversation_id'] if parent else None
+        tweet = self._store_tweet(text, self.user['id'], conversation_id, parent_id)
+        return 201, {'data': {'id': tweet['id'], 'text': text, 'edit_history_tweet_ids': [tweet['id']]}}
+
+    def _get_tweet(self, tweet_id: str, params: Dict) -> Tuple[int, Dict]:
+        """Handle GET /2/tweets/:id"""
+        tweet = self.tweets.get(tweet_id)
+        if not tweet:
+            return 200, {'errors': [self._not_found(tweet_id)]}
+        payload = {'data': self._render(tweet, params)}
+        includes = self._includes([tweet], params)
+        if includes:
+            payload['includes'] = includes
+        return 200, payload
+
+    def _get_tweets(self, ids: List[str], params: Dict) -> Tuple[int, Dict]:
+        """Handle GET /2/tweets?ids=... (up to 100 ids)"""
+        ids = [i for i in ids if i]
+        if not ids or len(ids) > 100:
+            return 400, {'errors': [{'message': 'ids must contain between 1 and 100 items'}],
+                         'title': 'Invalid Request'}
+        found = [self.tweets[i] for i in ids if i in self.tweets]
+        payload = {'data': [self._render(t, params) for t in found]}
+        missing = [self._not_found(i) for i in ids if i not in self.tweets]
+        if missing:
+            payload['errors'] = missing
+        includes = self._includes(found, params)
+        if includes:
+            payload['includes'] = includes
+        return 200, payload
+
+    def _search_recent(self, params: Dict) -> Tuple[int, Dict]:
+        """Handle GET /2/tweets/search/recent for conversation_id: and plain text queries"""
+        query = params.get('query', '')
+        now = self.clock.time()
+        if query.startswith('conversation_id:'):
+            conversation_id = query.split(':', 1)[1].strip()
+            match = lambda t: t['conversation_id'] == conversation_id and t['id'] != conversation_id
+        else:
+            needle = query.lower()
+            match = lambda t: needle in t['text'].lower()
+
+        # Recent search only covers the last 7 days, newest first
+        results = sorted(
+            (t for t in self.tweets.values() if match(t) and now - t['_posted_at'] <= 7 * 24 * 3600),
+            key=lambda t: t['_posted_at'], reverse=True
+        )[:int(params.get('max_results', 10))]
+
+        payload = {'meta': {'result_count': len(results)}}
+        if results:
+            payload['data'] = [self._render(t, params) for t in results]
+            payload['meta'].update({'newest_id': results[0]['id'], 'oldest_id': results[-1]['id']})
+            includes = self._includes(results, params)
+            if includes:
+                payload['includes'] = includes
+        return 200, payload
+
+    def _store_tweet(self, text: str, author_id: str, conversation_id: Optional[str],
+                     in_reply_to: Optional[str]) -> Dict:
+        """Create and index a tweet record"""
+        self._next_id += self._rng.randint(1, 4096)
+        tweet_id = str(self._next_id)
+        tweet = {
+            'id': tweet_id,
+            'text': text,
+            'author_id': author_id,
+            'conversation_id': conversation_id or tweet_id,
+            'in_reply_to_tweet_id': str(in_reply_to) if in_reply_to else None,
+            '_posted_at': self.clock.time(),
+            '_engagement_rate': self._rng.uniform(0.5, 6.0)  # Likes per hour
+        }
+        self.tweets[tweet_id] = tweet
+        return tweet
+
+    def _render(self, tweet: Dict, params: Dict) -> Dict:
+        """Render a stored tweet honoring tweet.fields"""
+        fields = set(filter(None, params.get('tweet.fields', '').split(',')))
+        data = {'id': tweet['id'], 'text': tweet['text'], 'edit_history_tweet_ids': [tweet['id']]}
+        if 'created_at' in fields:
+            created = datetime.fromtimestamp(tweet['_posted_at'], timezone.utc)
+            data['created_at'] = created.strftime('%Y-%m-%dT%H:%M:%S.000Z')
+        if 'author_id' in fields:
+            data['author_id'] = tweet['author_id']
+        if 'conversation_id' in fields:
+            data['conversation_id'] = tweet['conversation_id']
+        if 'public_metrics' in fields:
+            data['public_metrics'] = self._public_metrics(tweet)
+        return data
+
+    def _public_metrics(self, tweet: Dict) -> Dict:
+        """Engagement that grows with tweet age, tapering off after a day"""
+        age_hours = max(0.0, (self.clock.time() - tweet['_posted_at']) / 3600)
+        likes = int(tweet['_engagement_rate'] * min(age_hours, 24) + 0.1 * max(0.0, age_hours - 24))
+        replies = sum(1 for t in self.tweets.values() if t['in_reply_to_tweet_id'] == tweet['id'])
+        return {
+            'retweet_count': likes // 4,
+            'reply_count': replies,
+            'like_count': likes,
+            'quote_count': likes // 10,
+            'bookmark_count': likes // 8,
+            'impression_count': likes * 40
+        }
+
+    def _includes(self, tweets: List[Dict], params: Dict) -> Dict:
+        """Expand author_id into includes.users when requested"""
+        if 'author_id' not in params.get('expansions', ''):
+            return {}
+        author_ids = {t['author_id'] for t in tweets}
+        return {'users': [dict(self.users[a]) for a in author_ids if a in self.users]}
+
+    def _not_found(self, tweet_id: str) -> Dict:
+        """v2 partial error for a missing tweet"""
+        return {
+            'value': tweet_id,
+            'detail': f"Could not find tweet with id: [{tweet_id}].",
+            'title': 'Not Found Error',
+            'resource_type': 'tweet',
+            'parameter': 'id',
+            'resource_id': tweet_id,
+            'type': 'https://api.twitter.com/2/problems/resource-not-found'
+        }
+
+    def _response(self, status: int, payload: Dict, headers: Dict, method: str, route: str) -> requests.Response:
+        """Build a requests.Response the way requests would"""
+        url = f"https://api.twitter.com{route}"
+        response = requests.Response()
+        response.status_code = status
+        response.reason = HTTPStatus(status).phrase
+        response.headers.update({'content-type': 'application/json; charset=utf-8', **headers})
+        response._content = json.dumps(payload).encode('utf-8')
+        response.encoding = 'utf-8'
+        response.url = url
+        response.request = requests.Request(method, url).prepare()
+        return response
@@ -0,0 +1,266 @@
+"""Durable priority outbox for outgoing tweets"""
+
+from typing import Dict, Optional
+import hashlib
+import logging
+import re
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r'\s+')
+_URL = re.compile(r'https?://\S+')
+# Keeps $, %, + and - so cashtags and signed numbers stay distinct
+_NON_WORD = re.compile(r'(?:[^\w$%+-]|_)+')
+
+PENDING = 'pending'
+SENDING = 'sending'
+POSTED = 'posted'
+FAILED = 'failed'
+EXPIRED = 'expired'
+
+def content_key(text: str) -> str:
+    """Default idempotency key: hash of the whitespace-normalized text"""
+    return hashlib.sha256(_WHITESPACE.sub(' ', text).strip().encode('utf-8')).hexdigest()
+
+def normalize_content(text: str) -> str:
+    """Lowercased words of a tweet, ignoring links, emoji, most punctuation and spacing"""
+    return _NON_WORD.sub(' ', _URL.sub(' ', text.lower())).strip()
+
+def content_hash(text: str) -> str:
+    """Hash of the normalized text, used to spot duplicates before posting"""
+    return hashlib.sha256(normalize_content(text).encode('utf-8')).hexdigest()
+
+class PostOutbox:
+    """SQLite-backed queue of tweets waiting to be posted
+
+    Formatted tweets are enqueued with a priority, an optional deadline and
+    an idempotency key; a single poster claims the highest-priority due entry,
+    posts it and records the outcome. Enqueueing a key that is already
+    pending, in flight or posted within key_ttl is a no-op, so re-running a job cannot
+    double-post. Entries left 'sending' by a crash come back as pending with
+    recovered=1: if the API then reports a duplicate, the earlier attempt
+    went through and the entry is marked posted.
+
+    Hashes of the normalized text of everything posted in the last
+    content_window seconds are kept alongside, so callers can check
+    was_posted() and pick another variant instead of spending an API call
+    on a duplicate.
+    """
+
+    def __init__(self, db_path: str = 'outbox.db', max_attempts: int = 3, key_ttl: float = 24 * 3600,
+                 retention: float = 7 * 86400, content_window: float = 7 * 86400):
+        """Initialize outbox
+
+        Args:
+            db_path: SQLite file
+            max_attempts: Transient failures tolerated before an entry is failed
+            key_ttl: Seconds a posted key keeps blocking the same key from being queued again
+            retention: Seconds finished entries are kept
+            content_window: Seconds posted content counts as a duplicate
+        """
+        self.db_path = db_path
+        self.max_attempts = max_attempts
+        self.key_ttl = key_ttl
+        self.retention = retention
+        self.content_window = content_window
+        self._lock = threading.Lock()
+        self._init_db()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _init_db(self):
+        """Create the table and recover entries interrupted mid-post"""
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS outbox (
+                    id INTEGER PRIMARY KEY,
+                    idempotency_key TEXT NOT NULL UNIQUE,
+                    text TEXT NOT NULL,
+                    kind TEXT NOT NULL,
+                    priority INTEGER NOT NULL DEFAULT 0,
+                    created_at REAL NOT NULL,
+                    not_before REAL NOT NULL,
+                    deadline REAL,
+                    status TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    recovered INTEGER NOT NULL DEFAULT 0,
+                    last_error TEXT,
+                    tweet_id TEXT,
+                    finished_at REAL
+                )
+            ''')
+            conn.execute('''
+                CREATE INDEX IF NOT EXISTS outbox_due
+                ON outbox (status, priority DESC, not_before, id)
+            ''')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS posted_content (
+                    content_hash TEXT PRIMARY KEY,
+                    posted_at REAL NOT NULL
+                )
+            ''')
+            recovered = conn.execute(
+                'UPDATE outbox SET status = ?, recovered = 1 WHERE status = ?', (PENDING, SENDING)
+            ).rowcount
+            conn.execute(
+                'DELETE FROM outbox WHERE status != ? AND finished_at < ?',
+                (PENDING, time.time() - self.retention)
+            )
+            conn.execute(
+                'DELETE FROM posted_content WHERE posted_at < ?', (time.time() - self.content_window,)
+            )
+        if recovered:
+            logger.warning(f"Recovered {recovered} outbox entries interrupted while posting")
+
+    def enqueue(self, text: str, kind: str = 'post', priority: int = 0, ttl: Optional[float] = None,
+                idempotency_key: Optional[str] = None, not_before: Optional[float] = None) -> Optional[int]:
+        """Queue a tweet, returning its id or None if the key is already queued or posted
+
+        A key whose earlier entry failed, expired or was posted more than
+        key_ttl seconds ago is queued again.
+
+        Args:
+            text: Tweet text
+            kind: Label for logs and stats (e.g. 'trend', 'volume', 'backup')
+            priority: Higher posts first
+            ttl: Seconds after which the tweet is stale and dropped instead of posted
+            idempotency_key: Defaults to a hash of the text
+            not_before: Earliest epoch time to post
+        """
+        now = time.time()
+        key = idempotency_key or content_key(text)
+        deadline = now + ttl if ttl is not None else None
+        with self._lock, self._connect() as conn:
+            cursor = conn.execute('''
+                INSERT INTO outbox (
+                    idempotency_key, text, kind, priority, created_at, not_before, deadline, status
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (idempotency_key) DO UPDATE SET
+                    text = excluded.text, kind = excluded.kind, priority = excluded.priority,
+                    created_at = excluded.created_at, not_before = excluded.not_before,
+                    deadline = excluded.deadline, status = excluded.status,
+                    attempts = 0, recovered = 0, last_error = NULL, tweet_id = NULL, finished_at = NULL
+                WHERE outbox.status IN (?, ?) OR (outbox.status = ? AND outbox.finished_at < ?)
+            ''', (key, text, kind, priority, now, not_before or now, deadline, PENDING,
+                  FAILED, EXPIRED, POSTED, now - self.key_ttl))
+            if cursor.rowcount == 0:
+                logger.info(f"Outbox already has {kind} tweet with key {key[:12]}, not queueing again")
+                return None
+            row = conn.execute('SELECT id FROM outbox WHERE idempotency_key = ?', (key,)).fetchone()
+            return row['id']
+
+    def claim_next(self) -> Optional[Dict]:
+        """Mark the highest-priority due entry as sending and return it"""
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            expired = conn.execute('''
+                UPDATE outbox SET status = ?, finished_at = ?
+                WHERE status = ? AND deadline IS NOT NULL AND deadline <= ?
+            ''', (EXPIRED, now, PENDING, now)).rowcount
+            if expired:
+                logger.warning(f"Dropped {expired} stale outbox entries past their deadline")
+
+            row = conn.execute('''
+                SELECT * FROM outbox
+                WHERE status = ? AND not_before <= ?
+                ORDER BY priority DESC, not_before, id
+                LIMIT 1
+            ''', (PENDING, now)).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                'UPDATE outbox SET status = ?, attempts = attempts + 1 WHERE id = ?', (SENDING, row['id'])
+            )
+            return dict(row)
+
+    def next_due_time(self) -> Optional[float]:
+        """Earliest not_before among pending entries"""
+        with self._connect() as conn:
+            row = conn.execute('SELECT MIN(not_before) FROM outbox WHERE status = ?', (PENDING,)).fetchone()
+            return row[0]
+
+    def mark_posted(self, entry_id: int, tweet_id: Optional[str] = None):
+        """Record a successful post and remember its content"""
+        self._finish(entry_id, POSTED, tweet_id=tweet_id)
+        with self._connect() as conn:
+            row = conn.execute('SELECT text FROM outbox WHERE id = ?', (entry_id,)).fetchone()
+        if row is not None:
+            self.remember_content(row['text'])
+
+    def remember_content(self, text: str, posted_at: Optional[float] = None):
+        """Add text to the posted-content index (e.g. after the API reports it as a duplicate)"""
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO posted_content (content_hash, posted_at) VALUES (?, ?)',
+                (content_hash(text), posted_at or time.time())
+            )
+
+    def was_posted(self, text: str) -> bool:
+        """Whether the same normalized content was posted within content_window"""
+        with self._connect() as conn:
+            row = conn.execute(
+                'SELECT 1 FROM posted_content WHERE content_hash = ? AND posted_at >= ?',
+                (content_hash(text), time.time() - self.content_window)
+            ).fetchone()
+            return row is not None
+
+    def mark_failed(self, entry_id: int, error: str):
+        """Give up on an entry (permanent error)"""
+        self._finish(entry_id, FAILED, error=error)
+
+    def retry_later(self, entry_id: int, error: str, base_delay: float = 60) -> bool:
+        """Reschedule after a transient error with exponential backoff
+
+        Returns False (and fails the entry) once max_attempts is reached.
+        """
+        with self._lock, self._connect() as conn:
+            row = conn.execute('SELECT attempts FROM outbox WHERE id = ?', (entry_id,)).fetchone()
+            if row is None:
+                return False
+            if row['attempts'] >= self.max_attempts:
+                conn.execute(
+                    'UPDATE outbox SET status = ?, last_error = ?, finished_at = ? WHERE id = ?',
+                    (FAILED, error, time.time(), entry_id)
+                )
+                return False
+            conn.execute(
+                'UPDATE outbox SET status = ?, last_error = ?, not_before = ? WHERE id = ?',
+                (PENDING, error, time.time() + base_delay * 2 ** (row['attempts'] - 1), entry_id)
+            )
+            return True
+
+    def release(self, entry_id: int, not_before: float):
+        """Put an entry back untouched (e.g. rate limited), not counting the attempt"""
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                'UPDATE outbox SET status = ?, attempts = attempts - 1, not_before = ? WHERE id = ?',
+                (PENDING, not_before, entry_id)
+            )
+
+    def status(self, entry_id: int) -> Optional[str]:
+        with self._connect() as conn:
+            row = conn.execute('SELECT status FROM outbox WHERE id = ?', (entry_id,)).fetchone()
+            return row['status'] if row else None
+
+    def stats(self) -> Dict[str, int]:
+        """Entry counts by status"""
+        with self._connect() as conn:
+            return {
+                row['status']: row['n']
+                for row in conn.execute('SELECT status, COUNT(*) AS n FROM outbox GROUP BY status')
+            }
+
+    def _finish(self, entry_id: int, status: str, tweet_id: Optional[str] = None, error: Optional[str] = None):
+        with self._lock, self._connect() as conn:
+            conn.execute('''
+                UPDATE outbox SET status = ?, tweet_id = COALESCE(?, tweet_id),
+                    last_error = COALESCE(?, last_error), finished_at = ?
+                WHERE id = ?
+            ''', (status, tweet_id, error, time.time(), entry_id))
@@ -1,15 +1,79 @@
 """Rate limiting for Twitter API"""
 
-from datetime import datetime
+from datetime import datetime, timedelta
+from typing import Dict, Mapping, Optional
+import atexit
+import copy
 import json
 import logging
 import os
+import re
+import threading
 import time
 
 logger = logging.getLogger(__name__)
 
+# Numeric path segments (tweet/user ids) collapse so one bucket covers the endpoint
+_ID_SEGMENT = re.compile(r'/\d{3,}(?=/|$)')
+
+# Endpoint key used for posting
+POST_ENDPOINT = 'POST /2/tweets'
+
+def endpoint_key(method: str, route: str) -> str:
+    """Bucket key for a request, e.g. ('GET', '/2/tweets/123') -> 'GET /2/tweets/:id'"""
+    return f"{method.upper()} {_ID_SEGMENT.sub('/:id', route.split('?')[0])}"
+
+class EndpointBucket:
+    """Token bucket for one endpoint, refilled by the API's reset headers
+
+    Twitter reports a fixed-window budget per endpoint (x-rate-limit-limit,
+    -remaining, -reset). Every response overwrites the bucket with the
+    server's numbers; once the reset time passes the bucket refills to the
+    last known limit without waiting for another response.
+    """
+
+    def __init__(self, limit: Optional[int] = None, remaining: Optional[int] = None, reset_at: float = 0.0):
+        self.limit = limit
+        self.remaining = remaining
+        self.reset_at = reset_at
+
+    def observe(self, limit: Optional[int], remaining: Optional[int], reset_at: Optional[float]) -> None:
+        if limit is not None:
+            self.limit = limit
+        if remaining is not None:
+            self.remaining = remaining
+        if reset_at is not None:
+            self.reset_at = reset_at
+
+    def next_allowed(self, now: float) -> float:
+        """Earliest epoch time a call can be made"""
+        self._refill(now)
+        if self.remaining is None or self.remaining > 0:
+            return now
+        return self.reset_at
+
+    def _refill(self, now: float) -> None:
+        if self.reset_at and now >= self.reset_at and self.limit is not None:
+            self.remaining = self.limit
+
+    def to_dict(self) -> Dict:
+        return {'limit': self.limit, 'remaining': self.remaining, 'reset_at': self.reset_at}
+
 class RateLimiter:
-    def __init__(self):
+    """Post caps plus header-driven per-endpoint buckets
+
+    Daily/monthly post caps and the 429 cooldown are tracked as before; every
+    API response's rate limit headers (see record_headers) additionally feed
+    a bucket per endpoint. next_allowed_time() combines them into the exact
+    moment posting can resume, so callers sleep once instead of polling and
+    the bot can keep doing other work during a cooldown.
+
+    State is written behind: changes mark the cache dirty and are flushed at
+    most every flush_interval seconds (and at exit). Post counts and
+    cooldowns are flushed immediately since losing them could over-post.
+    """
+
+    def __init__(self, flush_interval: float = 10):
         """Initialize rate limiter"""
         # Default rate limits
         self.default_limits = {
@@ -22,123 +86,256 @@ class RateLimiter:
                 'monthly_limit': 100,  # Twitter's monthly post cap
                 'last_rate_limit': None,  # Track when we last hit a rate limit
                 'rate_limit_cooldown': 901,  # Twitter's rate limit cooldown in seconds
+                'cooldown_until': None,  # Epoch time the current 429 pause ends
                 'last_post_time': 0  # Track when we last successfully posted
             }
         }
-        self.rate_limits = self.default_limits.copy()
+        self.rate_limits = copy.deepcopy(self.default_limits)
+        self.endpoints: Dict[str, EndpointBucket] = {}
         self.cache_file = 'rate_limits.json'
+        self.flush_interval = flush_interval
+        self._lock = threading.RLock()
+        self._dirty = False
+        self._last_flush = 0.0
         self._load_cache()
-    
+        atexit.register(self.flush)
+
     @property
     def last_post_time(self) -> float:
         """Get the last successful post time"""
         return self.rate_limits['post']['last_post_time']
-    
+
+    def _cooldown_remaining(self) -> float:
+        """Seconds left in the 429 cooldown (0 when not cooling down)"""
+        post = self.rate_limits['post']
+        if post.get('cooldown_until'):
+            return max(0.0, post['cooldown_until'] - time.time())
+        last_rate_limit = post['last_rate_limit']
+        if not last_rate_limit:
+            return 0.0
+        time_since_limit = (datetime.utcnow() - last_rate_limit).total_seconds()
+        return max(0.0, self.rate_limits['post']['rate_limit_cooldown'] - time_since_limit)
+
     def is_rate_limited(self) -> bool:
         """Check if we're currently rate limited"""
-        if self.rate_limits['post']['last_rate_limit']:
-            time_since_limit = (datetime.utcnow() - self.rate_limits['post']['last_rate_limit']).total_seconds()
-            return time_since_limit < self.rate_limits['post']['rate_limit_cooldown']
-        return False
-    
+        return self._cooldown_remaining() > 0
+
     def update_post_time(self) -> None:
         """Update the last successful post time"""
         self.rate_limits['post']['last_post_time'] = time.time()
         self._save_cache()
-    
+
     def can_post(self) -> bool:
         """Check if we can post based on rate limits"""
-        self._check_resets()
-        
-        # Check if we're in rate limit cooldown
-        if self.rate_limits['post']['last_rate_limit']:
-            time_since_limit = (datetime.utcnow() - self.rate_limits['post']['last_rate_limit']).total_seconds()
-            if time_since_limit < self.rate_limits['post']['rate_limit_cooldown']:
-                logger.warning(f"In rate limit cooldown for {self.rate_limits['post']['rate_limit_cooldown'] - time_since_limit:.0f} more seconds")
-                return False
-            else:
+        return self.seconds_until_allowed() <= 0
+
+    def next_allowed_time(self, endpoint: str = POST_ENDPOINT) -> float:
+        """Epoch time at which the next call to endpoint is allowed"""
+        with self._lock:
+            self._check_resets()
+            now = time.time()
+            candidates = [now]
+
+            cooldown = self._cooldown_remaining()
+            if cooldown > 0:
+                candidates.append(now + cooldown)
+            elif self.rate_limits['post']['last_rate_limit']:
                 # Reset rate limit after cooldown
                 self.rate_limits['post']['last_rate_limit'] = None
+                self.rate_limits['post']['cooldown_until'] = None
                 self._save_cache()
-        
-        return (self.rate_limits['post']['daily_count'] < self.rate_limits['post']['daily_limit'] and
-                self.rate_limits['post']['monthly_count'] < self.rate_limits['post']['monthly_limit'])
-    
+
+            if endpoint == POST_ENDPOINT:
+                post = self.rate_limits['post']
+                utcnow = datetime.utcnow()
+                if post['monthly_count'] >= post['monthly_limit']:
+                    month_start = post['monthly_reset']
+                    next_month = (month_start.replace(day=28) + timedelta(days=4)).replace(day=1)
+                    candidates.append(now + (next_month - utcnow).total_seconds())
+                elif post['daily_count'] >= post['daily_limit']:
+                    tomorrow = post['last_reset'] + timedelta(days=1)
+                    candidates.append(now + (tomorrow - utcnow).total_seconds())
+
+            for key in (endpoint, f"{endpoint} (24h)"):
+                bucket = self.endpoints.get(key)
+                if bucket is not None:
+                    candidates.append(bucket.next_allowed(now))
+
+            return max(candidates)
+
+    def seconds_until_allowed(self, endpoint: str = POST_ENDPOINT) -> float:
+        """Seconds to wait before the next call to endpoint (0 if allowed now)"""
+        return max(0.0, self.next_allowed_time(endpoint) - time.time())
+
+    def spacing(self, endpoint: str, reserve: float = 0.0) -> float:
+        """Seconds between calls that spread endpoint's remaining budget over its window
+
+        A reserve fraction of the window's limit is left for other callers.
+        Returns 0 while the endpoint's budget is unknown.
+        """
+        with self._lock:
+            bucket = self.endpoints.get(endpoint)
+            if bucket is None or bucket.limit is None or bucket.remaining is None:
+                return 0.0
+            now = time.time()
+            bucket.next_allowed(now)  # refill if the window has reset
+            window_left = max(0.0, bucket.reset_at - now)
+            usable = bucket.remaining - int(bucket.limit * reserve)
+            if usable <= 0:
+                return window_left
+            return window_left / usable
+
     def update_counts(self) -> None:
         """Update post counts after successful post"""
-        self.rate_limits['post']['daily_count'] += 1
-        self.rate_limits['post']['monthly_count'] += 1
-        self._save_cache()
-    
+        with self._lock:
+            self.rate_limits['post']['daily_count'] += 1
+            self.rate_limits['post']['monthly_count'] += 1
+            self._save_cache(force=True)
+
+    def record_headers(self, endpoint: str, headers: Mapping[str, str]) -> None:
+        """Feed x-rate-limit-* headers from an API response into the endpoint's bucket"""
+        def header_int(name: str) -> Optional[int]:
+            value = headers.get(name)
+            try:
+                return int(value) if value is not None else None
+            except ValueError:
+                return None
+
+        limit = header_int('x-rate-limit-limit')
+        remaining = header_int('x-rate-limit-remaining')
+        reset_at = header_int('x-rate-limit-reset')
+        if limit is None and remaining is None and reset_at is None:
+            return
+
+        with self._lock:
+            bucket = self.endpoints.setdefault(endpoint, EndpointBucket())
+            bucket.observe(limit, remaining, reset_at)
+
+            # Posting also has a per-user 24 hour budget reported separately
+            user_remaining = header_int('x-user-limit-24hour-remaining')
+            user_reset = header_int('x-user-limit-24hour-reset')
+            if user_remaining is not None:
+                daily = self.endpoints.setdefault(f"{endpoint} (24h)", EndpointBucket())
+                daily.observe(header_int('x-user-limit-24hour-limit'), user_remaining, user_reset)
+
+            self._save_cache()
+
     def _check_resets(self) -> None:
         """Check and handle daily/monthly resets"""
         now = datetime.utcnow()
-        
+
         # Check daily reset
         if now.date() > self.rate_limits['post']['last_reset'].date():
             self.rate_limits['post']['daily_count'] = 0
             self.rate_limits['post']['last_reset'] = now.replace(hour=0, minute=0, second=0, microsecond=0)
-            
+            self._save_cache()
+
         # Check monthly reset
         if now.replace(day=1) > self.rate_limits['post']['monthly_reset']:
             self.rate_limits['post']['monthly_count'] = 0
             self.rate_limits['post']['monthly_reset'] = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-    
+            self._save_cache()
+
     def _load_cache(self) -> None:
         """Load cached rate limits"""
         try:
             with open(self.cache_file, 'r') as f:
                 data = json.load(f)
-                # Ensure all required keys exist
-                if 'post' in data and all(k in data['post'] for k in self.default_limits['post']):
+                # Ensure all required keys exist (caches written before cooldown_until lack it)
+                required = [k for k in self.default_limits['post'] if k != 'cooldown_until']
+                if 'post' in data and all(k in data['post'] for k in required):
+                    data['post'].setdefault('cooldown_until', None)
+                    # The cooldown length is configuration, not state
+                    data['post']['rate_limit_cooldown'] = self.default_limits['post']['rate_limit_cooldown']
                     # Convert date strings back to datetime
                     data['post']['last_reset'] = datetime.fromisoformat(data['post']['last_reset'])
                     data['post']['monthly_reset'] = datetime.fromisoformat(data['post']['monthly_reset'])
-                    if 'last_rate_limit' in data['post']:
+                    if data['post'].get('last_rate_limit'):
                         data['post']['last_rate_limit'] = datetime.fromisoformat(data['post']['last_rate_limit'])
+                    self.endpoints = {
+                        key: EndpointBucket(**state) for key, state in data.pop('endpoints', {}).items()
+                    }
                     self.rate_limits = data
                 else:
                     logger.warning("Invalid cache format, using default limits")
         except (FileNotFoundError, json.JSONDecodeError):
             logger.info("No valid cache found, using default limits")
-            
-    def _save_cache(self) -> None:
-        """Save current rate limits to cache"""
-        try:
-            # Convert datetime to string for JSON serialization
-            cache_data = {
-                'post': {
-                    **self.rate_limits['post'],
-                    'last_reset': self.rate_limits['post']['last_reset'].isoformat(),
-                    'monthly_reset': self.rate_limits['post']['monthly_reset'].isoformat(),
-                    'last_rate_limit': self.rate_limits['post']['last_rate_limit'].isoformat() if self.rate_limits['post']['last_rate_limit'] else None
+
+    def _save_cache(self, force: bool = False) -> None:
+        """Mark state dirty and flush if forced or the flush interval has passed"""
+        with self._lock:
+            self._dirty = True
+            if force or time.time() - self._last_flush >= self.flush_interval:
+                self.flush()
+
+    def flush(self) -> None:
+        """Write current rate limits to cache if anything changed"""
+        with self._lock:
+            if not self._dirty:
+                return
+            try:
+                # Convert datetime to string for JSON serialization
+                cache_data = {
+                    'post': {
+                        **self.rate_limits['post'],
+                        'last_reset': self.rate_limits['post']['last_reset'].isoformat(),
+                        'monthly_reset': self.rate_limits['post']['monthly_reset'].isoformat(),
+                        'last_rate_limit': self.rate_limits['post']['last_rate_limit'].isoformat() if self.rate_limits['post']['last_rate_limit'] else None
+                    },
+                    'endpoints': {key: bucket.to_dict() for key, bucket in self.endpoints.items()}
                 }
-            }
-            with open(self.cache_file, 'w') as f:
-                json.dump(cache_data, f)
-        except Exception as e:
-            logger.error(f"Error saving rate limits: {e}")
+                temp_file = f"{self.cache_file}.tmp"
+                with open(temp_file, 'w') as f:
+                    json.dump(cache_data, f)
+                os.replace(temp_file, self.cache_file)
+                self._dirty = False
+                self._last_flush = time.time()
+            except Exception as e:
+                logger.error(f"Error saving rate limits: {e}")
 
-    def handle_rate_limit(self) -> None:
-        """Handle a rate limit error"""
-        self.rate_limits['post']['last_rate_limit'] = datetime.utcnow()
-        self._save_cache()
-        logger.warning(f"Rate limit exceeded. Sleeping for {self.rate_limits['post']['rate_limit_cooldown']} seconds.")
-        time.sleep(self.rate_limits['post']['rate_limit_cooldown'])
+    def handle_rate_limit(self, headers: Mapping[str, str] = None, block: bool = False) -> float:
+        """Handle a rate limit error
+
+        Starts the cooldown (ending at the response's reset time when headers
+        are given) and returns its length in seconds. Only sleeps through it
+        when block=True; otherwise callers skip posting until
+        next_allowed_time() and can keep doing other work.
+        """
+        with self._lock:
+            if headers:
+                self.record_headers(POST_ENDPOINT, headers)
+            self.rate_limits['post']['last_rate_limit'] = datetime.utcnow()
+
+            # Prefer the server's reset time over the fixed cooldown when it is sooner
+            bucket = self.endpoints.get(POST_ENDPOINT)
+            cooldown = self.rate_limits['post']['rate_limit_cooldown']
+            now = time.time()
+            if headers and bucket is not None and bucket.reset_at and bucket.reset_at > now:
+                cooldown = min(cooldown, bucket.reset_at - now)
+            self.rate_limits['post']['cooldown_until'] = now + cooldown
+            self._save_cache(force=True)
+
+        logger.warning(f"Rate limit exceeded. Posting paused for {cooldown:.0f} seconds.")
+        if block:
+            time.sleep(cooldown)
+        return cooldown
 
     def wait(self) -> None:
-        """Wait until we can post again"""
-        while not self.can_post():
-            logger.info("Rate limit reached, waiting 60 seconds...")
-            time.sleep(60)  # Wait a minute before checking again
-            self._check_resets()
+        """Wait until we can post again, sleeping exactly until the next allowed time"""
+        delay = self.seconds_until_allowed()
+        while delay > 0:
+            logger.info(f"Rate limit reached, waiting {delay:.0f} seconds...")
+            time.sleep(delay)
+            delay = self.seconds_until_allowed()
 
     def cleanup(self) -> None:
         """Clean up old rate limit data"""
         try:
             # Reset to default limits
-            self.rate_limits = self.default_limits.copy()
-            
+            self.rate_limits = copy.deepcopy(self.default_limits)
+            self.endpoints = {}
+            self._dirty = False
+
             # Check if cache file exists and delete it
             if os.path.exists(self.cache_file):
                 os.remove(self.cache_file)
@@ -0,0 +1,332 @@
+"""Offline posting simulation
+
+Drives the bot's real schedule, strategies, formatters, rate limiter and
+posting path against LocalTwitterClient on a virtual clock, so a full day of
+scheduled posts runs in seconds. Market data comes from a seeded synthetic
+token universe instead of CryptoRank.
+
+Usage:
+    python -m twitter.simulation --days 1 --tokens 1000 --json sim_report.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import random
+import shutil
+import statistics
+import string
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime, time as dt_time
+from functools import wraps
+from typing import Dict, List
+from unittest import mock
+
+import schedule
+import tweepy
+
+from twitter.local_client import DUPLICATE_DETAIL, TOO_LONG_DETAIL, LocalTwitterClient, VirtualClock
+from ops_metrics import SCHEDULE_LAG_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# Every module-level name the strategies use to reach CryptoRank
+MARKET_FEED_TARGETS = [
+    'strategies.shared_utils.fetch_tokens',
+    'strategies.trend_strategy.fetch_tokens',
+    'strategies.volume_strategy.fetch_tokens',
+    'strategies.portfolio_tracker.fetch_tokens'
+]
+
+def make_token_universe(count: int, seed: int = 42) -> List[Dict]:
+    """Build a synthetic CryptoRank-style token listing
+
+    Tokens carry both the raw API fields and the formatted fields the
+    strategies read, with heavy-tailed volumes and market caps.
+    """
+    rng = random.Random(seed)
+    tokens = []
+    seen = set()
+    while len(tokens) < count:
+        symbol = ''.join(rng.choices(string.ascii_uppercase, k=rng.randint(3, 6)))
+        if symbol in seen or 'USD' in symbol or 'DAI' in symbol:
+            continue
+        seen.add(symbol)
+
+        price = 10 ** rng.uniform(-6, 3)
+        mcap = 10 ** rng.uniform(6, 10)
+        volume = mcap * 10 ** rng.uniform(-3, 0.5)
+        change = max(-60.0, min(60.0, rng.gauss(0, 12)))
+        tokens.append({
+            'symbol': symbol,
+            'name': f"{symbol.title()} Protocol",
+            'price': price,
+            'volume24h': volume,
+            'marketCap': mcap,
+            'priceChange24h': change,
+            'percentChange24h': change,
+            'high24h': price * (1 + abs(change) / 100),
+            'low24h': price * (1 - min(abs(change), 90) / 200),
+            'circulatingSupply': mcap / price
+        })
+    return tokens
+
+def drift_token_universe(tokens: List[Dict], rng: random.Random) -> None:
+    """Random-walk prices and volumes in place between simulated cycles"""
+    for token in tokens:
+        step = rng.gauss(0, 0.03)
+        token['price'] *= 1 + step
+        token['marketCap'] *= 1 + step
+        token['volume24h'] *= max(0.2, 1 + rng.gauss(0, 0.15))
+        change = max(-60.0, min(60.0, token['priceChange24h'] * 0.8 + step * 100))
+        token['priceChange24h'] = change
+        token['percentChange24h'] = change
+        token['high24h'] = token['price'] * (1 + abs(change) / 100)
+        token['low24h'] = token['price'] * (1 - min(abs(change), 90) / 200)
+
+class StageTimer:
+    """Records wall-clock and virtual-clock durations per named stage"""
+
+    def __init__(self, clock: VirtualClock):
+        """Initialize timer bound to the simulation clock"""
+        self.clock = clock
+        self.wall = defaultdict(list)
+        self.virtual = defaultdict(float)
+
+    @contextlib.contextmanager
+    def stage(self, name: str):
+        """Time a block as one occurrence of a stage"""
+        wall_start = time.perf_counter()
+        virtual_start = self.clock.time()
+        try:
+            yield
+        finally:
+            self.wall[name].append(time.perf_counter() - wall_start)
+            self.virtual[name] += self.clock.time() - virtual_start
+
+    def wrap(self, obj, attr: str, name: str) -> None:
+        """Shadow obj.attr with a timed version (stages may nest)"""
+        func = getattr(obj, attr)
+
+        @wraps(func)
+        def timed(*args, **kwargs):
+            with self.stage(name):
+                return func(*args, **kwargs)
+
+        setattr(obj, attr, timed)
+
+    def summary(self) -> Dict[str, Dict]:
+        """Per-stage count, latency percentiles (ms) and simulated seconds"""
+        result = {}
+        for name, samples in sorted(self.wall.items()):
+            ordered = sorted(samples)
+            result[name] = {
+                'count': len(ordered),
+                'mean_ms': round(statistics.fmean(ordered) * 1000, 3),
+                'p50_ms': round(ordered[len(ordered) // 2] * 1000, 3),
+                'p95_ms': round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 3),
+                'max_ms': round(ordered[-1] * 1000, 3),
+                'virtual_s': round(self.virtual[name], 1)
+            }
+        return result
+
+class PostingSimulation:
+    """Runs scheduled posting days against the local Twitter stand-in"""
+
+    def __init__(self, days: int = 1, tokens: int = 1000, seed: int = 42, fail_rate: float = 0.0,
+                 wait_on_rate_limit: bool = False, verbose: bool = False):
+        """Initialize simulation settings
+
+        Args:
+            days: Number of simulated days to run
+            tokens: Size of the synthetic token universe
+            seed: Seed for market data, failures and engagement
+            fail_rate: Probability of a 503 on create_tweet
+            wait_on_rate_limit: Mirror the production client setting
+            verbose: Keep bot logging and strategy prints on the console
+        """
+        self.days = days
+        self.seed = seed
+        self.verbose = verbose
+        self.rng = random.Random(seed)
+        self.universe = make_token_universe(tokens, seed)
+
+        start = datetime.combine(datetime.now().date(), dt_time()).timestamp()
+        self.clock = VirtualClock(start)
+        self.day_start = start
+        self.client = LocalTwitterClient(
+            clock=self.clock, fail_rate=fail_rate, seed=seed,
+            wait_on_rate_limit=wait_on_rate_limit
+        )
+        self.timer = StageTimer(self.clock)
+
+    def run(self) -> Dict:
+        """Run all simulated days and return the report"""
+        workdir = tempfile.mkdtemp(prefix='elai_sim_')
+        cwd = os.getcwd()
+        wall_start = time.perf_counter()
+        env = {'CRYPTORANK_API_KEY': os.getenv('CRYPTORANK_API_KEY') or 'simulated'}
+
+        try:
+            # The bot writes rate_limits.json, price_history.json and logs relative to cwd
+            os.chdir(workdir)
+            with contextlib.ExitStack() as stack:
+                stack.enter_context(mock.patch.dict(os.environ, env))
+                os.environ.pop('REDIS_URL', None)
+                for target in MARKET_FEED_TARGETS:
+                    stack.enter_context(mock.patch(target, self._fetch_tokens))
+                stack.enter_context(mock.patch('twitter.rate_limiter.time', self.clock))
+                stack.enter_context(mock.patch('twitter.outbox.time', self.clock))
+                stack.enter_context(mock.patch('twitter.engagement_collector.time', self.clock))
+                stack.enter_context(mock.patch('twitter.rate_limiter.datetime', self.clock.datetime))
+                stack.enter_context(mock.patch('twitter.bot.datetime', self.clock.datetime))
+                if not self.verbose:
+                    stack.enter_context(contextlib.redirect_stdout(io.StringIO()))
+                    root = logging.getLogger()
+                    stack.callback(root.setLevel, root.level)
+                    root.setLevel(logging.WARNING)
+
+                bot = self._build_bot(workdir)
+                lags = self._run_schedule(bot)
+                # Write limiter state while the scratch dir still exists
+                bot.rate_limiter.flush()
+        finally:
+            schedule.clear()
+            os.chdir(cwd)
+            shutil.rmtree(workdir, ignore_errors=True)
+
+        return self._report(lags, time.perf_counter() - wall_start)
+
+    def _fetch_tokens(self, api_key: str = None, sort_by: str = 'volume24h', direction: str = 'DESC',
+                      print_first: int = 0, limit: int = 1000) -> List[Dict]:
+        """Synthetic stand-in for the CryptoRank fetchers"""
+        with self.timer.stage('market.fetch'):
+            key = 'volume24h' if sort_by == 'volume24h' else 'priceChange24h'
+            tokens = sorted(self.universe, key=lambda t: t[key], reverse=direction == 'DESC')
+            return [dict(t) for t in tokens[:limit]]
+
+    def _build_bot(self, workdir: str):
+        """Create the real bot wired to the stand-in and isolated storage"""
+        from twitter.api_client import TwitterAPI
+        from twitter.bot import AIGamingBot
+
+        bot = AIGamingBot(api=TwitterAPI(client=self.client))
+
+        # Start from clean limiter and tracker state inside the scratch dir
+        bot.rate_limiter.cache_file = os.path.join(workdir, 'rate_limits.json')
+        bot.rate_limiter.rate_limits = {'post': dict(bot.rate_limiter.default_limits['post'])}
+        tracker = bot.elion.token_monitor.history_tracker
+        tracker.using_redis = False
+        tracker.history_file = os.path.join(workdir, 'token_history.json')
+        tracker.token_history = {}
+
+        elion = bot.elion
+        self.timer.wrap(elion.trend_strategy, 'analyze', 'analysis.trend')
+        self.timer.wrap(elion.volume_strategy, 'analyze', 'analysis.volume')
+        self.timer.wrap(elion.token_monitor, 'run_analysis', 'tracking.run_analysis')
+        self.timer.wrap(tracker, 'get_recent_performance', 'history.recent_performance')
+        self.timer.wrap(elion.trend_strategy, 'format_twitter_output', 'format.trend')
+        self.timer.wrap(elion.volume_strategy, 'format_twitter_output', 'format.volume')
+        self.timer.wrap(elion, 'format_tweet', 'format.performance')
+        self.timer.wrap(elion.tweet_formatters, 'get_backup_tweet', 'format.backup')
+        self.timer.wrap(bot.rate_limiter, 'wait', 'rate_limit.wait')
+        self.timer.wrap(bot.api, 'create_tweet', 'api.create_tweet')
+        self.timer.wrap(bot, 'drain_outbox', 'outbox.drain')
+        self.timer.wrap(bot.engagement, 'collect_due', 'engagement.collect')
+        return bot
+
+    def _run_schedule(self, bot) -> List[float]:
+        """Fire each scheduled job at its slot, the way AIGamingBot.run does"""
+        jobs = sorted(schedule.get_jobs(), key=lambda job: job.at_time)
+        lags = []
+
+        for day in range(self.days):
+            for job in jobs:
+                slot = self.day_start + day * 86400 + job.at_time.hour * 3600 + job.at_time.minute * 60
+                self.clock.advance_to(slot)
+                lags.append(self.clock.time() - slot)
+                SCHEDULE_LAG_SECONDS.observe(lags[-1], job.job_func.__name__)
+                drift_token_universe(self.universe, self.rng)
+
+                # Tweets still queued from earlier slots go out first, as in the run loop
+                bot.drain_outbox()
+                bot.engagement.collect_due()
+
+                name = job.job_func.__name__
+                with self.timer.stage(f"job.{name}"):
+                    try:
+                        job.job_func()
+                    except tweepy.errors.TooManyRequests:
+                        bot.rate_limiter.handle_rate_limit()
+                    except Exception as e:
+                        logger.error(f"Error running scheduled job {name}: {e}")
+        return lags
+
+    def _report(self, lags: List[float], wall_seconds: float) -> Dict:
+        """Summarize outcomes, lag and stage latencies"""
+        create = {k.split(':')[1]: v for k, v in self.client.stats.items() if k.startswith('create_tweet:')}
+        return {
+            'days': self.days,
+            'tokens': len(self.universe),
+            'seed': self.seed,
+            'wall_seconds': round(wall_seconds, 3),
+            'simulated_seconds': round(self.clock.time() - self.day_start, 1),
+            'jobs': len(lags),
+            'posts': {
+                'posted': create.get('201', 0),
+                'duplicate_rejected': self.client.forbidden[f"create_tweet:{DUPLICATE_DETAIL}"],
+                'too_long_rejected': self.client.forbidden[f"create_tweet:{TOO_LONG_DETAIL}"],
+                'rate_limited': create.get('429', 0),
+                'server_errors': create.get('503', 0)
+            },
+            'schedule_lag_s': {
+                'mean': round(statistics.fmean(lags), 1) if lags else 0,
+                'max': round(max(lags), 1) if lags else 0
+            },
+            'api_calls': dict(sorted(self.client.stats.items())),
+            'stages': self.timer.summary()
+        }
+
+def print_report(report: Dict) -> None:
+    """Print a human readable simulation report"""
+    print(f"\nSimulated {report['days']} day(s), {report['jobs']} jobs, {report['tokens']} tokens "
+          f"in {report['wall_seconds']:.2f}s wall ({report['simulated_seconds'] / 3600:.1f}h simulated)")
+    print("Posts: " + ", ".join(f"{k}={v}" for k, v in report['posts'].items()))
+    print(f"Schedule lag: mean {report['schedule_lag_s']['mean']}s, max {report['schedule_lag_s']['max']}s")
+    print(f"\n{'stage':<30}{'count':>7}{'mean ms':>11}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}{'sim s':>10}")
+    print("-" * 88)
+    for name, s in report['stages'].items():
+        print(f"{name:<30}{s['count']:>7}{s['mean_ms']:>11.2f}{s['p50_ms']:>10.2f}"
+              f"{s['p95_ms']:>10.2f}{s['max_ms']:>10.2f}{s['virtual_s']:>10.0f}")
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Simulate scheduled posting against a local Twitter API")
+    parser.add_argument('--days', type=int, default=1, help="Simulated days to run")
+    parser.add_argument('--tokens', type=int, default=1000, help="Synthetic token universe size")
+    parser.add_argument('--seed', type=int, default=42, help="Random seed")
+    parser.add_argument('--fail-rate', type=float, default=0.0, help="Probability of a 503 on create_tweet")
+    parser.add_argument('--wait-on-rate-limit', action='store_true',
+                        help="Sleep in the client on a 429 instead of raising TooManyRequests")
+    parser.add_argument('--json', help="Write the report to this JSON file")
+    parser.add_argument('--verbose', action='store_true', help="Show bot logs and strategy output")
+    args = parser.parse_args()
+
+    report = PostingSimulation(
+        days=args.days, tokens=args.tokens, seed=args.seed, fail_rate=args.fail_rate,
+        wait_on_rate_limit=args.wait_on_rate_limit, verbose=args.verbose
+    ).run()
+    print_report(report)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nReport written to {args.json}")
+
+if __name__ == "__main__":
+    main()